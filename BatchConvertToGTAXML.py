@@ -5,12 +5,30 @@ import gpu
 from gpu_extras.batch import batch_for_shader
 from PIL import Image
 import os
+import sqlite3
+import sys
+import json
+import time
+
+# pool de workers Blender (blender_workers.py ao lado deste script)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
+
+from blender_workers import blender_command, format_args, print_summary, run_jobs
+from trackgen_core.config import get_arg
 
 # 📁 Caminho da pasta de entrada e saída
 input_folder = r"D:\ExportGTA\saida\maps\cs_hospital"
 output_folder = r"D:\ExportGTA\saida\maps\cs_hospital_output"
 os.makedirs(output_folder, exist_ok=True)
 
+# modo paralelo: workers=N divide os .obj entre N Blenders headless (0/1 = tudo neste processo)
+WORKERS = get_arg("workers", 0, int)
+# uso interno dos workers: lista JSON dos arquivos deste worker e onde gravar o relatório
+WORKER_FILES = get_arg("worker_files", "", str)
+WORKER_DIR = os.path.join(output_folder, "_workers")
+
 def create_transparent_texture(filepath, size=4):
     """Cria uma textura PNG totalmente transparente"""
     from PIL import Image
@@ -302,55 +320,135 @@ def is_material_transparent(mat):
     return False
 
 
-def image_has_transparency(filepath):
-    """Analisa o canal alpha do arquivo de imagem"""
-    if not os.path.isfile(filepath):
-        print(f"❌ Arquivo não encontrado: {filepath}")
-        return False
-
+# cache persistente dos vereditos de transparência (compartilhado entre mapas e execuções)
+TRANSPARENCY_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(output_folder)), "texture_alpha_cache.sqlite3")
+_TRANSPARENCY_DB = None
+_TRANSPARENCY_MEMO = {}
+
+# tipos de cor do IHDR do PNG: 4 = cinza + alpha, 6 = RGBA (os outros só com chunk tRNS)
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_ALPHA_COLOR_TYPES = (4, 6)
+
+def transparency_db():
+    """Conexão SQLite do cache (criada na 1ª consulta); None se não der para abrir."""
+    global _TRANSPARENCY_DB
+    if _TRANSPARENCY_DB is None:
+        try:
+            # autocommit + WAL: cada INSERT trava o arquivo só por milissegundos e leituras
+            # não esperam escritas; o timeout cobre a disputa entre workers (workers=N)
+            _TRANSPARENCY_DB = sqlite3.connect(TRANSPARENCY_CACHE_PATH, timeout=30, isolation_level=None)
+            _TRANSPARENCY_DB.execute("PRAGMA journal_mode=WAL")
+            _TRANSPARENCY_DB.execute(
+                "CREATE TABLE IF NOT EXISTS alpha (path TEXT PRIMARY KEY, size INTEGER, "
+                "mtime_ns INTEGER, has_alpha INTEGER, detail TEXT)")
+        except Exception as e:
+            print(f"⚠️ Cache de transparência indisponível ({TRANSPARENCY_CACHE_PATH}): {e}")
+            _TRANSPARENCY_DB = False
+    return _TRANSPARENCY_DB or None
+
+def disable_transparency_db(e):
+    """Erro do SQLite (travado, só leitura, corrompido): avisa uma vez e segue sem cache."""
+    global _TRANSPARENCY_DB
+    print(f"⚠️ Cache de transparência desativado ({TRANSPARENCY_CACHE_PATH}): {e}")
+    try:
+        _TRANSPARENCY_DB.close()
+    except Exception:
+        pass
+    _TRANSPARENCY_DB = False
+
+def png_may_have_alpha(filepath):
+    """
+    Lê só os cabeçalhos dos chunks do PNG até o IDAT: False se não há canal
+    alpha nem tRNS, True se pode haver, None se não é PNG (ou está truncado).
+    """
     try:
-        with Image.open(filepath) as img:
-            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
-                alpha = img.getchannel("A")
-                extrema = alpha.getextrema()
-                if extrema[0] < 255:
-                    print(f"⚠️ {os.path.basename(filepath)} tem transparência (Alpha extrema: {extrema})")
+        with open(filepath, "rb") as f:
+            if f.read(8) != PNG_SIGNATURE:
+                return None
+            while True:
+                head = f.read(8)
+                if len(head) < 8:
+                    return None
+                length, kind = int.from_bytes(head[:4], "big"), head[4:]
+                if kind == b"IHDR":
+                    if f.read(length)[9] in PNG_ALPHA_COLOR_TYPES:
+                        return True
+                    f.seek(4, os.SEEK_CUR)
+                    continue
+                if kind == b"tRNS":
                     return True
-                else:
-                    print(f"✅ {os.path.basename(filepath)} é opaco (Alpha extrema: {extrema})")
+                if kind in (b"IDAT", b"IEND"):
                     return False
-            else:
-                print(f"✅ {os.path.basename(filepath)} sem canal alpha (mode={img.mode})")
-                return False
-    except Exception as e:
-        print(f"❌ Erro ao abrir {filepath}: {e}")
-        return False
-
+                f.seek(length + 4, os.SEEK_CUR)
+    except Exception:
+        return None
+
+def analyze_image_transparency(filepath):
+    """Decodifica a imagem e olha o canal alpha: (tem transparência, descrição)."""
+    if png_may_have_alpha(filepath) is False:
+        return False, "PNG sem canal alpha"
+
+    with Image.open(filepath) as img:
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            alpha = img.getchannel("A")
+            extrema = alpha.getextrema()
+            return extrema[0] < 255, f"Alpha extrema: {extrema}"
+        return False, f"sem canal alpha (mode={img.mode})"
 
 def image_has_transparency(filepath):
-    """Analisa o canal alpha do arquivo de imagem"""
+    """
+    Analisa o canal alpha do arquivo de imagem. O veredito fica em
+    TRANSPARENCY_CACHE_PATH por (caminho, tamanho, mtime): a mesma textura
+    só é decodificada de novo quando o arquivo muda.
+    """
     if not os.path.isfile(filepath):
         print(f"❌ Arquivo não encontrado: {filepath}")
         return False
 
+    path = os.path.normcase(os.path.abspath(filepath))
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    name = os.path.basename(filepath)
+
+    memo = _TRANSPARENCY_MEMO.get(path)
+    if memo is not None and memo[0] == stamp:
+        return memo[1]
+
+    db = transparency_db()
+    row = None
+    if db is not None:
+        try:
+            row = db.execute("SELECT size, mtime_ns, has_alpha, detail FROM alpha WHERE path = ?", (path,)).fetchone()
+        except sqlite3.Error as e:
+            disable_transparency_db(e)
+            db = None
+        if row is not None and tuple(row[:2]) == stamp:
+            has_alpha = bool(row[2])
+            _TRANSPARENCY_MEMO[path] = (stamp, has_alpha)
+            print(f"♻️ {name}: {'tem transparência' if has_alpha else 'opaco'} (cache, {row[3]})")
+            return has_alpha
+
     try:
-        with Image.open(filepath) as img:
-            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
-                alpha = img.getchannel("A")
-                extrema = alpha.getextrema()
-                if extrema[0] < 255:
-                    print(f"⚠️ {os.path.basename(filepath)} tem transparência (Alpha extrema: {extrema})")
-                    return True
-                else:
-                    print(f"✅ {os.path.basename(filepath)} é opaco (Alpha extrema: {extrema})")
-                    return False
-            else:
-                print(f"✅ {os.path.basename(filepath)} sem canal alpha (mode={img.mode})")
-                return False
+        has_alpha, detail = analyze_image_transparency(path)
     except Exception as e:
         print(f"❌ Erro ao abrir {filepath}: {e}")
         return False
 
+    if has_alpha:
+        print(f"⚠️ {name} tem transparência ({detail})")
+    else:
+        print(f"✅ {name} é opaco ({detail})")
+    _TRANSPARENCY_MEMO[path] = (stamp, has_alpha)
+    if db is not None:
+        # commit logo após cada veredito: nenhuma transação fica aberta durante a conversão
+        try:
+            with db:
+                db.execute("INSERT OR REPLACE INTO alpha VALUES (?, ?, ?, ?, ?)",
+                           (path, *stamp, int(has_alpha), detail))
+        except sqlite3.Error as e:
+            disable_transparency_db(e)
+    return has_alpha
+
 
 def convert_materials_with_alpha_flags(obj):
     """Converte materiais individualmente com Alpha flag se necessário"""
@@ -493,16 +591,11 @@ def process_obj(obj):
     # Exemplo: chama sua função personalizada
     process_sollumz_drawable_and_collision(obj)
 
-def batch_process_objs():
-    """Carrega e processa todos os .obj da pasta"""
-    obj_files = [f for f in os.listdir(input_folder) if f.lower().endswith('.obj')]
-    if not obj_files:
-        print("❌ Nenhum arquivo .obj encontrado na pasta.")
-        return
-
-    print(f"🔄 Iniciando processamento de {len(obj_files)} arquivos...")
-    for i, filename in enumerate(obj_files, start=1):
-        print(f"\n📦 [{i}/{len(obj_files)}] Processando: {filename}")
+def process_obj_file(filename):
+    """Limpa a cena, importa, converte e exporta um .obj; devolve o status {file, ok, seconds[, error]}."""
+    start = time.perf_counter()
+    status = {"file": filename, "ok": False}
+    try:
         filepath = os.path.join(input_folder, filename)
 
         # Limpa a cena
@@ -515,15 +608,108 @@ def batch_process_objs():
         imported_objs = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
         if not imported_objs:
             print(f"⚠️ Nenhum objeto Mesh encontrado em {filename}. Ignorando.")
-            continue
+            status["error"] = "nenhum Mesh"
+        else:
+            obj = imported_objs[0]  # Apenas o primeiro Mesh
+            process_obj(obj)
+
+            # Exporta o resultado para pasta de saída
+            out_filename = os.path.splitext(filename)[0] + "_gta.obj"  # ou .ydr/.ybn
+            out_filepath = os.path.join(output_folder, out_filename)
+            save_as_gta(out_filepath)
+            status["ok"] = True
+    except Exception as e:
+        print(f"❌ Erro ao processar {filename}: {e}")
+        status["error"] = str(e)
+    status["seconds"] = round(time.perf_counter() - start, 2)
+    return status
 
-        obj = imported_objs[0]  # Apenas o primeiro Mesh
-        process_obj(obj)
+def process_obj_files(obj_files):
+    """Processa os arquivos em sequência neste Blender; devolve a lista de status."""
+    print(f"🔄 Iniciando processamento de {len(obj_files)} arquivos...")
+    statuses = []
+    for i, filename in enumerate(obj_files, start=1):
+        print(f"\n📦 [{i}/{len(obj_files)}] Processando: {filename}")
+        statuses.append(process_obj_file(filename))
+    return statuses
+
+def partition_obj_files(obj_files, workers):
+    """Divide os arquivos em `workers` listas de tamanho total parecido (maior primeiro, no mais leve)."""
+    sizes = {f: os.path.getsize(os.path.join(input_folder, f)) for f in obj_files}
+    shards = [[] for _ in range(max(1, min(workers, len(obj_files))))]
+    load = [0] * len(shards)
+    for f in sorted(obj_files, key=lambda f: -sizes[f]):
+        k = load.index(min(load))
+        shards[k].append(f)
+        load[k] += sizes[f]
+    return shards
+
+def batch_process_objs_parallel(obj_files, workers):
+    """
+    Divide os .obj entre `workers` Blenders headless (este script com
+    worker_files=...). Cada worker exporta os seus assets em output_folder
+    e grava um relatório; aqui os relatórios viram batch_convert_report.json.
+    """
+    os.makedirs(WORKER_DIR, exist_ok=True)
+    jobs = []
+    for i, files in enumerate(partition_obj_files(obj_files, workers)):
+        list_path = os.path.join(WORKER_DIR, f"worker_{i}.json")
+        report_path = os.path.join(WORKER_DIR, f"worker_{i}_report.json")
+        if os.path.exists(report_path):
+            os.remove(report_path)
+        with open(list_path, "w", encoding="utf-8") as f:
+            json.dump({"files": files, "report": report_path}, f, indent=2)
+        jobs.append({
+            "name": f"worker_{i}",
+            "cmd": blender_command(os.path.abspath(__file__), format_args({"worker_files": list_path}),
+                                   blender=bpy.app.binary_path),
+            "log": os.path.join(WORKER_DIR, f"worker_{i}.log"),
+            "files": files,
+            "report": report_path,
+        })
+
+    results, wall = run_jobs(jobs, len(jobs), label="worker")
+    print_summary(results, wall, label="worker")
+
+    statuses = []
+    for job, res in zip(jobs, results):
+        if os.path.exists(job["report"]):
+            with open(job["report"], "r", encoding="utf-8") as f:
+                statuses += json.load(f)
+        else:
+            # worker caiu antes do relatório: os arquivos dele contam como falha
+            statuses += [{"file": name, "ok": False, "error": f"worker sem relatório (veja {res['log']})"}
+                         for name in job["files"]]
+    return statuses, wall
+
+def batch_process_objs():
+    """Carrega e processa todos os .obj da pasta (em paralelo com workers=N)"""
+    if WORKER_FILES:
+        with open(WORKER_FILES, "r", encoding="utf-8") as f:
+            job = json.load(f)
+        statuses = process_obj_files(job["files"])
+        with open(job["report"], "w", encoding="utf-8") as f:
+            json.dump(statuses, f, indent=2)
+        print(f"\n✅ Worker: {sum(s['ok'] for s in statuses)}/{len(statuses)} arquivos processados.")
+        return
+
+    obj_files = [f for f in os.listdir(input_folder) if f.lower().endswith('.obj')]
+    if not obj_files:
+        print("❌ Nenhum arquivo .obj encontrado na pasta.")
+        return
+
+    if WORKERS > 1 and len(obj_files) > 1:
+        statuses, wall = batch_process_objs_parallel(obj_files, WORKERS)
+        report_path = os.path.join(output_folder, "batch_convert_report.json")
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"wall_seconds": round(wall, 2), "workers": WORKERS, "files": statuses}, f, indent=2)
+        failed = [s for s in statuses if not s["ok"]]
+        for s in failed:
+            print(f"  ❌ {s['file']}: {s.get('error', '?')}")
+        print(f"\n✅ {len(statuses) - len(failed)}/{len(statuses)} arquivos processados. Relatório: {report_path}")
+        return
 
-        # Exporta o resultado para pasta de saída
-        out_filename = os.path.splitext(filename)[0] + "_gta.obj"  # ou .ydr/.ybn
-        out_filepath = os.path.join(output_folder, out_filename)
-        save_as_gta(out_filepath)
+    process_obj_files(obj_files)
 
     print("\n✅ Todos os arquivos processados.")
 
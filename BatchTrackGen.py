@@ -0,0 +1,138 @@
+"""
+Gera várias pistas em paralelo: um processo Blender headless (TrackGen.py) por seed/preset.
+
+Uso (fora do Blender):
+  python BatchTrackGen.py seeds=1-20 map_prefix=track workers=8 [blender=...] [OUTPUT_BASE=...] [args do TrackGen...]
+  python BatchTrackGen.py jobs_file=jobs.json workers=8 [preset=base.toml]
+jobs_file: lista JSON de dicts com os args de cada pista, ex.: [{"seed": 3, "blocks": 80}, ...]
+Todo argumento que não é do batch é repassado a todas as pistas (ex.: blocks=120 chunked=1).
+Cada pista é validada aqui antes de abrir qualquer Blender e vai para o
+worker como um preset.json na pasta da pista (linha de comando curta).
+"""
+import json
+import os
+import sys
+
+from blender_workers import blender_command, format_args, print_summary, run_jobs
+from trackgen_core.config import ConfigError, get_arg, load_config, load_preset
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACKGEN_SCRIPT = os.path.join(SCRIPT_DIR, "TrackGen.py")
+
+# argumentos consumidos pelo batch (não vão para o TrackGen)
+BATCH_KEYS = ("seeds", "jobs_file", "map_prefix", "workers", "blender")
+
+
+def parse_seeds(text):
+    """'1-4,10,12' -> [1, 2, 3, 4, 10, 12]"""
+    seeds = []
+    for part in str(text).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            a, b = part.split("-", 1)
+            seeds += list(range(int(a), int(b) + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+
+def passthrough_args(argv):
+    """Args 'k=v' da linha de comando que não pertencem ao batch."""
+    out = {}
+    for a in argv[1:]:
+        if "=" not in a:
+            continue
+        k, v = a.split("=", 1)
+        k = k.lstrip("-")
+        if k not in BATCH_KEYS:
+            out[k] = v.strip().strip('"').strip("'")
+    return out
+
+
+def build_track_jobs(argv=None):
+    """Lista de dicts de args (um por pista), cada um com seed e MAP_NAME próprios."""
+    argv = sys.argv if argv is None else argv
+    common = {}
+    cli = passthrough_args(argv)
+    for path in [p for p in cli.pop("preset", "").split(",") if p]:
+        common.update(load_preset(path))
+    common.update(cli)
+    prefix = get_arg("map_prefix", common.get("MAP_NAME", "tracks"), str, argv)
+
+    jobs_file = get_arg("jobs_file", None, str, argv)
+    if jobs_file:
+        with open(jobs_file, "r", encoding="utf-8") as f:
+            presets = json.load(f)
+    else:
+        presets = [{"seed": s} for s in parse_seeds(get_arg("seeds", "1", str, argv))]
+
+    tracks = []
+    for i, preset in enumerate(presets):
+        params = dict(common)
+        params.update(preset)
+        params.setdefault("seed", i + 1)
+        if "MAP_NAME" not in preset:
+            params["MAP_NAME"] = f"{prefix}_{params['seed']}"
+        tracks.append(params)
+    return tracks
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    workers = get_arg("workers", os.cpu_count() or 1, int, argv)
+    blender = get_arg("blender", None, str, argv)
+    tracks = build_track_jobs(argv)
+    if not tracks:
+        print("⚠️ Nenhuma pista para gerar.")
+        return 0
+
+    # valida tudo antes de abrir qualquer Blender
+    configs, errors = [], []
+    for params in tracks:
+        try:
+            configs.append(load_config([], presets=[params]))
+        except ConfigError as e:
+            errors.append(f"{params.get('MAP_NAME')}: {e}")
+    if errors:
+        print("❌ Pistas com configuração inválida (nada foi gerado):")
+        for err in errors:
+            print("  " + err.replace("\n", "\n  "))
+        return 2
+
+    output_base = configs[0].OUTPUT_BASE
+    jobs = []
+    for params, cfg in zip(tracks, configs):
+        out_dir = os.path.join(cfg.OUTPUT_BASE, cfg.MAP_NAME)
+        preset_path = os.path.abspath(os.path.join(out_dir, "preset.json"))
+        os.makedirs(out_dir, exist_ok=True)
+        with open(preset_path, "w", encoding="utf-8") as f:
+            json.dump(params, f, indent=2)
+        jobs.append({
+            "name": cfg.MAP_NAME,
+            "cmd": blender_command(TRACKGEN_SCRIPT, format_args({"preset": preset_path}), blender=blender),
+            "log": os.path.join(out_dir, "trackgen.log"),
+            "cwd": SCRIPT_DIR,
+            "params": params,
+            "config_hash": cfg.digest(),
+        })
+
+    results, wall = run_jobs(jobs, workers, label="pista")
+    print_summary(results, wall, label="pista")
+
+    report_path = os.path.abspath(os.path.join(output_base, "batch_report.json"))
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "wall_seconds": round(wall, 2),
+            "workers": workers,
+            "jobs": [dict(r, params=job["params"], config_hash=job["config_hash"]) for r, job in zip(results, jobs)],
+        }, f, indent=2)
+    print(f"💾 Relatório: {report_path}")
+
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
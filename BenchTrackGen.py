@@ -0,0 +1,238 @@
+"""
+Benchmark sintético dos estágios do núcleo em vários tamanhos de pista (Python puro, sem Blender).
+
+Uso:
+  python BenchTrackGen.py [sizes=50,500,5000] [seed=1] [repeat=3] [out=bench_results.json]
+                          [baseline=bench_baseline.json] [save_baseline=1] [tolerance=1.5] [args do TrackGen...]
+Cada tamanho roda programa, frames, seções varridas, pós-processamento, prédios,
+obstáculos, quadras, split, trechos e dados de jogo com seed fixa; guarda o
+melhor tempo de `repeat` execuções e os tamanhos de saída. Com baseline,
+compara: estágio mais lento que tolerance x o baseline falha (código 1);
+saídas diferentes só avisam. Também estima o expoente de crescimento de cada
+estágio entre tamanhos (≈1 linear, ≈2 quadrático).
+"""
+import io
+import json
+import math
+import os
+import platform
+import sys
+
+from trackgen_core import (
+    PerfRecorder, TrackStages, concat_buffers, face_centers, partition_faces, split_buffers,
+    postprocess_buffers, track_components, iter_chunks, spawn_records, checkpoint_records, lod_levels,
+    GameDataRegistry,
+)
+from trackgen_core.config import ConfigError, get_arg, load_config
+
+# argumentos consumidos pelo benchmark (não vão para a configuração)
+BENCH_KEYS = ("sizes", "seed", "repeat", "out", "baseline", "save_baseline", "tolerance")
+
+# diferenças abaixo disso (s) são ruído e nunca contam como regressão
+NOISE_FLOOR_S = 0.02
+# expoente de crescimento acima disso é sinalizado como superlinear
+SCALING_WARN = 1.4
+
+
+def config_args(argv):
+    """Args 'k=v' que não são do benchmark (vão para load_config)."""
+    out = {}
+    for a in argv[1:]:
+        if "=" not in a:
+            continue
+        k, v = a.split("=", 1)
+        k = k.lstrip("-")
+        if k not in BENCH_KEYS:
+            out[k] = v.strip().strip('"').strip("'")
+    return out
+
+
+def run_stages(cfg, perf):
+    """Roda todos os estágios uma vez e devolve os tamanhos de saída."""
+    stages = TrackStages(cfg)
+    with perf.stage("program"):
+        program = stages.program
+    with perf.stage("frames"):
+        frames = stages.frames
+
+    sweeps = []
+    with perf.stage("sweeps"):
+        sweeps.append(stages.sweep("road"))
+        if cfg.BARRIERS:
+            sweeps += [stages.sweep("barrier", -1), stages.sweep("barrier", 1)]
+        if cfg.BUILD_PAD_ENABLE:
+            sweeps += [stages.sweep("buildpad", -1), stages.sweep("buildpad", 1)]
+        if cfg.TUNNEL_ENABLE:
+            sweeps.append(stages.sweep("tunnel"))
+    with perf.stage("postprocess"):
+        for buf in sweeps:
+            postprocess_buffers(buf, cfg.MERGE_DIST, cfg.AUTO_SMOOTH_ANGLE_DEG, winding=False)
+
+    batches = []
+    with perf.stage("buildings"):
+        if cfg.BUILDINGS_ENABLE:
+            if cfg.BUILD_SIDE_L: batches += [(b, "building") for b in stages.buildings(-1)]
+            if cfg.BUILD_SIDE_R: batches += [(b, "building") for b in stages.buildings(1)]
+    with perf.stage("obstacles"):
+        if cfg.OBSTACLES_ENABLE:
+            batches.append((stages.obstacles(), "obstacle"))
+    with perf.stage("block_areas"):
+        if cfg.BLOCK_AREAS_ENABLE:
+            batches += [(batch, material) for _, batch, material, _ in stages.block_areas()]
+
+    with perf.stage("split"):
+        joined = concat_buffers(sweeps + [b.buffers(m) for b, m in batches if len(b)])
+        part_of = partition_faces(face_centers(joined), joined.loops, joined.sizes,
+                                  cfg.VERTEX_LIMIT, cfg.LOD_LIMIT)
+        parts = [len(p.verts) for _, _, p in split_buffers(joined, part_of)]
+
+    with perf.stage("chunks"):
+        comp_sweeps, comp_boxes, _ = track_components(stages)
+        chunks = sum(1 for _ in iter_chunks(frames, comp_sweeps, comp_boxes, cfg.VERTEX_LIMIT, cfg.CHUNK_LEN,
+                                            lod_levels(cfg)))
+
+    with perf.stage("game_data"):
+        game_data = GameDataRegistry()
+        if cfg.SPAWN_ENABLE:
+            game_data.add_spawns(spawn_records(cfg, frames[0]))
+        if cfg.CHECKPOINTS_ENABLE:
+            game_data.add_checkpoints(checkpoint_records(cfg, frames))
+        game_data.set_track(frames, cfg.TRACK_ARC_STEP)
+        out, out_bin = io.StringIO(), io.BytesIO()
+        game_data.write_json(out)
+        game_data.write_binary(out_bin, max(cfg.CHECKPOINT_SPACING, 1.0), cfg.TRACK_ARC_STEP)
+
+    return {
+        "steps": len(program),
+        "frames": len(frames),
+        "verts": int(len(joined.verts)),
+        "faces": int(len(joined)),
+        "boxes": int(sum(len(b) for b, _ in batches)),
+        "parts": len(parts),
+        "max_part_verts": max(parts, default=0),
+        "chunks": chunks,
+        "checkpoints": len(game_data.checkpoints),
+        "game_data_bytes": len(out.getvalue()),
+        "game_data_bin_bytes": len(out_bin.getvalue()),
+    }
+
+
+def bench_size(blocks, seed, repeat, extra):
+    cfg = load_config([], presets=[dict(extra, blocks=blocks, seed=seed, cache=0, perf=0)])
+    best, outputs, rss = {}, None, None
+    for _ in range(max(1, repeat)):
+        perf = PerfRecorder()
+        outputs = run_stages(cfg, perf)
+        for name, t in perf.totals().items():
+            best[name] = min(best.get(name, math.inf), t["wall_s"])
+        rss = perf.report()["peak_rss_mb"]
+    return {"stages": best, "total_s": round(sum(best.values()), 4), "outputs": outputs, "peak_rss_mb": rss}
+
+
+def scaling(results):
+    """Expoente de crescimento t ~ n^k de cada estágio entre tamanhos consecutivos."""
+    sizes = sorted(results, key=int)
+    out = {}
+    for a, b in zip(sizes, sizes[1:]):
+        ra, rb = results[a], results[b]
+        na, nb = ra["outputs"]["frames"], rb["outputs"]["frames"]
+        exps = {}
+        for name, ta in ra["stages"].items():
+            tb = rb["stages"].get(name)
+            if tb is None or ta < 1e-3 or nb <= na:
+                continue
+            exps[name] = round(math.log(tb / ta) / math.log(nb / na), 2)
+        out[f"{a}->{b}"] = exps
+    return out
+
+
+def compare(results, baseline, tolerance):
+    """Lista (regressões, avisos) de results contra o baseline."""
+    regressions, warnings = [], []
+    for size, res in results.items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            warnings.append(f"blocks={size}: sem baseline")
+            continue
+        for name, t in res["stages"].items():
+            b = base["stages"].get(name)
+            if b is not None and t > b * tolerance and t - b > NOISE_FLOOR_S:
+                regressions.append(f"blocks={size} {name}: {t:.3f}s vs {b:.3f}s ({t / max(b, 1e-9):.1f}x)")
+        for key, v in res["outputs"].items():
+            if base["outputs"].get(key, v) != v:
+                warnings.append(f"blocks={size} {key}: {v} (baseline {base['outputs'][key]})")
+    return regressions, warnings
+
+
+def print_table(results):
+    sizes = sorted(results, key=int)
+    names = list(results[sizes[0]]["stages"])
+    print("\n" + "estágio".ljust(14) + "".join(f"{'blocks=' + s:>14}" for s in sizes))
+    for name in names + ["total"]:
+        row = name.ljust(14)
+        for s in sizes:
+            t = results[s]["total_s"] if name == "total" else results[s]["stages"].get(name, 0.0)
+            row += f"{t:>13.3f}s"
+        print(row)
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    sizes = [int(s) for s in get_arg("sizes", "50,500,5000", str, argv).split(",") if s.strip()]
+    seed = get_arg("seed", 1, int, argv)
+    repeat = get_arg("repeat", 3, int, argv)
+    out_path = get_arg("out", "bench_results.json", str, argv)
+    baseline_path = get_arg("baseline", "bench_baseline.json", str, argv)
+    save_baseline = get_arg("save_baseline", 0, int, argv) == 1
+    tolerance = get_arg("tolerance", 1.5, float, argv)
+    extra = config_args(argv)
+
+    results = {}
+    try:
+        for blocks in sizes:
+            print(f"⏱️ blocks={blocks} (seed {seed}, {repeat}x)...")
+            sys.stdout.flush()
+            results[str(blocks)] = bench_size(blocks, seed, repeat, extra)
+    except ConfigError as e:
+        print(f"❌ {e}")
+        return 2
+
+    print_table(results)
+    report = {
+        "meta": {"seed": seed, "repeat": repeat, "args": extra,
+                 "python": platform.python_version(), "platform": platform.platform()},
+        "sizes": results,
+        "scaling": scaling(results),
+    }
+    for step, exps in report["scaling"].items():
+        for name, k in exps.items():
+            if k > SCALING_WARN:
+                print(f"⚠️ {name} cresce ~n^{k} em {step}")
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Resultados: {os.path.abspath(out_path)}")
+
+    if save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline salvo: {os.path.abspath(baseline_path)}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"ℹ️ Sem baseline em {baseline_path} (gere com save_baseline=1).")
+        return 0
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions, warnings = compare(results, baseline, tolerance)
+    for w in warnings:
+        print(f"⚠️ {w}")
+    for r in regressions:
+        print(f"❌ Regressão: {r}")
+    if not regressions:
+        print(f"✅ Nenhum estágio mais lento que {tolerance}x o baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
-import bpy, bmesh, math, random, sys, os
+import bpy, bmesh, math, sys, os, time
+import numpy as np
 from mathutils import Vector, Matrix
 from PIL import Image
 import json
+import pickle
 
 # Caminho do Sollumz
 sollumz_path = r"C:\Users\vigus\AppData\Roaming\Blender Foundation\Blender\4.3\extensions\user_default"
@@ -12,38 +14,53 @@ if sollumz_path not in sys.path:
 else:
     print("✅ Caminho do Sollumz já presente.")
 
+# Núcleo sem Blender (pasta trackgen_core ao lado deste script)
+trackgen_path = os.path.dirname(os.path.abspath(__file__))
+
+if trackgen_path not in sys.path:
+    sys.path.append(trackgen_path)
+
+from trackgen_core import (
+    ConfigError, load_config, MeshBuffers, BoxBatch, box_buffers,
+    spawn_records, checkpoint_records, track_components, iter_chunks,
+    partition_faces, face_centers, split_buffers,
+    StageCache, TrackStages, code_fingerprint, GameDataRegistry,
+    postprocess_buffers, consistent_winding, PerfRecorder,
+    LOD_LEVEL_NAMES, lod_levels, lod_distances, bounding_radius, align_materials, cluster_lods,
+    COLLISION_SWEEP_MATERIALS, BOX_COLLISION_MATERIALS, collision_sweep_indices, collision_sweeps,
+    collision_buffers, box_primitives, take_primitives, primitives_by_frame, assign_points, assign_faces,
+    palette_atlas, palette_slots,
+)
+from trackgen_core.config import parse_argv
+from blender_workers import blender_command, format_args, print_summary, run_jobs
+
 # =========================
 # CLI ARGS (opcional)
 # =========================
-def get_arg(k, default=None, cast=str):
-    for a in sys.argv:
-        if a.startswith("--" + k + "=") or a.startswith(k + "="):
-            try:
-                v = a.split("=", 1)[1].strip().strip('"').strip("'")
-                return cast(v)
-            except Exception:
-                return default
-    return default
+# todos os parâmetros vêm de trackgen_core.config (cfg do núcleo, presets
+# com preset=arquivo.json/.toml); o script lê tudo como CFG.NOME
+try:
+    CFG = load_config()
+except ConfigError as e:
+    print(f"❌ {e}")
+    sys.exit(1)
+print(f"📦 [ARGS] config {CFG.digest()[:12]}")
 
 
-
-MAP_NAME = get_arg("MAP_NAME", "tracks", str)
 # raiz padrão (pode vir do argumento OUTPUT_PATH)
-OUTPUT_ROOT = os.path.abspath("D:/TrackGen/output/" + MAP_NAME)
+OUTPUT_ROOT = os.path.abspath(os.path.join(CFG.OUTPUT_BASE, CFG.MAP_NAME))
 OUTPUT_PATH = os.path.join(OUTPUT_ROOT, "track_data.json")
 OUTPUT_DIR = os.path.dirname(OUTPUT_PATH)
 os.makedirs(OUTPUT_ROOT, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 OUTPUT_GTA_FILES = os.path.join(OUTPUT_ROOT, "output_gta")
 os.makedirs(OUTPUT_GTA_FILES, exist_ok=True)
-LOD_LIMIT = get_arg("LOD_LIMIT", 200.0, float)
-VERTEX_LIMIT = get_arg("VERTEX_LIMIT", 32767, int)
 # 📁 Caminhos de entrada e saída definidos via CMD ou padrão
 #input_folder = OUTPUT_DIR
 output_folder = os.path.join(OUTPUT_DIR, "splits_output")
 
 os.makedirs(output_folder, exist_ok=True)
-print(f"📦 [ARGS] MAP_NAME={MAP_NAME}")
+print(f"📦 [ARGS] MAP_NAME={CFG.MAP_NAME}")
 print(f"📦 [ARGS] input_folder={OUTPUT_DIR}")
 print(f"📦 [ARGS] output_folder={output_folder}")
 
@@ -52,242 +69,32 @@ output_texture_path = os.path.join(OUTPUT_DIR, "transparent_material.png")
 texture_dir = os.path.join(OUTPUT_DIR, "textures")
 os.makedirs(texture_dir, exist_ok=True)
 
-print(f"📦 [ARGS] OUTPUT_PATH={OUTPUT_PATH}, LOD_LIMIT={LOD_LIMIT}, VERTEX_LIMIT={VERTEX_LIMIT}")
-
-SEED                   = get_arg("seed", 1, int)
-NUM_BLOCKS             = get_arg("blocks", 50, int)
-STEP_LEN               = get_arg("step", 2.0, float)       # passo ao longo do traçado (m)
-BASE_ROAD_WIDTH        = get_arg("road_w", 56.0, float)     # largura base (m)
-SHOULDER_WIDTH_BASE    = get_arg("shoulder_w", 0.6, float) # acostamento base (m)
-ROAD_THICKNESS         = get_arg("road_t", 1.40, float)    # espessura (m)
-
-ROAD_MAT_COLOR      = (
-    get_arg("road_r", 0.5, float),
-    get_arg("road_g", 0.4, float),
-    get_arg("road_b", 0.1, float),
-    1.0,
-)
+print(f"📦 [ARGS] OUTPUT_PATH={OUTPUT_PATH}, LOD_LIMIT={CFG.LOD_LIMIT}, VERTEX_LIMIT={CFG.VERTEX_LIMIT}")
 
-# Barreiras (podem desligar com barriers=0)
-BARRIERS               = get_arg("barriers", 1, int) == 1
-BARRIER_HEIGHT         = get_arg("barrier_h", 1.6, float)
-BARRIER_THICKNESS      = get_arg("barrier_t", 0.40, float)
-BARRIER_OFFSET         = get_arg("barrier_off", 0.0, float)  # afastamento extra do bordo
-
-BARRIER_MAT_COLOR      = (
-    get_arg("barrier_r", 0.1, float),
-    get_arg("barrier_g", 0.1, float),
-    get_arg("barrier_b", 0.1, float),
-    1.0,
-)
+# instrumentação por estágio -> perf_report.json (ao lado do track_data.json)
+PERF = PerfRecorder(enabled=CFG.PERF_REPORT, trace_memory=CFG.PERF_TRACE_MEMORY)
 
-# túnel invisível entre barreiras
-TUNNEL_ENABLE      = get_arg("tunnel", 0, int) == 1       # ativa ou não
-TUNNEL_HEIGHT      = get_arg("tunnel_h", 10.0, float)      # altura do túnel
-TUNNEL_THICKNESS   = get_arg("tunnel_t", 0.40, float)     # espessura das paredes
-TUNNEL_HAS_ROOF    = get_arg("tunnel_roof", 1, int) == 1  # gera teto
-TUNNEL_ROOF_THICK  = get_arg("roof_t", 0.40, float)       # espessura do teto
-TUNNEL_VISIBLE     = get_arg("tunnel_visible", 0, int) == 1  # se 1, gera material visível (pra debug)
-
-
-# Dinâmica
-TARGET_SPEED           = get_arg("v_ms", 45.0, float)  # velocidade alvo (m/s) ~ 162 km/h
-BANK_MAX_DEG           = get_arg("bank_max", 10.0, float)
-BANK_SMOOTH            = get_arg("bank_smooth", 0.25, float)  # 0..1 filtro exp
-WIDTH_CURV_FACT        = get_arg("w_curv", 0.10, float)       # intensidade da variação de largura (0..~0.5)
-PITCH_SMOOTH           = get_arg("pitch_smooth", 0.06, float) # suavização de pitch (0..1)
-
-# Pós
-MERGE_DIST             = get_arg("merge", 0.0001, float)
-AUTO_SMOOTH_ANGLE_DEG  = get_arg("smooth_angle", 60.0, float)
-
-# Piso lateral (área para prédios)
-BUILD_PAD_ENABLE   = get_arg("pads", 1, int) == 1
-BUILD_PAD_WIDTH    = get_arg("pad_w", 50.0, float)   # largura lateral (metros)
-BUILD_PAD_HEIGHT   = get_arg("pad_h", 0.2, float)   # espessura do piso
-BUILD_PAD_OFFSET   = get_arg("pad_off", 0.0, float) # distância extra após barreira
-
-BUILD_PAD_MAT_COLOR      = (
-    get_arg("buildpad_r", 0.1, float),
-    get_arg("buildpad_g", 0.6, float),
-    get_arg("buildpad_b", 0.6, float),
-    1.0,
-)
+# cache de estágios: programa/frames/componentes no núcleo, splits e assets aqui
+STAGE_CACHE = StageCache(CFG.CACHE_DIR, CFG.CACHE_MAX_MB * 2**20, salt=code_fingerprint()) if CFG.CACHE else None
+STAGES = TrackStages(CFG, STAGE_CACHE, adapter_salt=code_fingerprint([os.path.abspath(__file__)]))
+if STAGE_CACHE is not None:
+    print(f"📦 [ARGS] CACHE_DIR={CFG.CACHE_DIR} (máx. {CFG.CACHE_MAX_MB:.0f} MB)")
 
-# prédios (blocos simples)
-BUILDINGS_ENABLE      = get_arg("buildings", 1, int) == 1
-BUILD_SIDE_L          = get_arg("build_L", 1, int) == 1  # gerar lado esquerdo
-BUILD_SIDE_R          = get_arg("build_R", 1, int) == 1  # gerar lado direito
-BUILD_DENSITY_M       = get_arg("build_step", 10.0, float)  # distância entre tentativas (m)
-BUILD_PROB            = get_arg("build_prob", 0.85, float)  # chance de colocar prédio em cada tentativa
-BUILD_MAT_COLOR      = (
-    get_arg("build_r", 0.0, float),
-    get_arg("build_g", 0.1, float),
-    get_arg("build_b", 0.6, float),
-    1.0,
-)
+# LODs de cada split: nome -> {"lods": [MeshBuffers médio/baixo/muito baixo], "radius": m}
+SPLIT_LODS = {}
+# colisão simplificada de cada split: nome -> MeshBuffers (sem isso a colisão é cópia do visual)
+SPLIT_COLLISION = {}
+# prédios/obstáculos de cada split como primitivas de caixa: nome -> dict de box_primitives
+SPLIT_COLLISION_BOXES = {}
 
-# múltiplas fileiras de prédios
-BUILD_ROWS           = get_arg("build_rows", 2, int)     # quantas fileiras por lado
-ROW_SPACING          = get_arg("row_spacing", 20.0, float) # distância entre fileiras (m)
-ROW_HEIGHT_VARIATION = get_arg("row_h_var", 0.4, float)  # variação de altura por fileira (fator 0..1)
-
-
-# tamanhos (metros)
-BUILD_W_MIN           = get_arg("b_w_min", 4.0, float)   # largura (eixo right)
-BUILD_W_MAX           = get_arg("b_w_max", 12.0, float)
-BUILD_D_MIN           = get_arg("b_d_min", 5.0, float)   # profundidade (eixo forward)
-BUILD_D_MAX           = get_arg("b_d_max", 18.0, float)
-BUILD_H_MIN           = get_arg("b_h_min", 6.0, float)   # altura (eixo up)
-BUILD_H_MAX           = get_arg("b_h_max", 58.0, float)
-
-# recuos e ajustes
-BUILD_SETBACK         = get_arg("b_setback", 10.0, float)   # recuo a partir da borda EXTERNA do pad
-BUILD_JITTER_R        = get_arg("b_jit_r", 0.8, float)     # aleatório lateral (m)
-BUILD_JITTER_F        = get_arg("b_jit_f", 0.8, float)     # aleatório ao longo (m)
-
-# orientação dos prédios
-BUILD_ALIGN_WORLD = get_arg("build_align_world", 1, int) == 1  # 1 = reto (up global), 0 = segue inclinação local
-
-# =====================================================
-#  O B S T Á C U L O S   (PILARES / BARREIRAS / POSTES)
-# =====================================================
-
-# =====================================================
-#  O B S T Á C U L O S   (PILARES / BARREIRAS / POSTES)
-# =====================================================
-
-OBSTACLES_ENABLE        = get_arg("obstacles", 1, int) == 1
-
-# densidade e posicionamento
-OBSTACLE_STEP_BASE      = get_arg("obs_step", 20.0, float)
-OBSTACLE_STEP_CURVE     = get_arg("obs_step_curve", 12.0, float)
-OBSTACLE_PROB           = get_arg("obs_prob", 0.7, float)
-
-# dimensões
-OBSTACLE_W_MIN          = get_arg("obs_w_min", 0.6, float)
-OBSTACLE_W_MAX          = get_arg("obs_w_max", 2.0, float)
-OBSTACLE_D_MIN          = get_arg("obs_d_min", 0.6, float)
-OBSTACLE_D_MAX          = get_arg("obs_d_max", 2.5, float)
-OBSTACLE_H_MIN          = get_arg("obs_h_min", 3.0, float)
-OBSTACLE_H_MAX          = get_arg("obs_h_max", 10.0, float)
-
-# variações e rotação
-OBSTACLE_ROT_VARIATION  = get_arg("obs_rot_var", 10.0, float)
-OBSTACLE_TILT_VARIATION = get_arg("obs_tilt_var", 4.0, float)
-OBSTACLE_UP_OFFSET      = get_arg("obs_up_off", 0.0, float)
-OBSTACLE_ALIGN_WORLD    = get_arg("obs_align_world", 1, int) == 1
-
-# modos de posição lateral
-# 1=centro, 2=alternado, 3=duplo, 4=aleatório
-OBSTACLE_MODE           = get_arg("obs_mode", 2, int)
-OBSTACLE_OFFSET_SIDE    = get_arg("obs_side_off", 4.0, float)
-OBSTACLE_REVERSE        = get_arg("obs_reverse", 0, int) == 1
-
-# agrupamento
-OBSTACLE_GROUP_SIZE     = get_arg("obs_group_size", 1, int)
-OBSTACLE_GROUP_SPACING  = get_arg("obs_group_spacing", 2.5, float)
-
-# densidade adaptativa
-OBSTACLE_CURVE_ONLY     = get_arg("obs_curve_only", 0, int) == 1
-OBSTACLE_STEP_MULT_CURV = get_arg("obs_step_mult_curv", 0.6, float)  # curva = step_base * mult
-OBSTACLE_BANK_THRESHOLD = get_arg("obs_bank_thr", 2.5, float)  # threshold pra detectar curva
-
-# restrições e zonas
-OBSTACLE_SKIP_TUNNEL    = get_arg("obs_skip_tunnel", 1, int) == 1
-OBSTACLE_TUNNEL_MODE    = get_arg("obs_tunnel_mode", 0, int) == 1  # gera dentro do túnel (pendurado ou lateral)
-OBSTACLE_TUNNEL_HANG    = get_arg("obs_tunnel_hang", 0, int) == 1  # se 1, pendura no teto
-
-# formatos
-# 1=pilar, 2=parede, 3=arco, 4=viga cruzada, 5=caixa sólida
-OBSTACLE_TEMPLATE_MODE  = get_arg("obs_template", 2, int)
-
-# deslocamento lateral aleatório dos obstáculos
-OBSTACLE_SIDE_JITTER = get_arg("obs_side_jit", 14.0, float)  # variação lateral máxima (m)
-OBSTACLE_JITTER_MODE = get_arg("obs_jit_mode", 2, int)      # 1=normal (bidirecional), 2=só para fora, 3=só para dentro
-
-
-# aparência e debug
-OBSTACLE_MAT_COLOR      = (
-    get_arg("obs_r", 1.0, float),
-    get_arg("obs_g", 0.35, float),
-    get_arg("obs_b", 0.1, float),
-    1.0,
-)
+# âncoras, spawns e checkpoints para o track_data (registrados ao serem criados)
+GAME_DATA = GameDataRegistry()
 
-# =====================================================
-#  Q U A D R A S   I N I C I A I S  /  F I N A I S
-# =====================================================
-
-BLOCK_AREAS_ENABLE     = get_arg("block_areas", 1, int) == 1
-BLOCK_START_ENABLE     = get_arg("block_start", 1, int) == 1
-BLOCK_END_ENABLE       = get_arg("block_end", 1, int) == 1
-
-# dimensões da quadra
-BLOCK_LENGTH           = get_arg("block_len", 80.0, float)    # comprimento (m)
-BLOCK_WIDTH            = get_arg("block_wid", 120.0, float)   # largura (m)
-BLOCK_BUILD_HEIGHT     = get_arg("block_bh", 40.0, float)     # altura média dos prédios
-BLOCK_BUILD_SPACING    = get_arg("block_spacing", 20.0, float)# espaçamento entre prédios
-BLOCK_BUILD_DENSITY    = get_arg("block_density", 0.9, float) # chance de cada prédio aparecer
-
-# barreiras invisíveis
-BLOCK_BARRIERS         = get_arg("block_barriers", 1, int) == 1
-BLOCK_BARRIER_HEIGHT   = get_arg("block_barrier_h", 10.0, float)
-BLOCK_BARRIER_THICK    = get_arg("block_barrier_t", 0.5, float)
-BLOCK_BARRIER_VISIBLE  = get_arg("block_barrier_visible", 0, int) == 1
-
-# piso da quadra
-BLOCK_FLOOR_HEIGHT     = get_arg("block_floor_h", 1.0, float)   # espessura do piso da quadra
-BLOCK_FLOOR_VISIBLE    = get_arg("block_floor_vis", 1, int) == 1
-BLOCK_FLOOR_MAT_COLOR  = (
-    get_arg("block_floor_r", 0.05, float),
-    get_arg("block_floor_g", 0.05, float),
-    get_arg("block_floor_b", 0.05, float),
-    1.0,
-)
-
-# barreira início/fim com configs independentes
-BLOCK_START_BARRIER_VISIBLE = get_arg("block_start_barrier_vis", 1, int) == 1
-BLOCK_START_BARRIER_HEIGHT  = get_arg("block_start_barrier_h", 12.0, float)
-BLOCK_START_BARRIER_THICK   = get_arg("block_start_barrier_t", 0.6, float)
-
-BLOCK_END_BARRIER_VISIBLE   = get_arg("block_end_barrier_vis", 1, int) == 1
-BLOCK_END_BARRIER_HEIGHT    = get_arg("block_end_barrier_h", 12.0, float)
-BLOCK_END_BARRIER_THICK     = get_arg("block_end_barrier_t", 0.6, float)
-
-BLOCK_BARRIER_OFFSET_START = get_arg("block_barrier_off_start", 0.0, float)  # distância da quadra até a pista (m)
-BLOCK_BARRIER_OFFSET_END   = get_arg("block_barrier_off_end", 0.0, float)
-
-# =====================================================
-#  S P A W N   P O I N T S   I N I C I A I S
-# =====================================================
-
-SPAWN_ENABLE          = get_arg("spawn_enable", 1, int) == 1
-SPAWN_ROWS            = get_arg("spawn_rows", 2, int)     # número de filas (em profundidade)
-SPAWN_PER_ROW         = get_arg("spawn_per_row", 4, int)  # quantos jogadores/veículos por fila
-SPAWN_SPACING_X       = get_arg("spawn_spacing_x", 5.0, float)  # distância lateral (entre veículos)
-SPAWN_SPACING_Y       = get_arg("spawn_spacing_y", 7.0, float)  # distância entre filas
-SPAWN_OFFSET_FORWARD  = get_arg("spawn_offset_fwd", 10.0, float) # distância do início da pista
-SPAWN_OFFSET_UP       = get_arg("spawn_offset_up", 1.0, float)   # altura do empty acima da pista
-SPAWN_EMPTY_SIZE      = get_arg("spawn_empty_size", 1.2, float)  # tamanho visual dos empties
-
-# =====================================================
-#  C H E C K P O I N T S   &   R E S P A W N S
-# =====================================================
-
-CHECKPOINTS_ENABLE       = get_arg("checkpoints_enable", 1, int) == 1
-CHECKPOINT_COUNT          = get_arg("checkpoint_count", 5, int)   # número total de checkpoints
-CHECKPOINT_SPACING        = get_arg("checkpoint_spacing", 200.0, float)  # distância entre checkpoints
-CHECKPOINT_OFFSET_UP      = get_arg("checkpoint_up", 1.0, float)
-CHECKPOINT_RESPAWN_ROWS   = get_arg("respawn_rows", 2, int)
-CHECKPOINT_RESPAWN_COLS   = get_arg("respawn_cols", 3, int)
-CHECKPOINT_RESPAWN_SPACING_X = get_arg("respawn_spacing_x", 5.0, float)
-CHECKPOINT_RESPAWN_SPACING_Y = get_arg("respawn_spacing_y", 8.0, float)
-CHECKPOINT_RESPAWN_OFFSET_FWD = get_arg("respawn_off_fwd", 8.0, float)
-CHECKPOINT_EMPTY_SIZE     = get_arg("checkpoint_empty_size", 1.2, float)
-
-
-random.seed(SEED)
+# atlas de paleta (atlas=1): nome do material de cor -> UV da célula, e o material único
+PALETTE = {}
+PALETTE_MAT = None
+# nome que o Sollumz dá ao 1º mapa UV (uv_maps_add_missing não cria outro por cima)
+PALETTE_UV_MAP = "UVMap 0"
 
 def create_simple_mat(name, rgba):
     """
@@ -330,372 +137,98 @@ def create_simple_mat(name, rgba):
 
 
 
-MAT_BARRIER = create_simple_mat("mat_barrier", BARRIER_MAT_COLOR)
-MAT_BUILDING = create_simple_mat("mat_building", BUILD_MAT_COLOR)
-MAT_ROAD = create_simple_mat("mat_road", ROAD_MAT_COLOR)
-MAT_BUILDPAD = create_simple_mat("mat_buildpad", BUILD_PAD_MAT_COLOR)
+MAT_BARRIER = create_simple_mat("mat_barrier", CFG.BARRIER_MAT_COLOR)
+MAT_BUILDING = create_simple_mat("mat_building", CFG.BUILD_MAT_COLOR)
+MAT_ROAD = create_simple_mat("mat_road", CFG.ROAD_MAT_COLOR)
+MAT_BUILDPAD = create_simple_mat("mat_buildpad", CFG.BUILD_PAD_MAT_COLOR)
 MAT_TUNNEL = create_simple_mat("mat_tunnel_debug", (1, 0, 0, 0.0))
 MAT_BLOCK_BARRIER = create_simple_mat("mat_block_barrier", (0.8, 0.0, 0.0, 0.0))
-MAT_BLOCK_FLOOR = create_simple_mat("mat_block_floor", BLOCK_FLOOR_MAT_COLOR)
-MAT_OBSTACLE = create_simple_mat("mat_obstacle", OBSTACLE_MAT_COLOR)
-
+MAT_BLOCK_FLOOR = create_simple_mat("mat_block_floor", CFG.BLOCK_FLOOR_MAT_COLOR)
+MAT_OBSTACLE = create_simple_mat("mat_obstacle", CFG.OBSTACLE_MAT_COLOR)
+
+# chaves de material usadas pelo núcleo -> materiais do Blender
+MATERIALS = {
+    "road": MAT_ROAD,
+    "barrier": MAT_BARRIER,
+    "buildpad": MAT_BUILDPAD,
+    "tunnel": MAT_TUNNEL,
+    "building": MAT_BUILDING,
+    "obstacle": MAT_OBSTACLE,
+    "block_floor": MAT_BLOCK_FLOOR,
+    "block_barrier": MAT_BLOCK_BARRIER,
+}
 
-import bmesh
 
 def add_box_oriented(collection, center, right, forward, up, size_r, size_f, size_u, name="Building"):
     """
     Cria um paralelepípedo orientado com winding consistente em todos os eixos.
     As normais sempre apontam para fora, mesmo em sistemas canhotos.
+    (Objeto próprio — para muitas caixas use BoxBatch.)
     """
-    mesh = bpy.data.meshes.new(name)
-    obj  = bpy.data.objects.new(name, mesh)
-    collection.objects.link(obj)
+    batch = BoxBatch()
+    batch.add(center, right, forward, up, size_r, size_f, size_u)
+    return object_from_buffers(collection, name, batch.buffers())
 
-    bm = bmesh.new()
-    hx, hy, hz = size_r * 0.5, size_f * 0.5, size_u * 0.5
-
-    ex = right.normalized() * hx
-    ey = forward.normalized() * hy
-    ez = up.normalized() * hz
-
-    # Detecta se sistema é canhoto
-    det = right.cross(forward).dot(up)
-    left_handed = det < 0
-
-    corners = []
-    for sx in (-1, 1):
-        for sy in (-1, 1):
-            for sz in (-1, 1):
-                v = center + ex*sx + ey*sy + ez*sz
-                corners.append(bm.verts.new(v))
-    bm.verts.ensure_lookup_table()
-
-    def idx(sx, sy, sz):
-        return (0 if sx==-1 else 4) + (0 if sy==-1 else 2) + (0 if sz==-1 else 1)
-
-    def make_face(a,b,c,d, want_dir):
-        vs = [corners[a], corners[b], corners[c], corners[d]]
-        n = (vs[1].co - vs[0].co).cross(vs[2].co - vs[0].co)
-        if n.dot(want_dir) < 0:
-            vs = [vs[0], vs[3], vs[2], vs[1]]
-        bm.faces.new(vs)
-
-    # Faces com normais desejadas
-    make_face(idx( 1,-1,-1), idx( 1,-1, 1), idx( 1, 1, 1), idx( 1, 1,-1),  right)   # +X
-    make_face(idx(-1, 1,-1), idx(-1, 1, 1), idx(-1,-1, 1), idx(-1,-1,-1), -right)  # -X
-    make_face(idx(-1, 1,-1), idx( 1, 1,-1), idx( 1, 1, 1), idx(-1, 1, 1),  forward) # +Y
-    make_face(idx( 1,-1,-1), idx(-1,-1,-1), idx(-1,-1, 1), idx( 1,-1, 1), -forward) # -Y
-    make_face(idx(-1,-1, 1), idx( 1,-1, 1), idx( 1, 1, 1), idx(-1, 1, 1),  up)      # +Z
-    make_face(idx(-1, 1,-1), idx( 1, 1,-1), idx( 1,-1,-1), idx(-1,-1,-1), -up)      # -Z
-
-    bm.normal_update()
-    bm.to_mesh(mesh)
-    bm.free()
-    return obj
-
-
-# =========================
-# BLOCO PROCEDURAL
-# =========================
-
-def block_straight(L=40.0):
-    steps = max(1, int(L/STEP_LEN))
-    for i in range(steps):
-        t = (i+1)/steps
-        yield 0.0, 0.0, STEP_LEN  # yawΔ, pitchΔ, ds
-
-def block_curve(angle_deg=30.0, radius=60.0, left=True, ease_type="sin"):
-    """
-    Gera passos de curva com easing suave.
-    ease_type: "sin" (padrão) ou "cos" etc. Mantém yaw_step crescendo e decrescendo.
-    """
-    arc = math.radians(abs(angle_deg)) * max(radius, 1e-6)
-    steps = max(1, int(arc / STEP_LEN))
-    yaw_total = angle_deg
-    for i in range(steps):
-        u = (i + 0.5) / steps  # 0..1
-        if ease_type == "sin":
-            ease = math.sin(u * math.pi)    # sin: 0->1->0 (suave)
-        else:
-            # fallback: cos ease-in-out
-            ease = 0.5 - 0.5 * math.cos(u * math.pi)
-        # yaw_step em graus (soma aproximada será < yaw_total; mas forma é mais suave)
-        yaw_step = (yaw_total / steps) * ease
-        if not left:
-            yaw_step = -yaw_step
-        yield yaw_step, 0.0, STEP_LEN
-
-def block_grade(L=40.0, dz=8.0):
-    steps = max(1, int(L/STEP_LEN))
-    pitch_total = math.degrees(math.atan2(dz, L))
-    for i in range(steps):
-        u = (i+0.5)/steps
-        ease = 0.5 - 0.5*math.cos(u*math.pi)  # cos-ease-in-out
-        dpitch = (pitch_total/steps) * ease
-        yield 0.0, dpitch, STEP_LEN
-
-def random_block():
-    t = random.choices(["S","CL","CR","U","D"], weights=[4,2,2,1,1])[0]
-    if t == "S":
-        return list(block_straight(L=random.uniform(30,60)))
-    if t == "CL":
-        return list(block_curve(angle_deg=random.choice([15,25,35]), radius=random.uniform(50,90), left=True))
-    if t == "CR":
-        return list(block_curve(angle_deg=random.choice([15,25,35]), radius=random.uniform(50,90), left=False))
-    if t == "U":
-        return list(block_grade(L=random.uniform(35,55), dz=random.uniform(6,12)))
-    return list(block_grade(L=random.uniform(35,55), dz=-random.uniform(6,12)))
-
-def program_from_blocks(n):
-    prog = []
-    for _ in range(n):
-        prog += random_block()
-    return prog
-
-# =========================
-# FRAMES COM SUAVIZAÇÃO
-# =========================
-
-def frames_from_program(program):
-    """
-    Integra posição e orientação (yaw/pitch), calcula forward/right/up.
-    Banking alvo ~ atan(v^2/(r*g)) com clamp e filtro exponencial.
-    Largura varia com curvatura (agora usando radianos corretamente).
-    Adiciona suavização vertical (Z_SMOOTH) e clamp de dpitch por passo.
-    """
-    g = 9.81
-    pos = Vector((0, 0, 0))
-    yaw = 0.0
-    pitch = 0.0
-    bank_curr = 0.0
-    s_accum = 0.0
-
-    up_axis = Vector((0, 0, 1))
-    frames = []
-
-    # parâmetros de segurança/suavização (ajuste conforme preferir)
-    Z_SMOOTH = 0.6                     # 0..1 suaviza pos.z (maior = mais suave)
-    MAX_DPITCH_DEG_PER_STEP = 1.8     # limita variação de pitch por passo (graus)
-    # (sugestões de alteração de defaults)
-    # PITCH_SMOOTH = 0.08  # considere reduzir no call de get_arg se quiser ainda mais suave
-
-    for (dyaw, dpitch, ds) in program:
-        # clamp dpitch por step (evita picos)
-        if dpitch > MAX_DPITCH_DEG_PER_STEP:
-            dpitch = MAX_DPITCH_DEG_PER_STEP
-        elif dpitch < -MAX_DPITCH_DEG_PER_STEP:
-            dpitch = -MAX_DPITCH_DEG_PER_STEP
-
-        # target pitch depois do incremento local
-        target_pitch = pitch + dpitch
-        # suaviza pitch por LERP explícito
-        pitch = (1.0 - PITCH_SMOOTH) * pitch + PITCH_SMOOTH * target_pitch
-
-        # direção sem roll (usa yaw atual; atualizamos yaw no final)
-        cy, sy = math.cos(math.radians(yaw)), math.sin(math.radians(yaw))
-        cp, sp = math.cos(math.radians(pitch)), math.sin(math.radians(pitch))
-        forward = Vector((cy * cp, sy * cp, sp)).normalized()
-        right = forward.cross(up_axis).normalized()
-        upv = right.cross(forward).normalized()
-
-        # curvatura corrigida (usar radianos por metro)
-        curvature = abs(math.radians(dyaw)) / max(ds, 1e-6)   # rad/m
-        r = 1.0 / max(curvature, 1e-6)
-
-        # banking alvo (mais realista por usar radianos)
-        bank_target = math.degrees(math.atan(min(1.0, (TARGET_SPEED ** 2) / (max(r, 1.0) * g))))
-        bank_target = max(-BANK_MAX_DEG, min(BANK_MAX_DEG, bank_target)) * (1 if dyaw >= 0 else -1)
-
-        # suaviza banking
-        bank_curr = (1.0 - BANK_SMOOTH) * bank_curr + BANK_SMOOTH * bank_target
-
-        # aplica roll ao par (right, up)
-        m_roll = Matrix.Rotation(math.radians(bank_curr), 4, forward)
-        right = (m_roll @ right).normalized()
-        upv = (m_roll @ upv).normalized()
-
-        # ajusta largura por curvatura (menos sensível porque curvature está em rad/m)
-        width_factor = 1.0 - WIDTH_CURV_FACT * min(1.0, curvature * STEP_LEN * 4.0)
-        road_w = BASE_ROAD_WIDTH * max(0.7, width_factor)
-        shoulder_w = SHOULDER_WIDTH_BASE * (0.8 + 0.4 * width_factor)
-
-        # integrar posição (raw)
-        raw_pos = pos + forward * ds
-        s_accum += ds
-
-        # suavizar somente a componente Z para reduzir lombadas
-        new_z = (1.0 - Z_SMOOTH) * pos.z + Z_SMOOTH * raw_pos.z
-        pos = Vector((raw_pos.x, raw_pos.y, new_z))
-
-        frames.append({
-            "s": s_accum,
-            "pos": pos.copy(),
-            "fwd": forward.copy(),
-            "right": right.copy(),
-            "up": upv.copy(),
-            "bank_deg": bank_curr,
-            "road_w": road_w,
-            "shoulder_w": shoulder_w
-        })
-
-        # atualiza yaw para próximo passo
-        yaw += dyaw
-
-    return frames
 
 # =========================
 # CONSTRUÇÃO DE MALHAS
 # =========================
 
-def face_safe(bm, vs):
-    try: bm.faces.new(vs)
-    except: pass
-
-# --- helper robusto de winding/normal ---
-def face_with_normal(bm, vs, want_dir=None):
+def mesh_from_buffers(name, buf):
     """
-    Cria quad com winding consistente. Se want_dir for dado,
-    calcula normal (v0,v1,v2) e inverte a ordem se necessário.
+    Cria um Mesh a partir de MeshBuffers via foreach_set (sem bmesh).
+    Materiais: chave de MATERIALS ou nome em bpy.data.materials.
     """
-    try:
-        if want_dir is not None and len(vs) >= 3:
-            n = (vs[1].co - vs[0].co).cross(vs[2].co - vs[0].co)
-            # se a normal estiver oposta ao que queremos, invertimos o quad
-            if n.dot(want_dir) < 0:
-                vs = [vs[0], vs[3], vs[2], vs[1]]
-        bm.faces.new(vs)
-    except:
-        pass
-
-
-def build_block_area(center, forward, right, up, collection, name="BlockArea"):
-    """
-    Gera uma quadra com um piso sólido e prédios nas bordas.
-    """
-    half_w = BLOCK_WIDTH * 0.5
-    half_l = BLOCK_LENGTH * 0.5
-
-    # piso da quadra
-    floor_center = center - up * (BLOCK_FLOOR_HEIGHT / 2)
-    floor = add_box_oriented(
-        collection, floor_center, right, forward, up,
-        BLOCK_WIDTH, BLOCK_LENGTH, BLOCK_FLOOR_HEIGHT, name + "_Floor"
-    )
-    try:
-        floor.data.materials.append(MAT_BLOCK_FLOOR)
-    except:
-        pass
-    floor.hide_viewport = not BLOCK_FLOOR_VISIBLE
-    floor.hide_render = not BLOCK_FLOOR_VISIBLE
-
-    # grade de prédios
-    nx = int(BLOCK_WIDTH / BLOCK_BUILD_SPACING)
-    nz = int(BLOCK_LENGTH / BLOCK_BUILD_SPACING)
-
-    for ix in range(-nx//2, nx//2 + 1):
-        for iz in range(-nz//2, nz//2 + 1):
-            if random.random() > BLOCK_BUILD_DENSITY:
-                continue
-
-            offset_r = right * (ix * BLOCK_BUILD_SPACING)
-            offset_f = forward * (iz * BLOCK_BUILD_SPACING)
-            pos = center + offset_r + offset_f
-
-            # só gera prédios nas bordas
-            if abs(ix) < nx//2 - 1 and abs(iz) < nz//2 - 1:
-                continue
-
-            h = random.uniform(BLOCK_BUILD_HEIGHT * 0.6, BLOCK_BUILD_HEIGHT * 1.2)
-            w = random.uniform(6.0, 12.0)
-            d = random.uniform(6.0, 12.0)
-            pos += up * (h/2)
-
-            obj = add_box_oriented(collection, pos, right, forward, up, w, d, h, f"{name}_B{ix}_{iz}")
-            try:
-                obj.data.materials.append(MAT_BUILDING)
-            except:
-                pass
-
-    return floor
-
-def build_block_barrier(center, forward, right, up, collection, is_start=True, name="Barrier_Custom"):
-    """
-    Cria barreiras de início/fim com configurações específicas.
-    """
-    forward = forward.normalized()
-    right = right.normalized()
-    up = up.normalized()
-
-    if is_start:
-        height = BLOCK_START_BARRIER_HEIGHT
-        thick = BLOCK_START_BARRIER_THICK
-        visible = BLOCK_START_BARRIER_VISIBLE
-        offset = BLOCK_BARRIER_OFFSET_START
-    else:
-        height = BLOCK_END_BARRIER_HEIGHT
-        thick = BLOCK_END_BARRIER_THICK
-        visible = BLOCK_END_BARRIER_VISIBLE
-        offset = BLOCK_BARRIER_OFFSET_END
-
-    # move a barreira para dentro, na direção da pista
-    center = center + forward * offset
-
     mesh = bpy.data.meshes.new(name)
+    starts = np.cumsum(buf.sizes) - buf.sizes
+
+    mesh.vertices.add(len(buf.verts))
+    mesh.vertices.foreach_set("co", buf.verts.astype(np.float32).ravel())
+    mesh.loops.add(len(buf.loops))
+    mesh.loops.foreach_set("vertex_index", buf.loops.astype(np.int32))
+    mesh.polygons.add(len(buf.sizes))
+    mesh.polygons.foreach_set("loop_start", starts.astype(np.int32))
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", buf.sizes.astype(np.int32))
+    mesh.polygons.foreach_set("material_index", buf.mats.astype(np.int32))
+    mesh.polygons.foreach_set("use_smooth", buf.smooth)
+
+    for key in buf.materials:
+        mesh.materials.append(MATERIALS.get(key) or bpy.data.materials.get(key))
+
+    mesh.update(calc_edges=True)
+    if buf.normals is not None:
+        set_auto_smooth(mesh)
+        mesh.normals_split_custom_set(buf.normals.tolist())
+    return mesh
+
+
+def object_from_buffers(collection, name, buf):
+    """Cria Mesh + Object a partir de MeshBuffers e linka na coleção."""
+    mesh = mesh_from_buffers(name, buf)
     obj = bpy.data.objects.new(name, mesh)
     collection.objects.link(obj)
-    bm = bmesh.new()
-
-    # usa largura da estrada, não da quadra
-    half_w = BASE_ROAD_WIDTH * 0.5
-    # posições
-    pBL = center - right * half_w
-    pBR = center + right * half_w
-    pTL = pBL + up * height
-    pTR = pBR + up * height
-    pOBL = pBL - forward * thick
-    pOBR = pBR - forward * thick
-    pOTL = pTL - forward * thick
-    pOTR = pTR - forward * thick
-
-    # vértices
-    vBL = bm.verts.new(pBL)
-    vBR = bm.verts.new(pBR)
-    vTL = bm.verts.new(pTL)
-    vTR = bm.verts.new(pTR)
-    vOBL = bm.verts.new(pOBL)
-    vOBR = bm.verts.new(pOBR)
-    vOTL = bm.verts.new(pOTL)
-    vOTR = bm.verts.new(pOTR)
-
-    bm.verts.ensure_lookup_table()
-
-    def make_face(vs, want_dir):
-        try:
-            n = (vs[1].co - vs[0].co).cross(vs[2].co - vs[0].co)
-            if n.dot(want_dir) < 0:
-                vs = [vs[0], vs[3], vs[2], vs[1]]
-            bm.faces.new(vs)
-        except:
-            pass
-
-    # faces com normais corretas
-    make_face([vBL, vBR, vTR, vTL],  up)       # frente (voltada para cima da estrada)
-    make_face([vOBL, vOTL, vOTR, vOBR], -forward)  # traseira
-    make_face([vBL, vTL, vOTL, vOBL], -right)  # lado esquerdo
-    make_face([vBR, vOBR, vOTR, vTR],  right)  # lado direito
-    make_face([vTL, vTR, vOTR, vOTL],  up)     # topo
-    make_face([vBL, vOBL, vOBR, vBR], -up)     # base
+    return obj
 
 
-    bm.to_mesh(mesh)
-    bm.free()
+def emit_boxes(collection, name, batch, material=None):
+    """Cria um único objeto com todas as caixas do BoxBatch (None se vazio)."""
+    if not len(batch):
+        return None
+    return object_from_buffers(collection, name, batch.buffers(material))
 
-    if visible:
-        obj.data.materials.append(MAT_BLOCK_BARRIER)
-    obj.hide_viewport = not visible
-    obj.hide_render = not visible
 
-    return obj
+def build_block_areas(stages, collection):
+    """Cria um objeto por item de place_block_areas (ocultos quando invisíveis)."""
+    objs = []
+    for name, batch, material, visible in stages.block_areas():
+        obj = emit_boxes(collection, name, batch, material)
+        if obj is None:
+            continue
+        obj.hide_viewport = not visible
+        obj.hide_render = not visible
+        objs.append(obj)
+    return objs
 
 
 def build_invisible_barrier(center, forward, right, up, collection, name="InvisibleBarrier"):
@@ -708,14 +241,14 @@ def build_invisible_barrier(center, forward, right, up, collection, name="Invisi
     right   = right.normalized()
     up      = up.normalized()
 
-    half_w = BLOCK_WIDTH * 0.5
-    thick  = BLOCK_BARRIER_THICK
+    half_w = CFG.BLOCK_WIDTH * 0.5
+    thick  = CFG.BLOCK_BARRIER_THICK
 
     # ---- POSIÇÕES (Vector) ----
     pBL = center - right * half_w
     pBR = center + right * half_w
-    pTL = pBL + up * BLOCK_BARRIER_HEIGHT
-    pTR = pBR + up * BLOCK_BARRIER_HEIGHT
+    pTL = pBL + up * CFG.BLOCK_BARRIER_HEIGHT
+    pTR = pBR + up * CFG.BLOCK_BARRIER_HEIGHT
 
     # desloca para trás/à frente usando apenas Vectors (nada de BMVert aqui)
     pOUT_BL = pBL - forward * thick
@@ -766,293 +299,41 @@ def build_invisible_barrier(center, forward, right, up, collection, name="Invisi
     bm.to_mesh(mesh)
     bm.free()
 
-    if BLOCK_BARRIER_VISIBLE:
+    if CFG.BLOCK_BARRIER_VISIBLE:
         try:
             obj.data.materials.append(MAT_BLOCK_BARRIER)
         except:
             pass
-    obj.hide_viewport = not BLOCK_BARRIER_VISIBLE
-    obj.hide_render   = not BLOCK_BARRIER_VISIBLE
-
-    return obj
-
-
-def build_road(frames, collection):
-    mesh = bpy.data.meshes.new("RoadMesh")
-    obj  = bpy.data.objects.new("RoadMesh", mesh)
-    collection.objects.link(obj)
-    bm = bmesh.new()
-
-    TL, TR, BL, BR = [], [], [], []
-    Rs, Us, Fs = [], [], []  # guarda vetores por frame
-
-    half_t = ROAD_THICKNESS * 0.5
-
-    for f in frames:
-        pos   = f["pos"]
-        right = f["right"].normalized()
-        up    = f["up"].normalized()
-        fwd   = f["fwd"].normalized()
-
-        # bordas esquerda/direita
-        left  = -right
-        wL = (f["road_w"]*0.5 + f["shoulder_w"])
-        wR = (f["road_w"]*0.5 + f["shoulder_w"])
-
-        TL.append(bm.verts.new(pos + left*wL  + up*half_t))
-        TR.append(bm.verts.new(pos + right*wR + up*half_t))
-        BL.append(bm.verts.new(pos + left*wL  - up*half_t))
-        BR.append(bm.verts.new(pos + right*wR - up*half_t))
-
-        Rs.append(right); Us.append(up); Fs.append(fwd)
-
-    # faces entre segmentos (usa want_dir por face)
-    for i in range(len(frames)-1):
-        up_i    = Us[i]
-        right_i = Rs[i]
-        fwd_i   = Fs[i]
-
-        # topo: +up
-        face_with_normal(bm, [TL[i], TR[i], TR[i+1], TL[i+1]], want_dir= up_i)
-        # base: -up
-        face_with_normal(bm, [BL[i], BR[i], BR[i+1], BL[i+1]], want_dir=-up_i)
-
-        # lateral esquerda (externa): -right
-        face_with_normal(bm, [TL[i], TL[i+1], BL[i+1], BL[i]],  want_dir=-right_i)
-        # lateral direita (externa): +right
-        face_with_normal(bm, [BR[i], BR[i+1], TR[i+1], TR[i]],  want_dir= right_i)
-
-    # caps (se existirem)
-    if TL:
-        # cap inicial: -fwd
-        face_with_normal(bm, [BL[0], BR[0], TR[0], TL[0]], want_dir= -Fs[0])
-        # cap final: +fwd
-        n = len(TL)-1
-        face_with_normal(bm, [TL[n], TR[n], BR[n], BL[n]], want_dir=  Fs[n])
+    obj.hide_viewport = not CFG.BLOCK_BARRIER_VISIBLE
+    obj.hide_render   = not CFG.BLOCK_BARRIER_VISIBLE
 
-    bm.normal_update()
-    bm.to_mesh(mesh)
-    bm.free()
-    try:
-        obj.data.materials.append(MAT_ROAD)
-    except:
-        pass
     return obj
 
 
+def build_road(stages, collection):
+    buf = finish_buffers(stages.sweep("road"))
+    return object_from_buffers(collection, "RoadMesh", buf)
 
-def build_barrier(frames, collection, side=1):
-    mesh = bpy.data.meshes.new(f"Barrier_{'R' if side==1 else 'L'}")
-    obj  = bpy.data.objects.new(mesh.name, mesh)
-    collection.objects.link(obj)
-    bm = bmesh.new()
-
-    quads = []
-    for f in frames:
-        # vetores normalizados do frame
-        pos   = f["pos"]
-        right = f["right"].normalized()
-        up    = f["up"].normalized()
-        fwd   = f["fwd"].normalized()
-
-        edge_off = (f["road_w"]*0.5 + f["shoulder_w"] + BARRIER_OFFSET)
-
-        base_c = pos + right*(edge_off*side) + up*(ROAD_THICKNESS/2)
-        tdir   = right*(BARRIER_THICKNESS*side)
-
-        # seção (BL, BR, TR, TL)
-        BL = bm.verts.new(base_c)
-        BR = bm.verts.new(base_c + tdir)
-        TL = bm.verts.new(base_c + up*BARRIER_HEIGHT)
-        TR = bm.verts.new(base_c + tdir + up*BARRIER_HEIGHT)
 
-        # guardamos também os vetores desse frame p/ “want_dir”
-        quads.append((BL, BR, TR, TL, right, up, fwd))
+def build_barrier(stages, collection, side=1):
+    buf = finish_buffers(stages.sweep("barrier", side))
+    return object_from_buffers(collection, f"Barrier_{'R' if side==1 else 'L'}", buf)
 
-    for i in range(len(quads)-1):
-        a0,a1,a2,a3, ar, au, af = quads[i]
-        b0,b1,b2,b3, br, bu, bf = quads[i+1]
-
-        # base (queremos normal para baixo: -up)
-        face_with_normal(bm, [a0, a1, b1, b0], want_dir = -au)
-        # topo (queremos normal para cima: +up)
-        face_with_normal(bm, [a3, a2, b2, b3], want_dir =  au)
-
-        # face externa (lado de fora da rua) → +right * side
-        face_with_normal(bm, [a1, a2, b2, b1], want_dir =  ar * side)
-        # face interna (voltada para a pista)  → -right * side
-        face_with_normal(bm, [a0, b0, b3, a3], want_dir = -ar * side)
-
-    # tampas (início/fim), se existir pelo menos uma seção
-    if quads:
-        a0,a1,a2,a3, ar, au, af = quads[0]
-        # tampa inicial (voltada para trás): -forward
-        face_with_normal(bm, [a3, a2, a1, a0], want_dir = -af)
-
-        b0,b1,b2,b3, br, bu, bf = quads[-1]
-        # tampa final (voltada para frente): +forward
-        face_with_normal(bm, [b0, b1, b2, b3], want_dir =  bf)
-
-    bm.normal_update()
-    bm.to_mesh(mesh)
-    bm.free()
-
-    try:
-        obj.data.materials.append(MAT_BARRIER)
-    except:
-        pass
-    return obj
 
+def build_buildpad(stages, collection, side=1):
+    buf = finish_buffers(stages.sweep("buildpad", side))
+    return object_from_buffers(collection, f"BuildPad_{'R' if side==1 else 'L'}", buf)
 
 
-def build_buildpad(frames, collection, side=1):
-    mesh = bpy.data.meshes.new(f"BuildPad_{'R' if side==1 else 'L'}")
-    obj  = bpy.data.objects.new(mesh.name, mesh)
-    collection.objects.link(obj)
-    bm = bmesh.new()
-
-    quads = []
-    for f in frames:
-        pos, right, up = f["pos"], f["right"], f["up"]
-        edge_off = (f["road_w"]*0.5 + f["shoulder_w"]
-                    + BARRIER_OFFSET + BARRIER_THICKNESS + BUILD_PAD_OFFSET)
-        base_c = pos + right*(edge_off*side) + up*(ROAD_THICKNESS/2)
-        pad_dir = right*(BUILD_PAD_WIDTH*side)
-
-        BL = bm.verts.new(base_c)
-        BR = bm.verts.new(base_c + pad_dir)
-        TL = bm.verts.new(base_c + up*BUILD_PAD_HEIGHT)
-        TR = bm.verts.new(base_c + pad_dir + up*BUILD_PAD_HEIGHT)
-        quads.append((BL,BR,TR,TL))
-
-    for i in range(len(quads)-1):
-        a0,a1,a2,a3 = quads[i]
-        b0,b1,b2,b3 = quads[i+1]
-
-        if side == 1:
-            # lado direito (sentido normal)
-            face_safe(bm, [a0,a1,b1,b0])  # base
-            face_safe(bm, [a3,a2,b2,b3])  # topo
-            face_safe(bm, [a1,a2,b2,b1])  # externa
-            face_safe(bm, [a0,b0,b3,a3])  # interna
-        else:
-            # lado esquerdo (espelhar winding)
-            face_safe(bm, [a0,b0,b1,a1])  # base
-            face_safe(bm, [a3,b3,b2,a2])  # topo
-            face_safe(bm, [a1,b1,b2,a2])  # externa
-            face_safe(bm, [a0,a3,b3,b0])  # interna
-
-
-    if quads:
-        a0,a1,a2,a3 = quads[0]
-        if side == 1:
-            bm.faces.new([a3,a2,a1,a0])
-        else:
-            bm.faces.new([a0,a1,a2,a3])
-
-        b0,b1,b2,b3 = quads[-1]
-        if side == 1:
-            bm.faces.new([b0,b1,b2,b3])
-        else:
-            bm.faces.new([b3,b2,b1,b0])
-
-
-    bm.normal_update()
-    bm.to_mesh(mesh)
-    bm.free()
-    try:
-        obj.data.materials.append(MAT_BUILDPAD)
-    except:
-        pass
-    return obj
-
-def build_tunnel(frames, collection):
+def build_tunnel(stages, collection):
     """
     Gera um túnel quadrado/retangular conectando as barreiras,
     garantindo winding consistente (sem depender de recalc normals).
     """
-    mesh = bpy.data.meshes.new("Tunnel")
-    obj  = bpy.data.objects.new("Tunnel", mesh)
-    collection.objects.link(obj)
-    bm = bmesh.new()
-
-    quads = []
-    for f in frames:
-        pos, right, up = f["pos"], f["right"].normalized(), f["up"].normalized()
-        # distância lateral até cada barreira
-        edge_offset = (f["road_w"]*0.5 + f["shoulder_w"] + BARRIER_OFFSET)
-
-        # posições base (centro das paredes esquerda e direita)
-        left_base  = pos - right * (edge_offset + BARRIER_THICKNESS/2)
-        right_base = pos + right * (edge_offset + BARRIER_THICKNESS/2)
-
-        # define topo e base
-        floor_z = ROAD_THICKNESS/2
-        top_z   = floor_z + TUNNEL_HEIGHT
-
-        # espessuras
-        t_thick = TUNNEL_THICKNESS
-        r_thick = TUNNEL_ROOF_THICK  # (usado no teto externo)
-
-        # vértices principais das duas paredes
-        # lado esquerdo (interno = sem deslocamento em -right; externo = -right * t_thick)
-        L_BI = bm.verts.new(left_base + up*floor_z)                 # bottom inner
-        L_TO = bm.verts.new(left_base + up*top_z)                    # top inner
-        L_BE = bm.verts.new(left_base + up*floor_z - right*t_thick)  # bottom external
-        L_TE = bm.verts.new(left_base + up*top_z   - right*t_thick)  # top external
-
-        # lado direito (interno = sem deslocamento; externo = +right * t_thick)
-        R_BI = bm.verts.new(right_base + up*floor_z)
-        R_TO = bm.verts.new(right_base + up*top_z)
-        R_BE = bm.verts.new(right_base + up*floor_z + right*t_thick)
-        R_TE = bm.verts.new(right_base + up*top_z   + right*t_thick)
-
-        quads.append((L_BI,L_TO,L_TE,L_BE,  R_BI,R_TO,R_TE,R_BE,  right, up))
-
-    # faces entre segmentos
-    for i in range(len(quads)-1):
-        a = quads[i]
-        b = quads[i+1]
-        # desempacota + vetores alvo locais (do segmento 'a')
-        L_BI,L_TO,L_TE,L_BE,  R_BI,R_TO,R_TE,R_BE,  right, up = a
-        L_BI2,L_TO2,L_TE2,L_BE2,  R_BI2,R_TO2,R_TE2,R_BE2,  right2, up2 = b
-
-        # --- paredes internas (normais apontando para dentro do túnel) ---
-        # esquerda (queremos +right)
-        face_with_normal(bm, [L_BI, L_TO, L_TO2, L_BI2], want_dir= right)
-        # direita (queremos -right)
-        face_with_normal(bm, [R_BI, R_TO, R_TO2, R_BI2], want_dir=-right)
-
-        # --- paredes externas (normais apontando para fora) ---
-        # esquerda externa (queremos -right)
-        face_with_normal(bm, [L_BE, L_TE, L_TE2, L_BE2], want_dir=-right)
-        # direita externa (queremos +right)
-        face_with_normal(bm, [R_BE, R_TE, R_TE2, R_BE2], want_dir= right)
-
-        # --- teto (se ativado) ---
-        if TUNNEL_HAS_ROOF:
-            # interno (queremos normal para baixo = -up)
-            face_with_normal(bm, [L_TO, R_TO, R_TO2, L_TO2], want_dir=-up)
-            # externo (espessura do teto; queremos normal para cima = +up)
-            face_with_normal(bm, [L_TE, R_TE, R_TE2, L_TE2], want_dir= up)
-
-        # (opcional) pode fechar o piso se quiser um “caixote” completo:
-        # interno do piso (normal para cima = +up):
-        # face_with_normal(bm, [L_BI, R_BI, R_BI2, L_BI2], want_dir= up)
-        # externo do piso (normal para baixo = -up):
-        # face_with_normal(bm, [L_BE, R_BE, R_BE2, L_BE2], want_dir=-up)
-
-    bm.normal_update()
-    bm.to_mesh(mesh)
-    bm.free()
-
-    if TUNNEL_VISIBLE:
-        try:
-            obj.data.materials.append(MAT_TUNNEL)
-        except:
-            pass
-    obj.hide_viewport = not TUNNEL_VISIBLE
-    obj.hide_render   = not TUNNEL_VISIBLE
+    buf = finish_buffers(stages.sweep("tunnel"))
+    obj = object_from_buffers(collection, "Tunnel", buf)
+    obj.hide_viewport = not CFG.TUNNEL_VISIBLE
+    obj.hide_render   = not CFG.TUNNEL_VISIBLE
 
     return obj
 
@@ -1062,291 +343,76 @@ def build_tunnel(frames, collection):
 # UTILIDADES (pós)
 # =========================
 
-def postprocess(obj):
-    # shade smooth
-    try:
-        bpy.context.view_layer.objects.active = obj
-        obj.select_set(True)
-        bpy.ops.object.shade_smooth()
-    except:
-        pass
-
-    mesh = obj.data
+def set_auto_smooth(mesh):
     if hasattr(mesh, "use_auto_smooth"):
         mesh.use_auto_smooth = True
-        mesh.auto_smooth_angle = math.radians(AUTO_SMOOTH_ANGLE_DEG)
-
-    # merge by distance
-    try:
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.remove_doubles(threshold=MERGE_DIST)
-        bpy.ops.object.mode_set(mode='OBJECT')
-    except:
-        try:
-            bpy.ops.object.mode_set(mode='OBJECT')
-        except:
-            pass
-    obj.select_set(False)
-    
-def build_buildings_along_pads(frames, collection, side=1):
-    """
-    Gera prédios em múltiplas fileiras no lado 'side'.
-    Cada fileira fica mais afastada da estrada.
-    """
-    s_next = BUILD_DENSITY_M
-    i = 0
-    while i < len(frames):
-        f = frames[i]
-        if f["s"] >= s_next:
-            if random.random() <= BUILD_PROB:
-                pos     = f["pos"]
-                right   = f["right"]
-                forward = f["fwd"]
-                up      = f["up"]
-
-                # se habilitado, força prédios verticais (up global)
-                if BUILD_ALIGN_WORLD:
-                    up = Vector((0, 0, 1))
-                    # re-ortogonaliza right/forward em torno de up global
-                    forward = Vector((forward.x, forward.y, 0)).normalized()
-                    right = Vector((0,0,1)).cross(forward).normalized()  # up_global × forward
-
-
-
-                # base do pad relativa ao centro da pista
-                edge_to_pad_start = (
-                    f["road_w"]*0.5 +
-                    f["shoulder_w"] +
-                    BARRIER_OFFSET + BARRIER_THICKNESS +
-                    BUILD_PAD_OFFSET
-                )
-
-                pad_half = BUILD_PAD_WIDTH * 0.5
-
-                for row in range(BUILD_ROWS):
-                    # distância lateral até o início da fileira
-                    row_offset = (
-                        edge_to_pad_start +           # até o início do pad
-                        BUILD_SETBACK +               # recuo antes do prédio
-                        (row * ROW_SPACING)           # espaço adicional por fileira
-                    )
-
-                    center_base = (
-                        pos
-                        + right * (row_offset * side)
-                        + up * (ROAD_THICKNESS/2 + BUILD_PAD_HEIGHT)
-                    )
-
-                    jitter_r = (random.random()*2-1) * BUILD_JITTER_R
-                    jitter_f = (random.random()*2-1) * BUILD_JITTER_F
-                    center = center_base + right*(jitter_r*side) + forward*jitter_f
-
-                    w = random.uniform(BUILD_W_MIN, BUILD_W_MAX)
-                    d = random.uniform(BUILD_D_MIN, BUILD_D_MAX)
-                    h_mod = 1.0 + (random.uniform(-ROW_HEIGHT_VARIATION, ROW_HEIGHT_VARIATION) * (row+1))
-                    h = random.uniform(BUILD_H_MIN, BUILD_H_MAX) * h_mod
+        mesh.auto_smooth_angle = math.radians(CFG.AUTO_SMOOTH_ANGLE_DEG)
 
-                    # mantém sistema de coordenadas destro para evitar faces invertidas
-                    right_fixed = right * side
-                    forward_fixed = forward
-                    if side == -1:
-                        forward_fixed = -forward
-
-                    obj = add_box_oriented(collection, center, right_fixed, forward_fixed, up, w, d, h, name=f"Building_r{row}")
-
-                    try:
-                        obj.data.materials.append(MAT_BUILDING)
-                    except:
-                        pass
-            s_next += BUILD_DENSITY_M
-        i += 1
-
-def make_obstacle_form(collection, pos, right, forward, up, w, d, h, mode, name="Obstacle"):
-    """
-    Cria diferentes tipos de obstáculos:
-      1=pilar (retângulo simples)
-      2=parede transversal
-      3=arco (duas colunas + viga superior)
-      4=viga cruzada (X)
-      5=caixa sólida
-    """
-    objs = []
-
-    def box(center, w_, d_, h_, label):
-        o = add_box_oriented(collection, center, right, forward, up, w_, d_, h_, label)
-        objs.append(o)
-        return o
-
-    if mode == 1:
-        box(pos, w, d, h, name)
-    elif mode == 2:
-        # parede transversal (longa na largura)
-        box(pos, w * 3, d * 0.5, h, name + "_wall")
-    elif mode == 3:
-        # arco (duas colunas e uma viga)
-        offset = right * (w * 1.2)
-        col_h = h * 0.8
-        col_w = w * 0.4
-        col_d = d * 0.8
-        top_h = h * 0.2
-        box(pos - offset, col_w, col_d, col_h, name + "_L")
-        box(pos + offset, col_w, col_d, col_h, name + "_R")
-        box(pos + up * (col_h - top_h / 2), w * 3, col_d, top_h, name + "_beam")
-    elif mode == 4:
-        # viga cruzada (X)
-        tilt = math.radians(45)
-        for s in (-1, 1):
-            m = Matrix.Rotation(tilt * s, 4, forward)
-            r2 = (m @ right).normalized()
-            box(pos, w, d, h, name + f"_x{s}")
-    elif mode == 5:
-        # caixa sólida (cheia, tipo container)
-        box(pos, w * 1.5, d * 1.5, h, name + "_box")
-
-    for o in objs:
-        try:
-            o.data.materials.append(MAT_OBSTACLE)
-        except:
-            pass
-    return objs
-
-
-def build_obstacles(frames, collection):
+def finish_buffers(buf, winding=False):
     """
-    Gera obstáculos (pilares, paredes, arcos, etc.) ao longo da pista.
-    Possui suporte a curvas, agrupamento e variação procedural.
+    Merge by distance + shade smooth/auto smooth direto nos buffers. Varreduras
+    e caixas já saem com winding certo; winding=True acerta malhas de origem
+    desconhecida.
     """
-    s_next = OBSTACLE_STEP_BASE
-    side_toggle = -1
+    with PERF.stage("postprocess", verts_in=len(buf.verts)) as st:
+        buf = postprocess_buffers(buf, CFG.MERGE_DIST, CFG.AUTO_SMOOTH_ANGLE_DEG, winding)
+        st["verts"], st["faces"] = len(buf.verts), len(buf)
+    return buf
+
+def replace_mesh(obj, buf):
+    """Troca o Mesh do objeto por um novo feito de `buf` (mesmo nome, antigo removido)."""
+    old = obj.data
+    name = old.name
+    obj.data = mesh_from_buffers(name, buf)
+    bpy.data.meshes.remove(old)
+    obj.data.name = name
 
-    for i, f in enumerate(frames):
-        s = f["s"]
-        if s < s_next:
-            continue
+def postprocess(obj):
+    """Mesmo que finish_buffers, para um objeto já na cena (sem operadores nem modo de edição)."""
+    if obj.type != 'MESH':
+        return
+    replace_mesh(obj, finish_buffers(buffers_from_mesh(obj.data), winding=True))
 
-        curvature = abs(f.get("bank_deg", 0.0))
-        is_curve = curvature > OBSTACLE_BANK_THRESHOLD
 
-        if OBSTACLE_CURVE_ONLY and not is_curve:
-            continue
+def build_buildings_along_pads(stages, collection, side=1):
+    """Uma malha por fileira (todas as caixas da fileira em um só objeto)."""
+    side_tag = 'R' if side == 1 else 'L'
+    return [emit_boxes(collection, f"Buildings_{side_tag}_r{row}", batch, "building")
+            for row, batch in enumerate(stages.buildings(side))]
 
-        step_here = OBSTACLE_STEP_BASE
-        if is_curve:
-            step_here *= OBSTACLE_STEP_MULT_CURV
-        s_next += step_here
+def build_obstacles(stages, collection):
+    return emit_boxes(collection, "Obstacles", stages.obstacles(), "obstacle")
 
-        if random.random() > OBSTACLE_PROB:
-            continue
+def create_marker_empty(collection, rec, display_type, size):
+    """Empty de marcação a partir de um registro do núcleo (pos + Euler XYZ)."""
+    empty = bpy.data.objects.new(rec["name"], None)
+    empty.location = rec["pos"]
+    empty.empty_display_size = size
+    empty.empty_display_type = display_type
+    empty.rotation_mode = "XYZ"
+    empty.rotation_euler = rec["rot"]
+    collection.objects.link(empty)
+    return empty
 
-        pos = f["pos"]
-        right = f["right"]
-        forward = f["fwd"]
-        up = f["up"]
-
-        if OBSTACLE_ALIGN_WORLD:
-            up = Vector((0, 0, 1))
-            forward = Vector((forward.x, forward.y, 0)).normalized()
-            right = forward.cross(up).normalized()
-
-        # modos de posicionamento
-        sides_to_spawn = []
-        if OBSTACLE_MODE == 1:
-            sides_to_spawn = [0]
-        elif OBSTACLE_MODE == 2:
-            side_toggle *= -1
-            sides_to_spawn = [side_toggle]
-        elif OBSTACLE_MODE == 3:
-            sides_to_spawn = [-1, 1]
-        elif OBSTACLE_MODE == 4:
-            sides_to_spawn = [random.choice([-1, 0, 1])]
-
-        if OBSTACLE_REVERSE:
-            sides_to_spawn = [-s for s in sides_to_spawn]
-
-        # variação de rotação
-        yaw_rot = math.radians(random.uniform(-OBSTACLE_ROT_VARIATION, OBSTACLE_ROT_VARIATION))
-        tilt_rot = math.radians(random.uniform(-OBSTACLE_TILT_VARIATION, OBSTACLE_TILT_VARIATION))
-
-        m_yaw = Matrix.Rotation(yaw_rot, 4, up)
-        m_tilt = Matrix.Rotation(tilt_rot, 4, right)
-        right_r = (m_yaw @ m_tilt @ right).normalized()
-        forward_r = (m_yaw @ m_tilt @ forward).normalized()
-
-        for side in sides_to_spawn:
-            # deslocamento base + jitter lateral
-            offset = right * (OBSTACLE_OFFSET_SIDE * side)
-
-            # calcula jitter lateral aleatório
-            jitter_val = random.uniform(-OBSTACLE_SIDE_JITTER, OBSTACLE_SIDE_JITTER)
-            if OBSTACLE_JITTER_MODE == 2:  # só para fora
-                jitter_val = abs(jitter_val)
-            elif OBSTACLE_JITTER_MODE == 3:  # só para dentro
-                jitter_val = -abs(jitter_val)
-
-            # aplica jitter no mesmo sentido do lado
-            offset += right * (jitter_val * side if side != 0 else jitter_val)
-
-            base = pos + offset + up * (ROAD_THICKNESS/2 + OBSTACLE_UP_OFFSET)
-
-
-            # múltiplos pilares por grupo
-            for g in range(OBSTACLE_GROUP_SIZE):
-                gpos = base + forward_r * (g * OBSTACLE_GROUP_SPACING)
-
-                # dentro do túnel, se habilitado
-                if OBSTACLE_TUNNEL_MODE:
-                    if OBSTACLE_TUNNEL_HANG:
-                        gpos += up * (TUNNEL_HEIGHT - OBSTACLE_H_MAX/2)
-                    else:
-                        gpos += up * (ROAD_THICKNESS/2)
-                elif OBSTACLE_SKIP_TUNNEL and pos.z < 0:
-                    continue
-
-                w = random.uniform(OBSTACLE_W_MIN, OBSTACLE_W_MAX)
-                d = random.uniform(OBSTACLE_D_MIN, OBSTACLE_D_MAX)
-                h = random.uniform(OBSTACLE_H_MIN, OBSTACLE_H_MAX)
-
-                make_obstacle_form(
-                    collection, gpos, right_r, forward_r, up,
-                    w, d, h, OBSTACLE_TEMPLATE_MODE, f"Obstacle_{i}_s{side}_g{g}"
-                )
 
 def build_spawn_points(start_frame, collection):
     """
     Gera uma formação de empties de spawn no início da pista.
     Agora usando rotação em Euler XYZ.
     """
-    fwd, right, up = start_frame["fwd"], start_frame["right"], start_frame["up"]
-    base_pos = start_frame["pos"] + fwd * SPAWN_OFFSET_FORWARD + up * SPAWN_OFFSET_UP
-
-    total_width = (SPAWN_PER_ROW - 1) * SPAWN_SPACING_X
-    half_width = total_width / 2.0
-
-    for row in range(SPAWN_ROWS):
-        for col in range(SPAWN_PER_ROW):
-            offset_r = right * (col * SPAWN_SPACING_X - half_width)
-            offset_f = fwd * (-row * SPAWN_SPACING_Y)
-            pos = base_pos + offset_r + offset_f
-
-            empty = bpy.data.objects.new(f"Spawn_{row}_{col}", None)
-            empty.location = pos
-            empty.empty_display_size = SPAWN_EMPTY_SIZE
-            empty.empty_display_type = "ARROWS"
-            empty.rotation_mode = "XYZ"
+    records = spawn_records(CFG, start_frame)
+    for rec in records:
+        empty = create_marker_empty(collection, rec, "ARROWS", CFG.SPAWN_EMPTY_SIZE)
 
-            quat = fwd.to_track_quat("Z", "Y")  # antes usado diretamente
-            empty.rotation_euler = quat.to_euler("XYZ")  # converte para Euler
+        # adiciona propriedades customizadas
+        empty["spawn_row"] = rec["row"]
+        empty["spawn_col"] = rec["col"]
+        empty["spawn_index"] = rec["index"]
+        empty["spawn_name"] = rec["spawn_name"]
 
-            collection.objects.link(empty)
-
-            # adiciona propriedades customizadas
-            empty["spawn_row"] = row
-            empty["spawn_col"] = col
-            empty["spawn_index"] = row * SPAWN_PER_ROW + col
-            empty["spawn_name"] = f"spawn_{row}_{col}"
-
-    print(f"[TrackGen] Gerados {SPAWN_ROWS * SPAWN_PER_ROW} spawn points.")
+    GAME_DATA.add_spawns(records)
+    print(f"[TrackGen] Gerados {len(records)} spawn points.")
+    return records
 
 
 def build_checkpoints(frames, collection):
@@ -1354,65 +420,27 @@ def build_checkpoints(frames, collection):
     Gera empties de checkpoint com pontos de respawn próximos.
     Agora usando Euler XYZ em vez de Quaternions.
     """
-    total_frames = len(frames)
-    step = max(1, int(CHECKPOINT_SPACING / (frames[-1]["s"] / total_frames)))
-    checkpoint_id = 0
-
-    for i in range(0, total_frames, step):
-        f = frames[i]
-        pos = f["pos"]
-        fwd = f["fwd"]
-        right = f["right"]
-        up = f["up"]
-
+    records = checkpoint_records(CFG, frames)
+    for rec in records:
         # empty principal do checkpoint
-        chk = bpy.data.objects.new(f"Checkpoint_{checkpoint_id}", None)
-        chk.location = pos + up * CHECKPOINT_OFFSET_UP
-        chk.empty_display_type = "CUBE"
-        chk.empty_display_size = CHECKPOINT_EMPTY_SIZE * 1.5
-        chk.rotation_mode = "XYZ"
-
-        quat = fwd.to_track_quat("Z", "Y")
-        chk.rotation_euler = quat.to_euler("XYZ")
-
-        collection.objects.link(chk)
-        chk["checkpoint_id"] = checkpoint_id
-
-        # gera respawns ao redor
-        base_pos = pos + fwd * CHECKPOINT_RESPAWN_OFFSET_FWD + up * CHECKPOINT_OFFSET_UP
-        total_w = (CHECKPOINT_RESPAWN_COLS - 1) * CHECKPOINT_RESPAWN_SPACING_X
-        half_w = total_w / 2.0
-
-        for r in range(CHECKPOINT_RESPAWN_ROWS):
-            for c in range(CHECKPOINT_RESPAWN_COLS):
-                offset_r = right * (c * CHECKPOINT_RESPAWN_SPACING_X - half_w)
-                offset_f = fwd * (-r * CHECKPOINT_RESPAWN_SPACING_Y)
-                p = base_pos + offset_r + offset_f
-
-                e = bpy.data.objects.new(f"Respawn_{checkpoint_id}_{r}_{c}", None)
-                e.location = p
-                e.empty_display_type = "ARROWS"
-                e.empty_display_size = CHECKPOINT_EMPTY_SIZE
-                e.rotation_mode = "XYZ"
-
-                quat_r = fwd.to_track_quat("Z", "Y")
-                e.rotation_euler = quat_r.to_euler("XYZ")
-
-                collection.objects.link(e)
-
-                # custom props
-                e["checkpoint_id"] = checkpoint_id
-                e["respawn_row"] = r
-                e["respawn_col"] = c
-                e["respawn_index"] = r * CHECKPOINT_RESPAWN_COLS + c
-                e["is_respawn_point"] = True
+        chk = create_marker_empty(collection, rec, "CUBE", CFG.CHECKPOINT_EMPTY_SIZE * 1.5)
+        chk["checkpoint_id"] = rec["id"]
 
-        checkpoint_id += 1
+        # respawns ao redor
+        for r in rec["respawns"]:
+            e = create_marker_empty(collection, r, "ARROWS", CFG.CHECKPOINT_EMPTY_SIZE)
 
-    print(f"[TrackGen] Gerados {checkpoint_id} checkpoints com respawns.")
+            # custom props
+            e["checkpoint_id"] = rec["id"]
+            e["respawn_row"] = r["row"]
+            e["respawn_col"] = r["col"]
+            e["respawn_index"] = r["index"]
+            e["is_respawn_point"] = True
 
+    GAME_DATA.add_checkpoints(records)
+    print(f"[TrackGen] Gerados {len(records)} checkpoints com respawns.")
+    return records
 
-import math
 
 def export_game_data(json_path=None):
     """
@@ -1422,182 +450,289 @@ def export_game_data(json_path=None):
       - checkpoints e respawns
     Tudo em um único arquivo JSON para leitura simples no jogo.
     As rotações são exportadas em GRAUS (Euler XYZ).
+    Lê do GAME_DATA (preenchido na geração e no recentramento), sem varrer a cena;
+    com track_bin=1 grava também o track_data.bin (ver trackgen_core.gamedata).
     """
     if not json_path:
         json_path = os.path.join(OUTPUT_DIR, "track_data.json")
 
-    data = {
-        "meshes": [],
-        "spawn_points": [],
-        "checkpoints": [],
-        "respawns": []
-    }
-
-    def rot_to_deg(euler):
-        return [
-            round(math.degrees(euler.x), 3),
-            round(math.degrees(euler.y), 3),
-            round(math.degrees(euler.z), 3)
-        ]
+    counts = GAME_DATA.save_json(json_path)
+    print(f"💾 Dados exportados para {os.path.abspath(json_path)}")
+    print(f"  {counts['meshes']} meshes, {counts['spawn_points']} spawns, "
+          f"{counts['checkpoints']} checkpoints, {counts['respawns']} respawns.")
 
-    # 1️⃣ Anchors (malhas splittadas)
-    for obj in bpy.data.objects:
-        if obj.type == "MESH" and "_split_" in obj.name:
-            loc = obj.location
-            rot = obj.rotation_euler
-            data["meshes"].append({
-                "name": obj.name,
-                "pos": [round(loc.x, 3), round(loc.y, 3), round(loc.z, 3)],
-                "rot": rot_to_deg(rot)
-            })
-
-    # 2️⃣ Spawn Points
-    for obj in bpy.data.objects:
-        if obj.name.startswith("Spawn_"):
-            loc = obj.location
-            rot = obj.rotation_euler
-            data["spawn_points"].append({
-                "name": obj.name,
-                "pos": [round(loc.x, 3), round(loc.y, 3), round(loc.z, 3)],
-                "rot": rot_to_deg(rot),
-                "row": int(obj.get("spawn_row", 0)),
-                "col": int(obj.get("spawn_col", 0)),
-                "index": int(obj.get("spawn_index", 0))
-            })
-
-    # 3️⃣ Checkpoints + Respawns
-    for obj in bpy.data.objects:
-        if obj.name.startswith("Checkpoint_"):
-            loc = obj.location
-            rot = obj.rotation_euler
-            cid = int(obj.get("checkpoint_id", 0))
-
-            checkpoint_entry = {
-                "id": cid,
-                "name": obj.name,
-                "pos": [round(loc.x, 3), round(loc.y, 3), round(loc.z, 3)],
-                "rot": rot_to_deg(rot),
-                "respawns": []
-            }
-
-            # respawns correspondentes
-            for e in bpy.data.objects:
-                if e.name.startswith(f"Respawn_{cid}_"):
-                    eloc = e.location
-                    erot = e.rotation_euler
-                    checkpoint_entry["respawns"].append({
-                        "name": e.name,
-                        "pos": [round(eloc.x, 3), round(eloc.y, 3), round(eloc.z, 3)],
-                        "rot": rot_to_deg(erot),
-                        "row": int(e.get("respawn_row", 0)),
-                        "col": int(e.get("respawn_col", 0)),
-                        "index": int(e.get("respawn_index", 0))
-                    })
-
-            data["checkpoints"].append(checkpoint_entry)
-            data["respawns"] += checkpoint_entry["respawns"]
-
-    # salva arquivo
-    json_path = os.path.abspath(json_path)
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-
-    print(f"💾 Dados exportados para {json_path}")
-    print(f"  {len(data['meshes'])} meshes, {len(data['spawn_points'])} spawns, "
-          f"{len(data['checkpoints'])} checkpoints, {len(data['respawns'])} respawns.")
-
-    return data
+    # versão compacta para o jogo (registros fixos + tabela de s + grade de checkpoints)
+    if CFG.TRACK_DATA_BINARY:
+        bin_path = os.path.splitext(json_path)[0] + ".bin"
+        size = GAME_DATA.save_binary(bin_path, max(CFG.CHECKPOINT_SPACING, 1.0), CFG.TRACK_ARC_STEP)
+        print(f"💾 Binário: {os.path.abspath(bin_path)} ({size / 1024:.1f} KB)")
+    return counts
 
 
 def recalc_normals_outside(obj):
+    """normals_make_consistent(inside=False) em arrays: winding coerente e virado para fora."""
     if obj.type != 'MESH':
         return
-    me = obj.data
-    # Garante cálculo atualizado
-    me.update()
-    # Modo Edit pra usar o operador de recálculo
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.normals_make_consistent(inside=False)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    replace_mesh(obj, consistent_winding(buffers_from_mesh(obj.data, normals=True)))
 
 # =========================
-# EXECUÇÃO
+# GERAÇÃO EM PEDAÇOS (ao longo de s)
 # =========================
 
-# limpar cena
-bpy.ops.object.select_all(action='SELECT')
-bpy.ops.object.delete(use_global=False)
+def build_track_chunked(stages, collection, map_name):
+    """
+    Constrói estrada, barreiras, pads, túnel, prédios, obstáculos e quadras
+    trecho a trecho ao longo de s, criando cada trecho já como
+    '{map_name}_split_{k}' (sem join_all_meshes_before_split + split).
+    Só um trecho de geometria existe em memória por vez; partes invisíveis
+    (túnel/piso/barreiras ocultos) continuam como objetos ocultos à parte.
+    """
+    frames = stages.frames
+    sweeps, boxes, hidden = track_components(stages)
+    for name, buf in hidden:
+        obj = object_from_buffers(collection, name, buf)
+        obj.hide_viewport = True
+        obj.hide_render = True
+
+    print(f"🧱 Gerando trechos (≤ {CFG.VERTEX_LIMIT} vértices, ≤ {CFG.CHUNK_LEN:.0f} m cada)...")
+    keep = collision_sweep_indices(CFG, frames, sweeps) if CFG.COLLISION_SIMPLIFY else None
+    replaced = collision_replaced_materials()
+    chunk_boxes = primitives_by_frame(box_primitives(boxes)) if CFG.COLLISION_BOXES else None
+    parts = []
+    for k, i0, i1, buf, lods in iter_chunks(frames, sweeps, boxes, CFG.VERTEX_LIMIT, CFG.CHUNK_LEN, lod_levels(CFG)):
+        buf = finish_buffers(buf)
+        obj = object_from_buffers(collection, f"{map_name}_split_{k}", buf)
+        parts.append(obj)
+        register_split_lods(obj.name, buf, [finish_buffers(lod) for lod in lods])
+        if replaced:
+            coarse = collision_sweeps(frames, sweeps, keep, i0, i1) if keep is not None else None
+            SPLIT_COLLISION[obj.name] = collision_buffers(buf, coarse, replaced)
+        if chunk_boxes is not None:
+            SPLIT_COLLISION_BOXES[obj.name] = chunk_boxes(i0, i1, last=i1 == len(frames) - 1)
+        print(f"✅ Criado: {obj.name} (s {frames.s[i0]:.0f}–{frames.s[i1]:.0f} m, "
+              f"{len(buf.verts)} vértices, {len(buf)} faces, LODs {[len(l.verts) for l in lods]})")
+
+    return parts
 
-# coleção
-coll = bpy.data.collections.new("ChaseTrackV3")
-bpy.context.scene.collection.children.link(coll)
+# =========================
+# LODs DOS SPLITS
+# =========================
 
-# gera programa + frames
-prog   = program_from_blocks(NUM_BLOCKS)
-frames = frames_from_program(prog)
+def shift_split_data(name, shift):
+    """LODs e colisão acompanham o modelo recentrado (split sem transform: âncora world == local)."""
+    def moved(b):
+        return MeshBuffers(b.verts - shift, b.loops, b.sizes, b.mats, b.materials, b.smooth, b.normals)
+
+    entry = SPLIT_LODS.get(name)
+    if entry:
+        entry["lods"] = [moved(lod) for lod in entry["lods"]]
+    if name in SPLIT_COLLISION:
+        SPLIT_COLLISION[name] = moved(SPLIT_COLLISION[name])
+    if name in SPLIT_COLLISION_BOXES:
+        prims = dict(SPLIT_COLLISION_BOXES[name])
+        prims["centers"] = prims["centers"] - shift
+        SPLIT_COLLISION_BOXES[name] = prims
+
+
+def register_split_lods(name, buf, lods):
+    """Guarda os LODs de um split (materiais na ordem do modelo completo) e o raio dele."""
+    SPLIT_LODS[name] = {
+        "lods": [align_materials(lod, buf.materials) for lod in lods],
+        "radius": bounding_radius(buf)[1],
+    }
 
-# estrada
-road = build_road(frames, coll)
-postprocess(road)
 
-# barreiras (opcional)
-if BARRIERS:
-    bL = build_barrier(frames, coll, side=-1)
-    bR = build_barrier(frames, coll, side=+1)
-    postprocess(bL); postprocess(bR)
-    
-if BUILD_PAD_ENABLE:
-    padL = build_buildpad(frames, coll, side=-1)
-    padR = build_buildpad(frames, coll, side=+1)
-    postprocess(padL)
-    postprocess(padR)
-
-if TUNNEL_ENABLE:
-    tun = build_tunnel(frames, coll)
-    postprocess(tun)
-    
-if BUILDINGS_ENABLE:
-    if BUILD_SIDE_L: build_buildings_along_pads(frames, coll, side=-1)
-    if BUILD_SIDE_R: build_buildings_along_pads(frames, coll, side=+1)
+def attach_split_lods(obj, name):
+    """
+    Cria os meshes dos LODs de `name` e liga no modelo Sollumz (médio, baixo,
+    muito baixo); materiais copiados do modelo completo.
+    """
+    entry = SPLIT_LODS.get(name)
+    if not entry or not entry["lods"]:
+        return 0
+    from sollumz.sollumz_properties import LODLevel
+
+    levels = (LODLevel.MEDIUM, LODLevel.LOW, LODLevel.VERYLOW)
+    attached = 0
+    for level, level_name, lod in zip(levels, LOD_LEVEL_NAMES, entry["lods"]):
+        mesh = mesh_from_buffers(f"{name}_{level_name}", lod)
+        # mesmos materiais do modelo -> mesma junção na paleta -> mesmos slots
+        apply_palette(mesh)
+        # mesmos slots do modelo (já convertidos por convert_materials_with_alpha_flags)
+        for i in range(min(len(mesh.materials), len(obj.data.materials))):
+            mesh.materials[i] = obj.data.materials[i]
+        obj.sz_lods.get_lod(level).mesh = mesh
+        attached += 1
+    return attached
 
-if OBSTACLES_ENABLE:
-    build_obstacles(frames, coll)
+# =========================
+# CACHE DE SPLITS
+# =========================
 
-if BLOCK_AREAS_ENABLE:
-    start_frame = frames[0]
-    end_frame = frames[-1]
+def scene_counts(objs=None):
+    """Contadores para o perf_report: objetos, vértices, faces e materiais (cena ou `objs`)."""
+    objs = list(bpy.data.objects if objs is None else objs)
+    meshes = [o.data for o in objs if o.type == 'MESH']
+    return {
+        "objects": len(objs),
+        "verts": sum(len(m.vertices) for m in meshes),
+        "faces": sum(len(m.polygons) for m in meshes),
+        "materials": len({m.name for me in meshes for m in me.materials if m}),
+    }
 
-    # START
-    if BLOCK_START_ENABLE:
-        fwd, right, up = start_frame["fwd"], start_frame["right"], start_frame["up"]
-        # centro da quadra
-        center_start = start_frame["pos"] - fwd * (BLOCK_LENGTH * 0.5)
-        build_block_area(center_start, fwd, right, up, coll, "Block_Start")
+def buffers_from_mesh(mesh, normals=False):
+    """
+    Lê um Mesh de volta para MeshBuffers (foreach_get), com nomes de material;
+    com normals=True leva junto as normais por canto (custom/auto smooth).
+    """
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+
+    n_faces = len(mesh.polygons)
+    loop_vert = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert)
+    loop_start = np.empty(n_faces, dtype=np.int32)
+    loop_total = np.empty(n_faces, dtype=np.int32)
+    mat_index = np.empty(n_faces, dtype=np.int32)
+    use_smooth = np.empty(n_faces, dtype=bool)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    mesh.polygons.foreach_get("material_index", mat_index)
+    mesh.polygons.foreach_get("use_smooth", use_smooth)
+
+    # loops na ordem das faces
+    sizes = loop_total.astype(np.int64)
+    starts = np.cumsum(sizes) - sizes
+    loop_idx = np.repeat(loop_start - starts, sizes) + np.arange(sizes.sum())
+    loops = loop_vert[loop_idx].astype(np.int64)
+
+    loop_normals = None
+    if normals:
+        ln = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        if hasattr(mesh, "corner_normals"):  # 4.1+
+            mesh.corner_normals.foreach_get("vector", ln)
+        else:
+            mesh.calc_normals_split()
+            mesh.loops.foreach_get("normal", ln)
+        loop_normals = ln.reshape(-1, 3)[loop_idx]
 
-        if BLOCK_BARRIERS:
-            barrier_center = center_start + fwd * (BLOCK_LENGTH * 0.5)  # agora fica dentro da quadra
-            build_block_barrier(barrier_center, fwd, right, up, coll, is_start=True, name="Barrier_Start")
+    materials = [m.name if m else "" for m in mesh.materials]
+    return MeshBuffers(co.reshape(-1, 3).astype(np.float64), loops, sizes, mat_index, materials, use_smooth,
+                       loop_normals)
 
-    # END
-    if BLOCK_END_ENABLE:
-        fwd, right, up = end_frame["fwd"], end_frame["right"], end_frame["up"]
-        center_end = end_frame["pos"] + fwd * (BLOCK_LENGTH * 0.5)
-        build_block_area(center_end, fwd, right, up, coll, "Block_End")
 
-        if BLOCK_BARRIERS:
-            barrier_center = center_end - fwd * (BLOCK_LENGTH * 0.5)  # idem, dentro da quadra
-            build_block_barrier(barrier_center, fwd, right, up, coll, is_start=False, name="Barrier_End")
+def load_cached_splits(collection, map_name):
+    """Recria os '{map_name}_split_{k}' direto do cache (None se não houver)."""
+    if STAGE_CACHE is None:
+        return None
+    data = STAGE_CACHE.load(STAGES.key("splits"))
+    if data is None:
+        return None
+    print(f"♻️ cache: {len(data['parts'])} splits reaproveitados (sem construir/unir/dividir)")
+    parts = []
+    for k, (buf, lods, col, prims) in enumerate(zip(data["parts"], data["lods"], data["collision"],
+                                                    data["collision_boxes"])):
+        obj = object_from_buffers(collection, f"{map_name}_split_{k}", buf)
+        register_split_lods(obj.name, buf, lods)
+        if col is not None:
+            SPLIT_COLLISION[obj.name] = col
+        if prims is not None:
+            SPLIT_COLLISION_BOXES[obj.name] = prims
+        parts.append(obj)
+    return parts
+
+
+def store_splits_in_cache(parts):
+    if STAGE_CACHE is None:
+        return
+    STAGE_CACHE.store(STAGES.key("splits"), {
+        "parts": [buffers_from_mesh(p.data, normals=True) for p in parts],
+        "lods": [SPLIT_LODS.get(p.name, {}).get("lods", []) for p in parts],
+        "collision": [SPLIT_COLLISION.get(p.name) for p in parts],
+        "collision_boxes": [SPLIT_COLLISION_BOXES.get(p.name) for p in parts],
+    })
+    print(f"💾 cache: {len(parts)} splits gravados")
 
-if SPAWN_ENABLE:
-    build_spawn_points(frames[0], coll)
+# =========================
+# EXECUÇÃO
+# =========================
 
-if CHECKPOINTS_ENABLE:
-    build_checkpoints(frames, coll)
+if CFG.SOLLUMZ_SHARD:
+    # worker de conversão Sollumz: a cena (splits prontos) já veio do .blend do coordenador
+    chunk_parts, SPLITS_FROM_CACHE = None, True
+else:
+    # limpar cena
+    bpy.ops.object.select_all(action='SELECT')
+    bpy.ops.object.delete(use_global=False)
 
+    # coleção
+    coll = bpy.data.collections.new("ChaseTrackV3")
+    bpy.context.scene.collection.children.link(coll)
+
+    # gera programa + frames (do cache quando os parâmetros não mudaram)
+    with PERF.stage("program") as st:
+        st["steps"] = len(STAGES.program)
+    with PERF.stage("frames") as st:
+        frames = STAGES.frames
+        st["frames"] = len(frames)
+        GAME_DATA.set_track(frames, CFG.TRACK_ARC_STEP)
+
+    # splits já prontos no cache: pula construção, join e split
+    with PERF.stage("splits_cache_load") as st:
+        chunk_parts = load_cached_splits(coll, CFG.MAP_NAME)
+        SPLITS_FROM_CACHE = chunk_parts is not None
+        st["hit"] = SPLITS_FROM_CACHE
+
+    with PERF.stage("build") as build_counts:
+        if SPLITS_FROM_CACHE:
+            pass
+        elif CFG.CHUNKED:
+            with PERF.stage("chunked"):
+                chunk_parts = build_track_chunked(STAGES, coll, CFG.MAP_NAME)
+        else:
+            # estrada
+            with PERF.stage("road"):
+                road = build_road(STAGES, coll)
+
+            # barreiras (opcional)
+            if CFG.BARRIERS:
+                with PERF.stage("barriers"):
+                    bL = build_barrier(STAGES, coll, side=-1)
+                    bR = build_barrier(STAGES, coll, side=+1)
+
+            if CFG.BUILD_PAD_ENABLE:
+                with PERF.stage("pads"):
+                    padL = build_buildpad(STAGES, coll, side=-1)
+                    padR = build_buildpad(STAGES, coll, side=+1)
+
+            if CFG.TUNNEL_ENABLE:
+                with PERF.stage("tunnel"):
+                    tun = build_tunnel(STAGES, coll)
+
+            if CFG.BUILDINGS_ENABLE:
+                with PERF.stage("buildings"):
+                    if CFG.BUILD_SIDE_L: build_buildings_along_pads(STAGES, coll, side=-1)
+                    if CFG.BUILD_SIDE_R: build_buildings_along_pads(STAGES, coll, side=+1)
+
+            if CFG.OBSTACLES_ENABLE:
+                with PERF.stage("obstacles"):
+                    build_obstacles(STAGES, coll)
 
-print("✅ v3: pista gerada com suavização de curva/pitch, banking gradual e largura variável.")
+            if CFG.BLOCK_AREAS_ENABLE:
+                with PERF.stage("block_areas"):
+                    build_block_areas(STAGES, coll)
+
+        if CFG.SPAWN_ENABLE:
+            with PERF.stage("spawns"):
+                build_spawn_points(frames[0], coll)
+
+        if CFG.CHECKPOINTS_ENABLE:
+            with PERF.stage("checkpoints"):
+                build_checkpoints(frames, coll)
+        build_counts.update(scene_counts())
+
+
+    print("✅ v3: pista gerada com suavização de curva/pitch, banking gradual e largura variável.")
 
 
 def split_mesh_by_vertex_and_lod(obj, map_name, vertex_limit=32767, lod_limit=200.0):
@@ -1606,8 +741,7 @@ def split_mesh_by_vertex_and_lod(obj, map_name, vertex_limit=32767, lod_limit=20
     e com faces agrupadas espacialmente dentro de um alcance (lod_limit).
     Preserva materiais e índices de material.
     """
-    import bpy, bmesh
-    from mathutils import Vector
+    import bpy
 
     if obj.type != 'MESH':
         print(f"⚠️ '{obj.name}' não é Mesh, ignorando split.")
@@ -1622,105 +756,75 @@ def split_mesh_by_vertex_and_lod(obj, map_name, vertex_limit=32767, lod_limit=20
     bpy.context.view_layer.objects.active = obj
     bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
 
-    mesh_data = obj.data
-    bm = bmesh.new()
-    bm.from_mesh(mesh_data)
-
-    bm.faces.ensure_lookup_table()
-    bm.verts.ensure_lookup_table()
-
-    # Calcula centro de cada face
-    face_centers = [(f, f.calc_center_median()) for f in bm.faces]
-    # Ordena por posição (Z tem peso menor)
-    face_centers.sort(key=lambda x: (x[1].x, x[1].y, x[1].z))
-
-    processed_faces = set()
-    split_objs = []
-    part = 0
-
-    while True:
-        # encontra próxima face não processada
-        next_face = None
-        for f, center in face_centers:
-            if f.index not in processed_faces:
-                next_face = (f, center)
-                break
-        if not next_face:
-            break  # tudo processado
-
-        ref_face, ref_center = next_face
-        group_faces = []
-        group_verts = set()
-
-        for f, center in face_centers:
-            if f.index in processed_faces:
-                continue
-
-            dist = (center - ref_center).length
-            if dist > lod_limit:
-                continue  # muito longe
-
-            verts_here = {v.index for v in f.verts}
-            if len(group_verts | verts_here) > vertex_limit:
-                continue
-
-            group_faces.append(f)
-            group_verts |= verts_here
-            processed_faces.add(f.index)
-
-        if not group_faces:
-            processed_faces.add(ref_face.index)
-            continue
-
-        # cria novo BMesh temporário
-        bm_group = bmesh.new()
-        vert_map = {}
+    # Lê a malha direto dos buffers (✅ preserva materiais, índices de material e normais)
+    buf = buffers_from_mesh(obj.data, normals=True)
 
-        # Cria vértices
-        for f in group_faces:
-            for v in f.verts:
-                if v.index not in vert_map:
-                    vert_map[v.index] = bm_group.verts.new(v.co)
-        bm_group.verts.ensure_lookup_table()
+    # Calcula centro de cada face (mediana dos vértices)
+    centers = face_centers(buf)
+    part_of = partition_faces(centers, buf.loops, buf.sizes, vertex_limit, lod_limit)
 
-        # Cria faces preservando o índice de material
-        for f in group_faces:
-            try:
-                new_face = bm_group.faces.new([vert_map[v.index] for v in f.verts])
-            except ValueError:
-                # evita faces duplicadas
-                continue
-            if hasattr(f, "material_index"):
-                new_face.material_index = f.material_index  # ✅ preserva material
-
-        bm_group.normal_update()
-
-        # Cria novo mesh e transfere o conteúdo
-        new_mesh = bpy.data.meshes.new(f"{map_name}_split_{part}")
-        bm.normal_update()
-        bm_group.to_mesh(new_mesh)
-
-        # ✅ Copia os materiais do objeto original
-        for mat in obj.data.materials:
-            new_mesh.materials.append(mat)
-
-        # Cria novo objeto e linka à cena
-        new_obj = bpy.data.objects.new(f"{map_name}_split_{part}", new_mesh)
-        bpy.context.collection.objects.link(new_obj)
+    split_objs, part_bufs = [], []
+    for part, faces, part_buf in split_buffers(buf, part_of):
+        new_obj = object_from_buffers(bpy.context.collection, f"{map_name}_split_{part}", part_buf)
         split_objs.append(new_obj)
+        part_bufs.append(part_buf)
+        # LODs por agrupamento (a parte é um cluster espacial, não um trecho de s)
+        register_split_lods(new_obj.name, part_buf, cluster_lods(CFG, part_buf))
 
+        center = centers[faces].mean(axis=0)
+        radius = float(np.linalg.norm(centers[faces] - center, axis=1).max())
         print(f"✅ Criado: {new_obj.name} "
-              f"({len(group_verts)} vértices, {len(group_faces)} faces, "
-              f"centro ≈ {ref_center})")
+              f"({len(part_buf.verts)} vértices, {len(faces)} faces, "
+              f"centro ≈ {tuple(round(c, 1) for c in center.tolist())}, raio ≈ {radius:.1f}m)")
 
-        bm_group.free()
-        part += 1
+    if collision_replaced_materials() and split_objs:
+        split_collision_by_nearest_part(split_objs, part_bufs, centers, part_of)
 
-    bm.free()
     print(f"✨ Total de partes criadas: {len(split_objs)}")
     return split_objs
 
 
+def collision_replaced_materials():
+    """Chaves de material cujas faces saem da colisão copiada do visual (col_simplify/col_boxes)."""
+    return ((COLLISION_SWEEP_MATERIALS if CFG.COLLISION_SIMPLIFY else ())
+            + (BOX_COLLISION_MATERIALS if CFG.COLLISION_BOXES else ()))
+
+
+def split_collision_by_nearest_part(split_objs, part_bufs, centers, part_of):
+    """
+    Colisão simplificada no modo join + split: estrada/barreiras/pads
+    varridos uma vez pelos frames reamostrados e prédios/obstáculos como
+    primitivas de caixa; cada faixa/caixa vai para a parte de centro mais
+    próximo e o resto (túnel, quadras...) segue o visual da parte.
+    """
+    sweeps, boxes, _ = track_components(STAGES)
+    frames = STAGES.frames
+    # o join trocou as chaves pelos nomes dos materiais do Blender
+    replaced = [MATERIALS[m].name for m in collision_replaced_materials()]
+
+    count = np.bincount(part_of, minlength=len(split_objs))
+    part_centers = np.stack([np.bincount(part_of, weights=centers[:, i], minlength=len(split_objs))
+                             for i in range(3)], axis=1) / np.maximum(count, 1)[:, None]
+
+    by_part = {}
+    if CFG.COLLISION_SIMPLIFY:
+        coarse = collision_sweeps(frames, sweeps, collision_sweep_indices(CFG, frames, sweeps))
+        coarse.materials = [MATERIALS[m].name for m in coarse.materials]
+        by_part = {k: b for k, _, b in split_buffers(coarse, assign_faces(coarse, part_centers))}
+    if CFG.COLLISION_BOXES:
+        prims = box_primitives(boxes)
+        box_part = assign_points(prims["centers"], part_centers)
+
+    for k, (obj, visual) in enumerate(zip(split_objs, part_bufs)):
+        col = collision_buffers(visual, by_part.get(k), replaced)
+        SPLIT_COLLISION[obj.name] = col
+        n_boxes = 0
+        if CFG.COLLISION_BOXES:
+            SPLIT_COLLISION_BOXES[obj.name] = take_primitives(prims, box_part == k)
+            n_boxes = len(SPLIT_COLLISION_BOXES[obj.name]["materials"])
+        print(f"🧱 Colisão de {obj.name}: {len(visual)} → {len(col)} faces + {n_boxes} caixas")
+
+
 def _compute_anchor_world(obj, mode="median", use_selected=True):
     """
     Calcula a âncora em WORLD SPACE:
@@ -1812,6 +916,13 @@ def recenter_mesh_like_cursor_method(obj, anchor_mode="median", use_selected=Tru
     print(f"✅ '{obj.name}' recentrado via {anchor_mode}. Visual encaixado, mesh centrado.")
     return anchor_world
 
+# propriedade das imagens geradas pelo pipeline: fração de pixels transparentes já conhecida
+PIPELINE_ALPHA_KEY = "trackgen_alpha"
+
+def tag_pipeline_image(img, transparent_fraction):
+    """Marca uma imagem criada aqui (cor sólida, paleta, transparente) para pular a análise de alpha."""
+    img[PIPELINE_ALPHA_KEY] = float(transparent_fraction)
+
 def create_transparent_texture(filepath, size=4):
     """Cria uma textura PNG totalmente transparente"""
     from PIL import Image
@@ -1877,6 +988,7 @@ def convert_invisible_materials_to_principled():
             tex_image = nodes.new(type='ShaderNodeTexImage')
 
             tex_image.image = bpy.data.images.load(output_texture_path)
+            tag_pipeline_image(tex_image.image, 1.0)
             tex_image.interpolation = 'Closest'
 
             # Configura Principled BSDF com alpha 0
@@ -1894,6 +1006,24 @@ def create_color_texture(filepath, color, size=400):
     img.save(filepath)
     print(f"🎨 Textura de cor {color} criada em {filepath}")
 
+def flat_color_bsdf(mat):
+    """Principled de um material de cor chapada (visível, sem textura na Base Color) ou None."""
+    if not mat.use_nodes:
+        return None
+
+    bsdf = next((n for n in mat.node_tree.nodes if n.type == "BSDF_PRINCIPLED"), None)
+    if not bsdf:
+        return None
+
+    # ignorar os invisíveis (alpha == 0)
+    if bsdf.inputs["Alpha"].default_value <= 0.001:
+        return None
+
+    # Se já há textura de imagem ligada, ignora
+    if any(l.from_node.type == "TEX_IMAGE" for l in bsdf.inputs["Base Color"].links):
+        return None
+    return bsdf
+
 def convert_colored_materials_to_principled(base_dir="//textures/"):
     """
     Garante que todos os materiais com cor base (não invisíveis)
@@ -1904,27 +1034,14 @@ def convert_colored_materials_to_principled(base_dir="//textures/"):
     os.makedirs(base_dir, exist_ok=True)
 
     for mat in bpy.data.materials:
-        if not mat.use_nodes:
+        bsdf = flat_color_bsdf(mat)
+        if not bsdf:
             continue
 
         nodes = mat.node_tree.nodes
         links = mat.node_tree.links
-        bsdf = next((n for n in nodes if n.type == "BSDF_PRINCIPLED"), None)
-        if not bsdf:
-            continue
-
-        alpha = bsdf.inputs["Alpha"].default_value
         color = bsdf.inputs["Base Color"].default_value
 
-        # ignorar os invisíveis (alpha == 0)
-        if alpha <= 0.001:
-            continue
-
-        # Se já há textura de imagem ligada, ignora
-        tex_node_linked = any(l.from_node.type == "TEX_IMAGE" for l in bsdf.inputs["Base Color"].links)
-        if tex_node_linked:
-            continue
-
         # cria arquivo .png com a cor base
         cname = mat.name.replace(" ", "_").lower()
         tex_path = os.path.join(base_dir, f"{cname}_color.png")
@@ -1934,6 +1051,7 @@ def convert_colored_materials_to_principled(base_dir="//textures/"):
         # adiciona node de textura e conecta
         tex_node = nodes.new(type="ShaderNodeTexImage")
         tex_node.image = bpy.data.images.load(tex_path)
+        tag_pipeline_image(tex_node.image, 0.0)
         tex_node.interpolation = 'Closest'
         links.new(tex_node.outputs["Color"], bsdf.inputs["Base Color"])
 
@@ -1946,6 +1064,93 @@ def convert_colored_materials_to_principled(base_dir="//textures/"):
 
     print("🧱 Conversão de materiais coloridos concluída.")
 
+def convert_colored_materials_to_atlas(base_dir="//textures/"):
+    """
+    Modo atlas: uma única textura de paleta (palette_atlas.png) com uma
+    célula por cor chapada e um material 'mat_palette' que a usa. Os
+    materiais de cor ficam como estão; apply_palette troca os slots deles
+    pelo da paleta (com UVs nas células) em cada split na hora do export.
+    """
+    global PALETTE_MAT
+    base_dir = bpy.path.abspath(base_dir)
+    os.makedirs(base_dir, exist_ok=True)
+
+    flat = []
+    for mat in bpy.data.materials:
+        bsdf = flat_color_bsdf(mat)
+        if bsdf:
+            flat.append((mat, tuple(bsdf.inputs["Base Color"].default_value)))
+    if not flat:
+        print("⚠️ Nenhum material de cor chapada para o atlas.")
+        return
+
+    pixels, uvs = palette_atlas([color for _, color in flat], CFG.PALETTE_CELL)
+    tex_path = os.path.join(base_dir, "palette_atlas.png")
+    Image.fromarray(pixels, "RGBA").save(tex_path)
+
+    pal = bpy.data.materials.new("mat_palette")
+    pal.use_nodes = True
+    nodes = pal.node_tree.nodes
+    bsdf = nodes.get("Principled BSDF")
+    bsdf.inputs["Roughness"].default_value = 1.0
+    tex_node = nodes.new(type="ShaderNodeTexImage")
+    tex_node.image = bpy.data.images.load(tex_path, check_existing=False)
+    tag_pipeline_image(tex_node.image, 0.0)
+    tex_node.interpolation = 'Closest'
+    pal.node_tree.links.new(tex_node.outputs["Color"], bsdf.inputs["Base Color"])
+    pal.blend_method = 'OPAQUE'
+    pal.use_backface_culling = True
+
+    PALETTE_MAT = pal
+    PALETTE.clear()
+    PALETTE.update({mat.name: tuple(uv) for (mat, _), uv in zip(flat, uvs.tolist())})
+    print(f"🎨 Atlas de paleta {pixels.shape[1]}x{pixels.shape[0]} com {len(flat)} cores "
+          f"→ {os.path.basename(tex_path)} ({pal.name})")
+
+def apply_palette(mesh):
+    """
+    Junta os slots dos materiais de PALETTE num slot só com PALETTE_MAT e
+    põe o UV de cada face desses materiais no centro da célula da cor.
+    Devolve quantas faces foram para a paleta (0 sem atlas).
+    """
+    if not PALETTE or PALETTE_MAT is None:
+        return 0
+    remap, kept, slot_uv = palette_slots([m.name if m else "" for m in mesh.materials], PALETTE)
+    if len(kept) == len(mesh.materials):
+        return 0
+
+    n_faces = len(mesh.polygons)
+    mat_index = np.empty(n_faces, dtype=np.int32)
+    loop_start = np.empty(n_faces, dtype=np.int32)
+    loop_total = np.empty(n_faces, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", mat_index)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    mat_index = np.minimum(mat_index, len(remap) - 1)
+
+    uv_layer = mesh.uv_layers.get(PALETTE_UV_MAP) or mesh.uv_layers.new(name=PALETTE_UV_MAP)
+    uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", uv)
+    uv = uv.reshape(-1, 2)
+
+    # cantos na ordem das faces (como em buffers_from_mesh)
+    sizes = loop_total.astype(np.int64)
+    starts = np.cumsum(sizes) - sizes
+    loop_idx = np.repeat(loop_start - starts, sizes) + np.arange(sizes.sum())
+    face_uv = slot_uv[mat_index]
+    hit = ~np.isnan(face_uv[:, 0])
+    on_palette = np.repeat(hit, sizes)
+    uv[loop_idx[on_palette]] = np.repeat(face_uv, sizes, axis=0)[on_palette]
+    uv_layer.data.foreach_set("uv", uv.ravel())
+
+    mats = [mesh.materials[i] for i in kept] + [PALETTE_MAT]
+    mesh.materials.clear()
+    for m in mats:
+        mesh.materials.append(m)
+    mesh.polygons.foreach_set("material_index", remap[mat_index].astype(np.int32))
+    mesh.update()
+    return int(hit.sum())
+
 def join_all_meshes_before_split(map_name="map"):
     """
     Junta todos os objetos Mesh da cena em um único objeto.
@@ -2007,6 +1212,31 @@ def export_splits_to_obj(map_name="track"):
 
 PROPORTION_THRESHOLD = 0.01
 
+# fração de pixels transparentes por imagem: (nome, tamanho, arquivo, alpha_cutoff) -> fração
+_ALPHA_FRACTION = {}
+
+def image_transparent_fraction(img, alpha_cutoff=0.95):
+    """
+    Fração de pixels com alpha < alpha_cutoff, lida com foreach_get num
+    buffer NumPy e memorizada por imagem. Imagens marcadas com
+    tag_pipeline_image devolvem a fração conhecida sem ler pixels.
+    """
+    if PIPELINE_ALPHA_KEY in img:
+        return float(img[PIPELINE_ALPHA_KEY])
+
+    key = (img.name_full, tuple(img.size), img.filepath, alpha_cutoff)
+    if key in _ALPHA_FRACTION:
+        return _ALPHA_FRACTION[key]
+
+    fraction = 0.0
+    n = len(img.pixels)
+    if img.depth >= 32 and n:
+        pixels = np.empty(n, dtype=np.float32)  # [R,G,B,A, R,G,B,A...]
+        img.pixels.foreach_get(pixels)
+        fraction = np.count_nonzero(pixels[3::4] < alpha_cutoff) / (n // 4)
+    _ALPHA_FRACTION[key] = fraction
+    return fraction
+
 def image_has_majority_transparency(img, proportion_threshold=0.05, alpha_cutoff=0.95):
     """
     Retorna True se a proporção de pixels realmente transparentes 
@@ -2018,23 +1248,40 @@ def image_has_majority_transparency(img, proportion_threshold=0.05, alpha_cutoff
     if not img or not img.has_data:
         return False
 
-    if img.depth < 32:
-        return False
-
-    pixels = img.pixels[:]  # [R,G,B,A, R,G,B,A...]
-    alpha_values = pixels[3::4]
-
-    total = len(alpha_values)
-    if total == 0:
-        return False
-
-    transparent = sum(1 for a in alpha_values if a < alpha_cutoff)
-    proportion = transparent / total
+    return image_transparent_fraction(img, alpha_cutoff) >= proportion_threshold
+
+# material de origem (name_full) -> material Sollumz já convertido, reusado pelos outros splits,
+# e os name_full dos próprios convertidos (slot que já aponta para uma conversão fica como está)
+SHADER_MATERIAL_CACHE = {}
+SHADER_CONVERTED = set()
+COLLISION_MATERIAL_CACHE = {}
+COLLISION_CONVERTED = set()
+
+def cached_conversion(cache, converted, mat):
+    """Material convertido de `mat` (ou `mat` se ele mesmo já é uma conversão); None se ainda não há."""
+    if mat.name_full in converted:
+        return mat
+    hit = cache.get(mat.name_full)
+    if hit is None:
+        return None
+    try:
+        hit.name  # removido do bpy.data -> ReferenceError
+        return hit
+    except ReferenceError:
+        del cache[mat.name_full]
+        return None
 
-    return proportion >= proportion_threshold
+def remember_conversion(cache, converted, mat, result):
+    """Guarda `result` como a conversão de `mat`."""
+    cache[mat.name_full] = result
+    converted.add(result.name_full)
 
 def convert_materials_with_alpha_flags(obj):
-    """Converte materiais individualmente com Alpha flag se necessário"""
+    """
+    Converte materiais individualmente com Alpha flag se necessário.
+    Cada material de origem passa pelo Sollumz uma vez só: os slots
+    seguintes (outros splits, LODs) recebem o material já convertido.
+    """
     wm = bpy.data.window_managers["WinMan"]
 
     print(f"🎯 Processando materiais do objeto '{obj.name}'...")
@@ -2043,6 +1290,12 @@ def convert_materials_with_alpha_flags(obj):
         if not mat:
             continue
 
+        converted = cached_conversion(SHADER_MATERIAL_CACHE, SHADER_CONVERTED, mat)
+        if converted is not None:
+            slot.material = converted
+            print(f"♻️ '{mat.name}' → '{converted.name}' (já convertido)")
+            continue
+
         print(f"🔍 Verificando material '{mat.name}'...")
 
         has_alpha = False
@@ -2067,6 +1320,8 @@ def convert_materials_with_alpha_flags(obj):
 
         # Converte somente este material
         bpy.ops.sollumz.convertmaterialtoselected()
+        if obj.material_slots[i].material:
+            remember_conversion(SHADER_MATERIAL_CACHE, SHADER_CONVERTED, mat, obj.material_slots[i].material)
 
     print(f"✅ Materiais de '{obj.name}' processados.")
 
@@ -2091,6 +1346,11 @@ def convert_collision_materials_with_alpha_flags(obj):
         if not mat:
             continue
 
+        converted = cached_conversion(COLLISION_MATERIAL_CACHE, COLLISION_CONVERTED, mat)
+        if converted is not None:
+            slot.material = converted
+            continue
+
         has_alpha = False
 
         if mat.use_nodes:
@@ -2110,6 +1370,7 @@ def convert_collision_materials_with_alpha_flags(obj):
         active_mat = bpy.context.object.active_material
         if not active_mat or not hasattr(active_mat, "collision_flags"):
             continue
+        remember_conversion(COLLISION_MATERIAL_CACHE, COLLISION_CONVERTED, mat, active_mat)
 
         # Aplica flags específicas
         if has_alpha:
@@ -2151,7 +1412,13 @@ def process_sollumz_drawable_and_collision(obj):
     # -----------------------------
     coll_target = obj.users_collection[0] if obj.users_collection else bpy.context.scene.collection
     col_obj = obj.copy()
-    col_obj.data = obj.data.copy()
+    col_buf = SPLIT_COLLISION.get(base_name)
+    if col_buf is not None:
+        # colisão simplificada (frames reamostrados, sem faces de baixo)
+        col_obj.data = mesh_from_buffers(f"{base_name}_Collision", col_buf)
+        print(f"🧱 Colisão simplificada: {len(obj.data.polygons)} → {len(col_buf)} faces")
+    else:
+        col_obj.data = obj.data.copy()
     col_obj.animation_data_clear()
     col_obj.name = f"{base_name}_Collision"
     # garanta que seja independente da hierarquia do visual
@@ -2178,7 +1445,17 @@ def process_sollumz_drawable_and_collision(obj):
     obj.sollum_type = 'sollumz_drawable_model'
     obj.name = f"{base_name}_Model"
 
+    # atlas: cores chapadas viram um slot só com a paleta (a colisão já copiou os materiais originais)
+    n_palette = apply_palette(obj.data)
+    if n_palette:
+        print(f"🎨 {n_palette} faces de {obj.name} na paleta ({PALETTE_MAT.name})")
     convert_materials_with_alpha_flags(obj)  # sua função
+    try:
+        n_lods = attach_split_lods(obj, base_name)
+        if n_lods:
+            print(f"🔻 {n_lods} LODs ligados em {obj.name}")
+    except Exception as e:
+        print(f"⚠️ Não foi possível criar os LODs de {base_name}: {e}")
     bpy.ops.sollumz.uv_maps_add_missing()
     bpy.ops.sollumz.color_attrs_add_missing()
     bpy.ops.sollumz.setallmatembedded()
@@ -2194,6 +1471,16 @@ def process_sollumz_drawable_and_collision(obj):
     drawable_empty.name = base_name
     print(f"📦 Drawable criado: {drawable_empty.name}")
 
+    # distâncias de LOD pelo raio do split
+    entry = SPLIT_LODS.get(base_name)
+    if entry:
+        try:
+            props = drawable_empty.drawable_properties
+            props.lod_dist_high, props.lod_dist_med, props.lod_dist_low, props.lod_dist_vlow = \
+                lod_distances(CFG, entry["radius"])
+        except Exception as e:
+            print(f"⚠️ Não foi possível definir as distâncias de LOD de {base_name}: {e}")
+
     # -----------------------------
     # 4) Parent correto da colisão + converter para Composite
     # -----------------------------
@@ -2203,6 +1490,15 @@ def process_sollumz_drawable_and_collision(obj):
     bpy.context.view_layer.objects.active = col_obj
     bpy.ops.sollumz.converttocomposite()
 
+    # prédios/obstáculos como Bound Box dentro do composite
+    prims = SPLIT_COLLISION_BOXES.get(base_name)
+    if prims is not None and prims["materials"]:
+        try:
+            n_boxes = add_collision_boxes(drawable_empty, prims, base_name)
+            print(f"📦 {n_boxes} caixas de colisão (Bound Box) em {base_name}")
+        except Exception as e:
+            print(f"⚠️ Não foi possível criar as caixas de colisão de {base_name}: {e}")
+
     print("✅ Hierarquia:")
     print(f"    Drawable → {drawable_empty.name}")
     print(f"    Visual   → {obj.name}")
@@ -2211,6 +1507,44 @@ def process_sollumz_drawable_and_collision(obj):
     return drawable_empty
 
 
+def add_collision_boxes(drawable_empty, prims, base_name):
+    """
+    Cria um Bound Box por caixa de `prims` (box_primitives) como filho do
+    Bound Composite do drawable: malha alinhada aos eixos com o tamanho da
+    caixa e rotação/posição na matriz do objeto.
+    """
+    from sollumz.ybn.collision_materials import create_collision_material_from_index
+
+    composite = next((c for c in drawable_empty.children
+                      if c.sollum_type == SollumType.BOUND_COMPOSITE), None)
+    if composite is None:
+        raise RuntimeError("Bound Composite não encontrado")
+
+    # um material de colisão por chave, compartilhado entre as caixas
+    col_mats = {}
+    for key in set(prims["materials"]):
+        mat = create_collision_material_from_index(0)
+        mat.name = f"{key}_box_collision"
+        col_mats[key] = mat
+
+    axes = np.eye(3)
+    coll = composite.users_collection[0] if composite.users_collection else bpy.context.scene.collection
+    for i, (center, rot, size, key) in enumerate(zip(prims["centers"], prims["rotations"],
+                                                     prims["sizes"], prims["materials"])):
+        mesh = mesh_from_buffers(f"{base_name}_box_{i}",
+                                 box_buffers(np.zeros((1, 3)), axes[0], axes[1], axes[2], size[None, :]))
+        mesh.materials.append(col_mats[key])
+        box = bpy.data.objects.new(f"{base_name}_box_{i}", mesh)
+        coll.objects.link(box)
+        box.sollum_type = SollumType.BOUND_BOX
+        box.parent = composite
+        m = Matrix.Identity(4)
+        for r in range(3):
+            m[r][0], m[r][1], m[r][2], m[r][3] = *rot[r].tolist(), float(center[r])
+        box.matrix_world = m
+    return len(prims["materials"])
+
+
 def clear_scene():
     """Limpa todos os objetos da cena atual"""
     bpy.ops.object.select_all(action='SELECT')
@@ -2301,7 +1635,8 @@ def create_ytyp_with_root_empties(map_name_prefix, map_name="TrackGen"):
             item.asset_type = AssetType.DRAWABLE
             item.flags.flag6 = True  # Static
             item.flags.flag29 = True  # NPC avoid
-            item.lod_dist = 500.0
+            entry = SPLIT_LODS.get(obj.name)
+            item.lod_dist = lod_distances(CFG, entry["radius"])[-1] if entry else 500.0
 
             created += 1
         except Exception as e:
@@ -2322,7 +1657,7 @@ def get_meshes_by_prefix(prefix):
     return roots
 
 def batch_process_objs(objs=None):
-    prefix = MAP_NAME + "_split_"
+    prefix = CFG.MAP_NAME + "_split_"
     if objs == None:
         objs = get_meshes_by_prefix(prefix)
         
@@ -2347,7 +1682,7 @@ def batch_process_objs(objs=None):
     # Cria o YTYP com as empties Drawables acumuladas
     if 'EMPTIES' in locals() and EMPTIES:
         map_name = os.path.basename(os.path.normpath(output_folder))
-        create_ytyp_with_root_empties(prefix, map_name=MAP_NAME)
+        create_ytyp_with_root_empties(prefix, map_name=CFG.MAP_NAME)
         bpy.ops.object.select_all(action='DESELECT')
         emptiesObjs = get_root_empties_by_prefix(prefix)
         for empty in emptiesObjs:
@@ -2360,60 +1695,266 @@ def batch_process_objs(objs=None):
     print("📦 Todos os objetos permanecem na cena e foram adicionados ao YTYP.")
 
 
-def recalc_normals_outside(obj):
-    if obj.type != 'MESH':
-        return
-    me = obj.data
-    # Garante cálculo atualizado
-    me.update()
-    # Modo Edit pra usar o operador de recálculo
-    bpy.context.view_layer.objects.active = obj
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.normals_make_consistent(inside=False)
-    bpy.ops.object.mode_set(mode='OBJECT')
 
 
+# -----------------------------------------------------
+# ⚡ Conversão Sollumz em paralelo (sz_workers=N)
+# -----------------------------------------------------
+SHARD_DIR = os.path.join(OUTPUT_DIR, "sollumz_shards")
+
+def write_sollumz_shards(parts, workers):
+    """
+    Coordenador: grava a cena num .blend intermediário, os dados dos splits
+    (LODs, colisão, caixas, paleta) num pickle e um manifesto por pedaço.
+    Devolve os jobs (um Blender headless por pedaço, splits em rodízio).
+    """
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    blend_path = os.path.join(SHARD_DIR, f"{CFG.MAP_NAME}_splits.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+
+    names = [p.name for p in parts]
+    data_path = os.path.join(SHARD_DIR, "split_data.pkl")
+    with open(data_path, "wb") as f:
+        pickle.dump({
+            "lods": {n: SPLIT_LODS[n] for n in names if n in SPLIT_LODS},
+            "collision": {n: SPLIT_COLLISION[n] for n in names if n in SPLIT_COLLISION},
+            "collision_boxes": {n: SPLIT_COLLISION_BOXES[n] for n in names if n in SPLIT_COLLISION_BOXES},
+            "materials": {k: m.name for k, m in MATERIALS.items()},
+            "palette": dict(PALETTE),
+            "palette_mat": PALETTE_MAT.name if PALETTE_MAT else None,
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # mesmos args do coordenador; o worker só converte (sem cache, sem perf_report)
+    base_args = dict(parse_argv(), sz_workers=0, cache=0, perf=0)
+    n = max(1, min(workers, len(names)))
+    jobs = []
+    for i in range(n):
+        manifest = {
+            "names": names[i::n],
+            "data": data_path,
+            "collection": f"sollumz_shard_{i}",
+            "blend": os.path.join(SHARD_DIR, f"shard_{i}.blend"),
+            "report": os.path.join(SHARD_DIR, f"shard_{i}_report.json"),
+        }
+        if os.path.exists(manifest["report"]):
+            os.remove(manifest["report"])
+        manifest_path = os.path.join(SHARD_DIR, f"shard_{i}.json")
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        jobs.append({
+            "name": f"shard_{i}",
+            "cmd": blender_command(os.path.abspath(__file__), format_args(dict(base_args, sz_shard=manifest_path)),
+                                   blender=bpy.app.binary_path, blend_file=blend_path),
+            "log": os.path.join(SHARD_DIR, f"shard_{i}.log"),
+            "cwd": os.getcwd(),  # presets relativos continuam valendo
+            "manifest": manifest,
+        })
+    return jobs
+
+def run_sollumz_shard(manifest_path):
+    """
+    Worker: converte os splits do manifesto (process_obj), exporta os
+    assets deles em output_folder, guarda os drawables numa coleção do
+    shard_{i}.blend e escreve o relatório {empties, failed}.
+    """
+    global PALETTE_MAT
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    with open(manifest["data"], "rb") as f:
+        data = pickle.load(f)
+
+    # materiais do .blend do coordenador (os criados ao carregar este script são cópias vazias)
+    MATERIALS.update({k: bpy.data.materials[n] for k, n in data["materials"].items() if n in bpy.data.materials})
+    PALETTE.update(data["palette"])
+    PALETTE_MAT = bpy.data.materials.get(data["palette_mat"]) if data["palette_mat"] else None
+    names = manifest["names"]
+    SPLIT_LODS.update({n: data["lods"][n] for n in names if n in data["lods"]})
+    SPLIT_COLLISION.update({n: data["collision"][n] for n in names if n in data["collision"]})
+    SPLIT_COLLISION_BOXES.update({n: data["collision_boxes"][n] for n in names if n in data["collision_boxes"]})
+
+    coll = bpy.data.collections.new(manifest["collection"])
+    bpy.context.scene.collection.children.link(coll)
+    print(f"⚙️ Pedaço {manifest['collection']}: {len(names)} splits")
+
+    empties, failed = [], []
+    for name in names:
+        obj = bpy.data.objects.get(name)
+        empty = None
+        if obj is None:
+            print(f"❌ '{name}' não está no .blend")
+        else:
+            try:
+                empty = process_obj(obj)
+            except Exception as e:
+                print(f"❌ Erro ao processar {name}: {e}")
+        if empty is None:
+            failed.append(name)
+            continue
+        empties.append(empty.name)
+        for o in [empty] + list(empty.children_recursive):
+            for c in list(o.users_collection):
+                c.objects.unlink(o)
+            coll.objects.link(o)
+
+    if empties:
+        bpy.ops.object.select_all(action='DESELECT')
+        for name in empties:
+            bpy.data.objects[name].select_set(True)
+        save_as_gta(output_folder)
+    bpy.ops.wm.save_as_mainfile(filepath=manifest["blend"], copy=True)
+
+    with open(manifest["report"], "w", encoding="utf-8") as f:
+        json.dump({"empties": empties, "failed": failed}, f, indent=2)
+    print(f"✅ Pedaço {manifest['collection']}: {len(empties)} drawables, {len(failed)} falhas")
+
+def batch_process_objs_sharded(parts, workers):
+    """
+    Divide os splits entre `workers` processos Blender (write_sollumz_shards),
+    cada um convertendo e exportando o seu pedaço. Depois junta os drawables
+    de todos os pedaços nesta cena e exporta um único YTYP. Splits de
+    pedaços que falharam são convertidos aqui mesmo, em sequência.
+    """
+    prefix = CFG.MAP_NAME + "_split_"
+    jobs = write_sollumz_shards(parts, workers)
+    results, wall = run_jobs(jobs, len(jobs), label="pedaço")
+    print_summary(results, wall, label="pedaço")
+
+    by_name = {p.name: p for p in parts}
+    local = []
+    for job in jobs:
+        manifest = job["manifest"]
+        report = None
+        if os.path.exists(manifest["report"]):
+            with open(manifest["report"], "r", encoding="utf-8") as f:
+                report = json.load(f)
+        if report is None:
+            print(f"⚠️ {job['name']} sem relatório → convertendo seus {len(manifest['names'])} splits aqui")
+            local += [by_name[n] for n in manifest["names"]]
+            continue
+
+        # os meshes de origem saem do caminho dos nomes dos drawables que chegam
+        for name in manifest["names"]:
+            if name in report["empties"]:
+                src = by_name[name]
+                src.name = f"{name}_source"
+                src.hide_viewport = True
+                src.hide_render = True
+            else:
+                local.append(by_name[name])
+        with bpy.data.libraries.load(manifest["blend"], link=False) as (data_from, data_to):
+            data_to.collections = [c for c in data_from.collections if c == manifest["collection"]]
+        for c in data_to.collections:
+            if c is not None:
+                bpy.context.scene.collection.children.link(c)
+        print(f"📥 {job['name']}: {len(report['empties'])} drawables juntados")
+
+    local_empties = []
+    for obj in local:
+        try:
+            empty = process_obj(obj)
+            if empty is not None:
+                local_empties.append(empty)
+        except Exception as e:
+            print(f"❌ Erro ao processar {obj.name}: {e}")
+
+    if not get_root_empties_by_prefix(prefix):
+        print("⚠️ Nenhuma empty de Drawable foi coletada. YTYP não será criado.")
+        return
+    create_ytyp_with_root_empties(prefix, map_name=CFG.MAP_NAME)
+    bpy.ops.object.select_all(action='DESELECT')
+    for empty in get_root_empties_by_prefix(prefix):
+        empty.select_set(True)
+    bpy.ops.sollumz.exportytyp(directory=output_folder)
+    if local_empties:
+        bpy.ops.object.select_all(action='DESELECT')
+        for empty in local_empties:
+            empty.select_set(True)
+        save_as_gta(output_folder)
+    print(f"✅ YTYP '{CFG.MAP_NAME}' exportado ({len(jobs)} pedaços, {len(local_empties)} splits convertidos aqui)")
+
 # -----------------------------------------------------
 # ⚙️ Pipeline automático de export
 # -----------------------------------------------------
-def process_track_for_export(map_name="map"):
+def process_track_for_export(map_name="map", parts=None):
     """
     1️⃣ Junta todas as meshes
     2️⃣ Divide por limite de vértices e LOD
     3️⃣ Exporta JSON de spawns e checkpoints
+    Com `parts` (modo em pedaços) os passos 1 e 2 são pulados.
     """
-    joined = join_all_meshes_before_split(map_name)
-    if not joined:
-        return
-
-    print(f"✂️ Iniciando split de '{joined.name}' com LOD={LOD_LIMIT} e Vértices={VERTEX_LIMIT}...")
-    parts = split_mesh_by_vertex_and_lod(joined, map_name, vertex_limit=VERTEX_LIMIT, lod_limit=LOD_LIMIT)
+    if parts is None:
+        with PERF.stage("join") as st:
+            joined = join_all_meshes_before_split(map_name)
+            if not joined:
+                return
+            st.update(scene_counts([joined]))
+
+        print(f"✂️ Iniciando split de '{joined.name}' com LOD={CFG.LOD_LIMIT} e Vértices={CFG.VERTEX_LIMIT}...")
+        with PERF.stage("split") as st:
+            parts = split_mesh_by_vertex_and_lod(joined, map_name, vertex_limit=CFG.VERTEX_LIMIT, lod_limit=CFG.LOD_LIMIT)
+            st.update(scene_counts(parts))
+
+    if not SPLITS_FROM_CACHE:
+        with PERF.stage("splits_cache_store"):
+            store_splits_in_cache(parts)
 
     print(f"🧭 Recentralizando {len(parts)} partes...")
-    #skippedFirst = False
-    for part in parts:
-        #if not skippedFirst:
-            #skippedFirst = True
-            #continue
-        recenter_mesh_like_cursor_method(part, use_selected=False)
+    with PERF.stage("recenter", objects=len(parts)):
+        #skippedFirst = False
+        for part in parts:
+            #if not skippedFirst:
+                #skippedFirst = True
+                #continue
+            anchor = recenter_mesh_like_cursor_method(part, use_selected=False)
+            if anchor is not None:
+                shift_split_data(part.name, np.array(anchor[:], dtype=np.float64))
+                GAME_DATA.add_mesh(part.name, anchor[:], part.rotation_euler[:])
     
 
     print(f"💾 Exportando JSON final para {OUTPUT_PATH}...")
-    export_game_data(OUTPUT_PATH)
+    with PERF.stage("export_game_data"):
+        export_game_data(OUTPUT_PATH)
     print(f"🎉 Exportação concluída com sucesso!")
     for part in parts:
         part.location = Vector((0,0,0))
         #recalc_normals_outside(part)
 
-    export_splits_to_obj(MAP_NAME)
+    with PERF.stage("export_obj", objects=len(parts)):
+        export_splits_to_obj(CFG.MAP_NAME)
     
-    # 🚀 Executa
-    batch_process_objs(objs=parts)
+    # 🚀 Executa (assets convertidos do cache quando splits e parâmetros não mudaram)
+    assets_key = STAGES.key("assets")
+    restored = STAGE_CACHE.restore_files(assets_key, output_folder) if STAGE_CACHE is not None else None
+    if restored is not None:
+        print(f"♻️ cache: {restored} arquivos convertidos restaurados em {output_folder}")
+    else:
+        started = time.time()
+        with PERF.stage("sollumz") as st:
+            if CFG.SOLLUMZ_WORKERS > 1 and len(parts) > 1:
+                batch_process_objs_sharded(parts, CFG.SOLLUMZ_WORKERS)
+            else:
+                batch_process_objs(objs=parts)
+            st.update(scene_counts(parts))
+        if STAGE_CACHE is not None:
+            STAGE_CACHE.store_files(assets_key, output_folder, since=started)
     
 
-convert_invisible_materials_to_principled()
-# Depois de rodar convert_invisible_materials_to_principled()
-convert_colored_materials_to_principled(texture_dir)
+if CFG.SOLLUMZ_SHARD:
+    run_sollumz_shard(CFG.SOLLUMZ_SHARD)
+else:
+    with PERF.stage("materials") as st:
+        convert_invisible_materials_to_principled()
+        # Depois de rodar convert_invisible_materials_to_principled()
+        if CFG.TEXTURE_ATLAS:
+            convert_colored_materials_to_atlas(texture_dir)
+        else:
+            convert_colored_materials_to_principled(texture_dir)
+        st["materials"] = len(bpy.data.materials)
+
+    with PERF.stage("export"):
+        process_track_for_export(CFG.MAP_NAME, parts=chunk_parts)
 
-process_track_for_export(MAP_NAME)
\ No newline at end of file
+    PERF.write(os.path.join(OUTPUT_DIR, "perf_report.json"),
+               map_name=CFG.MAP_NAME, config_hash=CFG.digest(), blender=bpy.app.version_string,
+               cache_hits=STAGE_CACHE.hits if STAGE_CACHE else 0,
+               cache_misses=STAGE_CACHE.misses if STAGE_CACHE else 0)
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""
+Pool de processos Blender em background (blender -b -P script -- args).
+Roda fora do Blender (Python puro): cada job vira um processo headless com log próprio.
+"""
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# executável do Blender: variável de ambiente BLENDER ou 'blender' no PATH
+BLENDER_EXE = os.environ.get("BLENDER", "blender")
+
+
+def blender_command(script, args=(), blender=None, blend_file=None, factory_startup=False):
+    """Monta a linha de comando: blender [arquivo.blend] -b [--factory-startup] -P script -- args..."""
+    cmd = [blender or BLENDER_EXE]
+    if blend_file:
+        cmd.append(blend_file)
+    cmd.append("-b")
+    if factory_startup:
+        cmd.append("--factory-startup")
+    cmd += ["-P", script, "--"]
+    cmd += [str(a) for a in args]
+    return cmd
+
+
+def format_args(params):
+    """dict {'seed': 3, 'MAP_NAME': 'x'} -> ['seed=3', 'MAP_NAME=x'] (formato do get_arg)."""
+    return [f"{k}={v}" for k, v in params.items()]
+
+
+def run_job(job):
+    """
+    Roda um job {name, cmd, log[, cwd, env]} e devolve o resultado
+    {name, ok, returncode, seconds, log, cmd}. Saída e erro vão para o log.
+    """
+    log_path = job["log"]
+    os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+    env = dict(os.environ, **job.get("env", {}))
+
+    start = time.perf_counter()
+    try:
+        with open(log_path, "w", encoding="utf-8", errors="replace") as log:
+            log.write("$ " + " ".join(job["cmd"]) + "\n\n")
+            log.flush()
+            proc = subprocess.run(job["cmd"], stdout=log, stderr=subprocess.STDOUT,
+                                  cwd=job.get("cwd"), env=env)
+        returncode = proc.returncode
+    except Exception as e:
+        with open(log_path, "a", encoding="utf-8") as log:
+            log.write(f"\n❌ Falha ao iniciar o processo: {e}\n")
+        returncode = -1
+
+    return {
+        "name": job["name"],
+        "ok": returncode == 0,
+        "returncode": returncode,
+        "seconds": round(time.perf_counter() - start, 2),
+        "log": log_path,
+        "cmd": job["cmd"],
+    }
+
+
+def run_jobs(jobs, workers=None, label="job"):
+    """
+    Roda os jobs num pool limitado (padrão: nº de núcleos) e imprime o progresso.
+    Devolve (resultados na ordem dos jobs, tempo total em segundos).
+    """
+    jobs = list(jobs)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    print(f"🚀 {len(jobs)} {label}(s) em {workers} worker(s) Blender...")
+
+    start = time.perf_counter()
+    results = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job): i for i, job in enumerate(jobs)}
+        for done, fut in enumerate(as_completed(futures), 1):
+            res = fut.result()
+            results[futures[fut]] = res
+            status = "✅" if res["ok"] else f"❌ (código {res['returncode']})"
+            print(f"  [{done}/{len(jobs)}] {status} {res['name']} em {res['seconds']:.1f}s → {res['log']}")
+            sys.stdout.flush()
+
+    return results, time.perf_counter() - start
+
+
+def print_summary(results, wall_seconds, label="job"):
+    ok = [r for r in results if r["ok"]]
+    failed = [r for r in results if not r["ok"]]
+    busy = sum(r["seconds"] for r in results)
+    print(f"\n📊 {len(ok)}/{len(results)} {label}(s) OK em {wall_seconds:.1f}s "
+          f"(soma dos jobs {busy:.1f}s, ganho {busy / max(wall_seconds, 1e-9):.1f}x)")
+    for r in failed:
+        print(f"  ❌ {r['name']}: código {r['returncode']} — veja {r['log']}")
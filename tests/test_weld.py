@@ -0,0 +1,75 @@
+"""
+weld_vertices: todo par de vértices a até `dist` acaba no mesmo vértice, e
+só eles (grupos = componentes conexas do grafo "a até dist").
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trackgen_core import MeshBuffers, weld_vertices
+
+
+def _components(verts, dist):
+    """Grupos por força bruta: union-find sobre todos os pares a até dist."""
+    parent = list(range(len(verts)))
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    d = np.linalg.norm(verts[:, None] - verts[None], axis=2)
+    for i, j in zip(*np.nonzero(np.triu(d <= dist, 1))):
+        parent[find(i)] = find(j)
+    return np.array([find(k) for k in range(len(verts))])
+
+
+def _weld(verts, dist):
+    buf = MeshBuffers(verts, [], [])
+    return weld_vertices(buf, dist)
+
+
+def _same_partition(a, b):
+    pairs = set(zip(a.tolist(), b.tolist()))
+    return len(pairs) == len(set(a.tolist())) == len(set(b.tolist()))
+
+
+def test_pair_across_cells():
+    out, remap = _weld(np.array([[1.3, 0.0, 0.0], [0.45, 0.0, 0.0]]), 1.0)
+    assert remap[0] == remap[1]
+    assert len(out.verts) == 1
+
+
+def test_far_pair_stays():
+    out, remap = _weld(np.array([[0.0, 0.0, 0.0], [1.01, 0.0, 0.0]]), 1.0)
+    assert remap[0] != remap[1]
+    assert len(out.verts) == 2
+
+
+def test_chain_merges_into_lowest_index():
+    verts = np.array([[2.7, 0.0, 0.0], [0.0, 0.0, 0.0], [0.9, 0.0, 0.0], [1.8, 0.0, 0.0]])
+    out, remap = _weld(verts, 1.0)
+    assert len(set(remap.tolist())) == 1
+    assert np.allclose(out.verts, [[2.7, 0.0, 0.0]])
+
+
+def test_all_close_pairs_merged():
+    rng = np.random.default_rng(7)
+    for dist, spread in ((1.0, 12.0), (0.05, 0.6), (1e-4, 2e-3)):
+        verts = rng.uniform(-spread, spread, size=(400, 3))
+        # duplicatas exatas e quase-duplicatas, como nas emendas das varreduras
+        verts = np.concatenate([verts, verts[:50], verts[50:100] + dist * 0.5 * rng.uniform(-1, 1, (50, 3))])
+        _, remap = _weld(verts, dist)
+        assert _same_partition(remap, _components(verts, dist))
+
+
+def test_faces_collapsed_by_weld_are_dropped():
+    verts = [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 0, 1e-6], [1, 0, 1e-6], [0, 1, 0]]
+    buf = MeshBuffers(verts, [0, 1, 2, 3, 4, 0], [3, 3])
+    out, _ = weld_vertices(buf, 1e-4)
+    assert len(out) == 1
+    assert len(out.verts) == 4
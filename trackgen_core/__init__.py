@@ -0,0 +1,41 @@
+"""
+Núcleo do TrackGen sem Blender (só Python + NumPy).
+
+Gera programa, frames, seções varridas, caixas, spawns e checkpoints como
+arrays e registros simples; o TrackGen.py só sobe o resultado para o Blender.
+As funções recebem `cfg` (ver config.load_config) com os nomes em MAIÚSCULAS.
+"""
+from .config import (
+    ConfigError, TrackConfig, get_arg, parse_argv, load_preset, validate_config, load_config,
+)
+from .program import block_straight, block_curve, block_grade, random_block, program_from_blocks
+from .frames import TrackFrames, exp_smooth, frames_from_program
+from .buffers import MeshBuffers, concat_buffers
+from .sweep import SweepProfile, sweep_profile, road_profile, barrier_profile, buildpad_profile, tunnel_profile
+from .boxes import box_buffers, BoxBatch
+from .placement import (
+    place_block_area, block_barrier_box, place_block_areas,
+    place_buildings_along_pads, make_obstacle_form, place_obstacles,
+)
+from .overlap import (
+    FootprintIndex, box_footprint, scale_footprint, footprints_overlap, fit_box, shrink_scales,
+    corridor_half_width,
+)
+from .spawns import track_euler, spawn_records, checkpoint_records
+from .gamedata import GameDataRegistry, read_track_binary, nearest_checkpoint
+from .partition import partition_faces, face_centers, split_buffers
+from .chunks import plan_chunks, track_components, iter_chunks
+from .rng import stage_seed, stage_rng, ChunkedRng
+from .cache import StageCache, code_fingerprint, hash_key
+from .stages import STAGE_PARAMS, TrackStages
+from .perf import PerfRecorder, peak_rss_mb
+from .lod import (
+    LOD_LEVEL_NAMES, lod_levels, bounding_radius, lod_distances, compact, align_materials, cluster_lods,
+)
+from .collision import (
+    COLLISION_SWEEP_MATERIALS, BOX_COLLISION_MATERIALS, resample_frames, collision_profile,
+    collision_sweep_indices, collision_sweeps, select_faces, collision_buffers, box_primitives,
+    take_primitives, primitives_by_frame, assign_points, assign_faces,
+)
+from .atlas import palette_atlas, palette_slots
+from .weld import cluster_vertices, weld_vertices, face_normals, flip_faces, consistent_winding, loop_normals, postprocess_buffers
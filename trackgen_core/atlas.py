@@ -0,0 +1,61 @@
+"""
+Atlas de paleta: todas as cores chapadas (estrada, barreira, pad, prédio,
+obstáculo, piso de quadra) numa textura só, com células de PALETTE_CELL px.
+
+Cada material de cor vira um par de UV no centro da sua célula; as faces
+desses materiais passam a usar um único material (a paleta) com os UVs
+apontando para a cor certa. Uma textura pequena por YDR em vez de uma
+400x400 por cor, e um shader só em vez de um por cor.
+"""
+import math
+
+import numpy as np
+
+
+def _pow2(n):
+    return 1 << max(int(n) - 1, 0).bit_length()
+
+
+def palette_atlas(colors, cell=4):
+    """
+    Imagem (H, W, 4) uint8 (linha 0 em cima, como no PNG) com uma célula
+    cell x cell por cor distinta de `colors` (RGB/RGBA 0..1) e UVs (N, 2)
+    do centro da célula de cada cor (v de baixo para cima, como no Blender).
+    Lados em potência de 2; cores repetidas dividem a célula.
+    """
+    cell = max(int(cell), 1)
+    rgba = [tuple(int(c * 255) for c in (tuple(col) + (1.0,))[:4]) for col in colors]
+    unique = list(dict.fromkeys(rgba))
+    cols = max(1, math.ceil(math.sqrt(len(unique))))
+    rows = max(1, math.ceil(len(unique) / cols))
+    w, h = _pow2(cols * cell), _pow2(rows * cell)
+
+    pixels = np.zeros((h, w, 4), dtype=np.uint8)
+    centers = {}
+    for k, color in enumerate(unique):
+        r, c = divmod(k, cols)
+        pixels[r * cell:(r + 1) * cell, c * cell:(c + 1) * cell] = color
+        centers[color] = ((c + 0.5) * cell / w, 1.0 - (r + 0.5) * cell / h)
+    uvs = np.array([centers[color] for color in rgba], dtype=np.float64).reshape(-1, 2)
+    return pixels, uvs
+
+
+def palette_slots(materials, palette):
+    """
+    Junta os slots de `materials` (nomes) que estão em `palette` (nome -> uv)
+    num slot só, no fim. Devolve (remap (S,) slot antigo -> novo, kept =
+    slots antigos mantidos na ordem, uv (S, 2) com NaN fora da paleta).
+    Sem nenhum material da paleta, remap é a identidade.
+    """
+    uv = np.full((len(materials), 2), np.nan)
+    kept = []
+    remap = np.empty(len(materials), dtype=np.int64)
+    for i, name in enumerate(materials):
+        if name in palette:
+            uv[i] = palette[name]
+        else:
+            remap[i] = len(kept)
+            kept.append(i)
+    in_palette = ~np.isnan(uv[:, 0])
+    remap[in_palette] = len(kept)
+    return remap, kept, uv
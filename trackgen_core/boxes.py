@@ -0,0 +1,98 @@
+"""
+Caixas orientadas em lote (prédios, obstáculos, quadras).
+"""
+import numpy as np
+
+from .buffers import MeshBuffers
+
+
+# cantos: bit 4 = +right, bit 2 = +forward, bit 1 = +up
+_BOX_SIGNS = np.array([[(i >> 2) & 1, (i >> 1) & 1, i & 1] for i in range(8)], dtype=np.float64) * 2.0 - 1.0
+# quads com normal para fora numa base destra (right, forward, up)
+_BOX_QUADS = np.array([
+    (4, 6, 7, 5),  # +right
+    (0, 1, 3, 2),  # -right
+    (2, 3, 7, 6),  # +forward
+    (0, 4, 5, 1),  # -forward
+    (1, 5, 7, 3),  # +up
+    (0, 2, 6, 4),  # -up
+], dtype=np.int64)
+
+
+def box_buffers(centers, right, forward, up, sizes, material=None):
+    """
+    Gera K caixas orientadas de uma vez.
+      centers, right, forward, up -> (K, 3)   (eixos não precisam estar normalizados)
+      sizes                       -> (K, 3)   (size_r, size_f, size_u)
+    Base canhota (det < 0) inverte o winding da caixa, mantendo as normais para fora.
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    k = len(centers)
+    if k == 0:
+        return MeshBuffers(np.zeros((0, 3)), [], [])
+
+    def unit(v):
+        v = np.broadcast_to(np.asarray(v, dtype=np.float64), (k, 3))
+        return v / np.linalg.norm(v, axis=1)[:, None]
+
+    r, f, u = unit(right), unit(forward), unit(up)
+    half = np.broadcast_to(np.asarray(sizes, dtype=np.float64), (k, 3)) * 0.5
+
+    verts = (centers[:, None, :]
+             + (_BOX_SIGNS[None, :, 0:1] * half[:, None, 0:1]) * r[:, None, :]
+             + (_BOX_SIGNS[None, :, 1:2] * half[:, None, 1:2]) * f[:, None, :]
+             + (_BOX_SIGNS[None, :, 2:3] * half[:, None, 2:3]) * u[:, None, :])   # (K, 8, 3)
+
+    left_handed = np.einsum("ij,ij->i", np.cross(r, f), u) < 0
+    quads = np.broadcast_to(_BOX_QUADS, (k, 6, 4)).copy()
+    quads[left_handed] = quads[left_handed][:, :, ::-1]
+    quads += (np.arange(k) * 8)[:, None, None]
+
+    return MeshBuffers(
+        verts.reshape(-1, 3),
+        quads.ravel(),
+        np.full(k * 6, 4, dtype=np.int64),
+        materials=[material] if material else [],
+    )
+
+
+class BoxBatch:
+    """
+    Acumula caixas orientadas (centro, base, tamanho) para emitir todas
+    num único Mesh com box_buffers, em vez de um objeto por caixa.
+    `tag` guarda o índice do frame de origem (usado para dividir por trecho de s).
+    """
+    __slots__ = ("centers", "rights", "forwards", "ups", "sizes", "tags")
+
+    def __init__(self):
+        self.centers, self.rights, self.forwards, self.ups, self.sizes, self.tags = [], [], [], [], [], []
+
+    def __len__(self):
+        return len(self.centers)
+
+    def add(self, center, right, forward, up, size_r, size_f, size_u, tag=0):
+        self.centers.append(tuple(center))
+        self.rights.append(tuple(right))
+        self.forwards.append(tuple(forward))
+        self.ups.append(tuple(up))
+        self.sizes.append((size_r, size_f, size_u))
+        self.tags.append(tag)
+
+    def extend(self, other):
+        """Acrescenta todas as caixas de outro BoxBatch."""
+        for key in self.__slots__:
+            getattr(self, key).extend(getattr(other, key))
+
+    def arrays(self):
+        """Caixas como arrays: dict com centers/rights/forwards/ups/sizes (K, 3) e tags (K,)."""
+        out = {k: np.asarray(getattr(self, k), dtype=np.float64).reshape(-1, 3)
+               for k in ("centers", "rights", "forwards", "ups", "sizes")}
+        out["tags"] = np.asarray(self.tags, dtype=np.int64)
+        return out
+
+    def buffers(self, material=None, select=None):
+        """MeshBuffers de todas as caixas (ou só das marcadas em `select`)."""
+        a = self.arrays()
+        if select is not None:
+            a = {k: v[select] for k, v in a.items()}
+        return box_buffers(a["centers"], a["rights"], a["forwards"], a["ups"], a["sizes"], material)
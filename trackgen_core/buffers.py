@@ -0,0 +1,61 @@
+"""
+Geometria em arrays planos (MeshBuffers), independente do Blender.
+"""
+import numpy as np
+
+
+class MeshBuffers:
+    """
+    Geometria em arrays planos, pronta para subir num Mesh de uma vez:
+      verts     (N, 3) float  posições
+      loops     (L,)   int    índices de vértice de todas as faces, em sequência
+      sizes     (F,)   int    nº de cantos de cada face
+      mats      (F,)   int    índice em `materials` por face
+      materials list[str]     chaves de material (o adaptador resolve no Blender)
+      smooth    (F,)   bool   shade smooth por face
+      normals   (L, 3) float  normais por canto (opcional, ver weld.py)
+    """
+    __slots__ = ("verts", "loops", "sizes", "mats", "materials", "smooth", "normals")
+
+    def __init__(self, verts, loops, sizes, mats=None, materials=None, smooth=False, normals=None):
+        self.verts = np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+        self.loops = np.asarray(loops, dtype=np.int64).ravel()
+        self.sizes = np.asarray(sizes, dtype=np.int64).ravel()
+        self.mats = np.zeros(len(self.sizes), dtype=np.int64) if mats is None else np.asarray(mats, dtype=np.int64)
+        self.materials = list(materials or [])
+        self.smooth = np.broadcast_to(np.asarray(smooth, dtype=bool), self.sizes.shape).copy()
+        self.normals = None if normals is None else np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.sizes)
+
+
+def concat_buffers(bufs):
+    """
+    Junta vários MeshBuffers em um só (reindexa vértices e materiais).
+    Normais por canto só são mantidas se todos os buffers tiverem.
+    """
+    bufs = [b for b in bufs if b is not None and len(b)]
+    materials = []
+    verts, loops, sizes, mats, smooth = [], [], [], [], []
+    v_off = 0
+    for b in bufs:
+        remap = []
+        for m in b.materials:
+            if m not in materials:
+                materials.append(m)
+            remap.append(materials.index(m))
+        verts.append(b.verts)
+        loops.append(b.loops + v_off)
+        sizes.append(b.sizes)
+        mats.append(np.asarray(remap, dtype=np.int64)[b.mats] if remap else b.mats)
+        smooth.append(b.smooth)
+        v_off += len(b.verts)
+    if not bufs:
+        return MeshBuffers(np.zeros((0, 3)), [], [])
+    normals = None
+    if all(b.normals is not None for b in bufs):
+        normals = np.concatenate([b.normals for b in bufs])
+    return MeshBuffers(np.concatenate(verts), np.concatenate(loops),
+                       np.concatenate(sizes), np.concatenate(mats), materials,
+                       np.concatenate(smooth), normals)
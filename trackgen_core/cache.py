@@ -0,0 +1,153 @@
+"""
+Cache em disco endereçado por conteúdo para os estágios da geração.
+
+A chave de cada entrada é o sha256 de (estágio, parâmetros relevantes, chaves
+dos estágios anteriores, versão do código). Entradas são pickles gravados de
+forma atômica; quando a pasta passa de max_bytes as menos usadas são apagadas.
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+_CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+_MISS = object()
+
+
+def code_fingerprint(paths=()):
+    """Hash do código do núcleo (+ arquivos extras): mudar o código invalida o cache."""
+    h = hashlib.sha256()
+    for p in sorted(glob.glob(os.path.join(_CORE_DIR, "*.py"))) + sorted(paths):
+        try:
+            with open(p, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(p.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def hash_key(payload):
+    """sha256 hex de um payload JSON-serializável (ordem de chaves estável)."""
+    text = json.dumps(payload, sort_keys=True, default=repr, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """
+    Cache de estágios em `root` limitado a `max_bytes` (LRU pelo mtime).
+    `salt` entra em todas as chaves (ex.: code_fingerprint()).
+    """
+
+    def __init__(self, root, max_bytes=2 << 30, salt=""):
+        self.root = os.path.abspath(root)
+        self.max_bytes = int(max_bytes)
+        self.salt = salt
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, stage, params=None, upstream=()):
+        return hash_key({"salt": self.salt, "stage": stage, "params": params or {}, "upstream": list(upstream)})
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key + ".pkl")
+
+    def load(self, key, default=None):
+        p = self.path(key)
+        try:
+            with open(p, "rb") as f:
+                value = pickle.load(f)
+        except Exception:
+            self.misses += 1
+            return default
+        try:
+            os.utime(p)  # marca como usado recentemente (LRU)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def store(self, key, value):
+        p = self.path(key)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(p), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, p)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self.evict()
+        return value
+
+    def get_or_compute(self, key, fn, label=""):
+        value = self.load(key, _MISS)
+        if value is not _MISS:
+            print(f"♻️ cache: {label or key[:12]}")
+            return value
+        return self.store(key, fn())
+
+    # --- pastas de arquivos (assets convertidos)
+
+    def store_files(self, key, folder, since=None):
+        """
+        Guarda os arquivos de `folder` (caminhos relativos -> bytes); com
+        `since` (timestamp) só os criados/alterados a partir dele.
+        """
+        files = {}
+        for dirpath, _, names in os.walk(folder):
+            for name in names:
+                full = os.path.join(dirpath, name)
+                if since is not None and os.path.getmtime(full) < since:
+                    continue
+                with open(full, "rb") as f:
+                    files[os.path.relpath(full, folder)] = f.read()
+        self.store(key, files)
+        return len(files)
+
+    def restore_files(self, key, folder):
+        """Recria em `folder` os arquivos guardados por store_files; None se não houver."""
+        files = self.load(key)
+        if files is None:
+            return None
+        for rel, data in files.items():
+            full = os.path.join(folder, rel)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, "wb") as f:
+                f.write(data)
+        return len(files)
+
+    # --- limite de tamanho
+
+    def evict(self):
+        """Apaga as entradas usadas há mais tempo até a pasta caber em max_bytes."""
+        entries = []
+        total = 0
+        for p in glob.glob(os.path.join(self.root, "*", "*.pkl")):
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(p)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            print(f"🧹 cache: {removed} entrada(s) antigas removidas ({total / 2**20:.0f} MB em uso)")
+        return removed
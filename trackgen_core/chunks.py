@@ -0,0 +1,136 @@
+"""
+Geração da pista em pedaços ao longo de s: cada trecho sai pronto como um MeshBuffers.
+"""
+import numpy as np
+
+from .boxes import box_buffers
+from .buffers import concat_buffers
+from .sweep import barrier_profile, buildpad_profile, road_profile, sweep_profile, tunnel_profile
+
+
+def plan_chunks(s, sweep_verts, box_verts, vertex_limit, max_len):
+    """
+    Corta os frames em trechos [i0, i1] (pedaços vizinhos compartilham o frame
+    da emenda) com no máximo vertex_limit vértices e max_len metros de s.
+      sweep_verts: vértices por frame das seções varridas
+      box_verts:   (N,) vértices das caixas atribuídas a cada frame
+    As caixas do frame da emenda vão para o pedaço seguinte.
+    """
+    s = np.asarray(s, dtype=np.float64)
+    n = len(s)
+    if n == 0:
+        return []
+    box_verts = np.asarray(box_verts).tolist()
+    s_list = s.tolist()
+
+    ranges = []
+    i0 = 0
+    count = sweep_verts + box_verts[0]
+    for i in range(1, n):
+        add = sweep_verts + box_verts[i]
+        if i - 1 > i0 and (count + add > vertex_limit or s_list[i] - s_list[i0] > max_len):
+            ranges.append((i0, i - 1))
+            i0 = i - 1
+            count = sweep_verts + box_verts[i0]
+        count += add
+    ranges.append((i0, n - 1))
+    return ranges
+
+
+def track_components(stages):
+    """
+    Tudo que compõe a pista, separado para o modo em pedaços:
+      sweeps: [(perfil, side, material)]   seções varridas visíveis
+      boxes:  [(BoxBatch, material)]       caixas visíveis (tag = frame)
+      hidden: [(nome, MeshBuffers)]        partes invisíveis (túnel/piso/barreiras ocultos)
+    `stages` é um TrackStages: prédios, obstáculos e quadras vêm do cache quando possível.
+    """
+    cfg = stages.cfg
+    sweeps = [(road_profile(cfg), 1, "road")]
+    if cfg.BARRIERS:
+        sweeps += [(barrier_profile(cfg), -1, "barrier"), (barrier_profile(cfg), 1, "barrier")]
+    if cfg.BUILD_PAD_ENABLE:
+        sweeps += [(buildpad_profile(cfg), -1, "buildpad"), (buildpad_profile(cfg), 1, "buildpad")]
+
+    hidden = []
+    if cfg.TUNNEL_ENABLE:
+        if cfg.TUNNEL_VISIBLE:
+            sweeps.append((tunnel_profile(cfg), 1, "tunnel"))
+        else:
+            hidden.append(("Tunnel", stages.sweep("tunnel")))
+
+    boxes = []
+    if cfg.BUILDINGS_ENABLE:
+        if cfg.BUILD_SIDE_L: boxes += [(b, "building") for b in stages.buildings(-1)]
+        if cfg.BUILD_SIDE_R: boxes += [(b, "building") for b in stages.buildings(+1)]
+    if cfg.OBSTACLES_ENABLE:
+        boxes.append((stages.obstacles(), "obstacle"))
+    if cfg.BLOCK_AREAS_ENABLE:
+        for name, batch, material, visible in stages.block_areas():
+            if visible:
+                boxes.append((batch, material))
+            elif len(batch):
+                hidden.append((name, batch.buffers(material)))
+
+    return sweeps, boxes, hidden
+
+
+def _chunk_buffers(frames, sweeps, box_arrays, i0, i1, stride=1, min_box=0.0):
+    """
+    Geometria do trecho [i0, i1]: seções varridas com 1 frame a cada `stride`
+    (as pontas sempre entram) e as caixas cujo maior lado é >= min_box.
+    box_arrays: [(arrays, material, índices das caixas do trecho)]
+    """
+    n = len(frames)
+    if stride > 1:
+        idx = np.arange(i0, i1 + 1, stride)
+        if idx[-1] != i1:
+            idx = np.append(idx, i1)
+        sub = frames[idx]
+    else:
+        sub = frames[i0:i1 + 1]
+    bufs = [
+        sweep_profile(sub, profile, side, material,
+                      caps=(profile.caps and i0 == 0, profile.caps and i1 == n - 1))
+        for profile, side, material in sweeps
+    ]
+    for a, material, sel in box_arrays:
+        if min_box > 0:
+            sel = sel[a["sizes"][sel].max(axis=1) >= min_box]
+        if len(sel):
+            bufs.append(box_buffers(a["centers"][sel], a["rights"][sel], a["forwards"][sel],
+                                    a["ups"][sel], a["sizes"][sel], material))
+    return concat_buffers(bufs)
+
+
+def iter_chunks(frames, sweeps, boxes, vertex_limit, max_len, levels=()):
+    """
+    Gera (k, i0, i1, MeshBuffers, lods) para cada trecho de plan_chunks; só um
+    trecho de geometria existe em memória por vez. `levels` = [(stride,
+    min_box)] por nível de LOD (ver lod.lod_levels); lods traz um MeshBuffers
+    por nível, do mesmo trecho com frames mais espaçados e sem caixas pequenas.
+    """
+    n = len(frames)
+    box_arrays = [(b.arrays(), material) for b, material in boxes if len(b)]
+    box_verts = np.zeros(n)
+    for a, _ in box_arrays:
+        np.add.at(box_verts, a["tags"], 8)
+
+    sweep_verts = sum(len(profile.h) for profile, _, _ in sweeps)
+    ranges = plan_chunks(frames.s, sweep_verts, box_verts, vertex_limit, max_len)
+    starts = np.array([i0 for i0, _ in ranges], dtype=np.int64)
+    # caixas ordenadas por trecho uma vez só; cada trecho pega a sua fatia
+    box_slices = []
+    for a, _ in box_arrays:
+        chunk = np.searchsorted(starts, a["tags"], side="right") - 1
+        order = np.argsort(chunk, kind="stable")
+        bounds = np.searchsorted(chunk[order], np.arange(len(ranges) + 1), side="left")
+        box_slices.append((order, bounds))
+
+    for k, (i0, i1) in enumerate(ranges):
+        chunk_boxes = [(a, material, order[bounds[k]:bounds[k + 1]])
+                       for (a, material), (order, bounds) in zip(box_arrays, box_slices)]
+        buf = _chunk_buffers(frames, sweeps, chunk_boxes, i0, i1)
+        lods = [_chunk_buffers(frames, sweeps, chunk_boxes, i0, i1, stride, min_box)
+                for stride, min_box in levels]
+        yield k, i0, i1, buf, lods
@@ -0,0 +1,194 @@
+"""
+Colisão simplificada: estrada, barreiras e pads varridos por um subconjunto
+dos frames com erro limitado e sem as faces que nenhum veículo toca.
+
+O visual continua com um frame a cada STEP_LEN; a colisão só precisa seguir
+a superfície dentro de COLLISION_TOLERANCE, então retas e curvas suaves
+viram poucas faixas longas (até COLLISION_MAX_SEG metros). Prédios e
+obstáculos já são caixas orientadas: vão para o composite como primitivas
+de caixa (box_primitives) em vez de 12 triângulos cada.
+"""
+import numpy as np
+
+from .buffers import concat_buffers
+from .partition import face_centers, split_buffers
+from .sweep import SweepProfile, sweep_profile
+
+# materiais das seções varridas que ganham colisão simplificada
+COLLISION_SWEEP_MATERIALS = ("road", "barrier", "buildpad")
+# materiais das caixas que viram primitivas de caixa na colisão
+BOX_COLLISION_MATERIALS = ("building", "obstacle")
+
+
+def _control_points(frames, reach, height):
+    """(N, 4, 3): centro, bordas ±reach e topo (height) de cada frame."""
+    right = frames.right * reach[:, None]
+    return np.stack([frames.pos, frames.pos + right, frames.pos - right,
+                     frames.pos + frames.up * height], axis=1)
+
+
+def resample_frames(frames, tolerance, max_len=0.0, reach=None, height=0.0):
+    """
+    Índices de frames (crescentes, com o 1º e o último) tais que interpolar
+    linearmente entre frames vizinhos desvia no máximo `tolerance` metros dos
+    pontos de controle originais (centro, bordas a `reach` e topo a `height`).
+    Douglas-Peucker em s; com max_len > 0 nenhum intervalo passa disso.
+    """
+    n = len(frames)
+    if n <= 2:
+        return np.arange(n)
+    reach = np.zeros(n) if reach is None else np.broadcast_to(np.asarray(reach, dtype=np.float64), (n,))
+    pts = _control_points(frames, reach, height)
+    s = frames.s
+
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        t = (s[a + 1:b] - s[a]) / max(s[b] - s[a], 1e-9)
+        interp = pts[a] + (pts[b] - pts[a]) * t[:, None, None]
+        err = np.linalg.norm(pts[a + 1:b] - interp, axis=2).max(axis=1)
+        worst = int(err.argmax())
+        if err[worst] > tolerance:
+            mid = a + 1 + worst
+        elif max_len > 0 and s[b] - s[a] > max_len:
+            mid = int(np.searchsorted(s, 0.5 * (s[a] + s[b]), side="left"))
+            mid = min(max(mid, a + 1), b - 1)
+        else:
+            continue
+        keep[mid] = True
+        stack += [(a, mid), (mid, b)]
+    return np.flatnonzero(keep)
+
+
+def collision_profile(profile):
+    """Mesmo perfil sem a face de baixo (a aresta no h mínimo) e com as tampas originais."""
+    h = profile.h
+    low = np.isclose(h, h.min())
+    bottom = low & np.roll(low, -1)  # aresta j -> j+1 inteira no chão
+    faces = profile.faces[~bottom[profile.faces]]
+    pts = np.stack([profile.k_edge, profile.lat, h], axis=1)
+    return SweepProfile(pts, faces=faces, caps=profile.caps)
+
+
+def collision_sweep_indices(cfg, frames, sweeps):
+    """Frames mantidos na colisão (resample_frames) para as seções de COLLISION_SWEEP_MATERIALS."""
+    sweeps = [sw for sw in sweeps if sw[2] in COLLISION_SWEEP_MATERIALS]
+    if not sweeps:
+        return np.zeros(0, dtype=np.int64)
+    edge = frames.road_w * 0.5 + frames.shoulder_w
+    reach = np.max([np.abs(edge[:, None] * p.k_edge + p.lat).max(axis=1) for p, _, _ in sweeps], axis=0)
+    height = max(float(p.h.max()) for p, _, _ in sweeps)
+    return resample_frames(frames, cfg.COLLISION_TOLERANCE, cfg.COLLISION_MAX_SEG, reach, height)
+
+
+def collision_sweeps(frames, sweeps, keep, i0=0, i1=None):
+    """
+    MeshBuffers das seções de COLLISION_SWEEP_MATERIALS varridas só pelos
+    frames `keep` dentro de [i0, i1] (as pontas sempre entram), sem as faces de baixo.
+    """
+    n = len(frames)
+    i1 = n - 1 if i1 is None else i1
+    idx = np.union1d(keep[(keep >= i0) & (keep <= i1)], [i0, i1]).astype(np.int64)
+    sub = frames[idx]
+    bufs = []
+    for profile, side, material in sweeps:
+        if material not in COLLISION_SWEEP_MATERIALS:
+            continue
+        col = collision_profile(profile)
+        bufs.append(sweep_profile(sub, col, side, material,
+                                  caps=(col.caps and i0 == 0, col.caps and i1 == n - 1)))
+    return concat_buffers(bufs)
+
+
+def select_faces(buf, keep):
+    """Só as faces marcadas (F,) bool, com vértices reindexados."""
+    if not len(buf) or keep.all():
+        return buf
+    return next(split_buffers(buf, (~keep).astype(np.int64)))[2]
+
+
+def collision_buffers(visual, coarse, replaced):
+    """
+    Colisão de uma parte: as faces do visual cujo material não está em
+    `replaced` (prédios, obstáculos, túnel...) + as seções simplificadas `coarse`.
+    """
+    replaced = set(replaced)
+    drop = np.array([m in replaced for m in visual.materials] + [False], dtype=bool)
+    mats = np.where(visual.mats < len(visual.materials), visual.mats, len(visual.materials))
+    return concat_buffers([select_faces(visual, ~drop[mats]), coarse])
+
+
+def box_primitives(boxes, select=None):
+    """
+    Caixas de BOX_COLLISION_MATERIALS como primitivas de colisão: dict com
+    centers (K, 3), rotations (K, 3, 3) ortonormais destras (colunas = right,
+    forward, up), sizes (K, 3), materials (K chaves) e tags (K,) frame de cada
+    caixa. `boxes` = [(BoxBatch, material)]; select(tags) -> máscara escolhe as caixas.
+    """
+    centers, rotations, sizes, materials, tags = [], [], [], [], []
+    for batch, material in boxes:
+        if material not in BOX_COLLISION_MATERIALS or not len(batch):
+            continue
+        a = batch.arrays()
+        sel = np.ones(len(batch), dtype=bool) if select is None else select(a["tags"])
+        if not sel.any():
+            continue
+        # Gram-Schmidt a partir de up; base canhota vira destra (a caixa é simétrica)
+        u = a["ups"][sel] / np.linalg.norm(a["ups"][sel], axis=1)[:, None]
+        f = a["forwards"][sel] - u * np.einsum("ij,ij->i", a["forwards"][sel], u)[:, None]
+        f /= np.linalg.norm(f, axis=1)[:, None]
+        r = np.cross(f, u)
+        centers.append(a["centers"][sel])
+        rotations.append(np.stack([r, f, u], axis=2))
+        sizes.append(a["sizes"][sel])
+        tags.append(a["tags"][sel])
+        materials += [material] * int(sel.sum())
+    if not centers:
+        return {"centers": np.zeros((0, 3)), "rotations": np.zeros((0, 3, 3)),
+                "sizes": np.zeros((0, 3)), "materials": [], "tags": np.zeros(0, dtype=np.int64)}
+    return {"centers": np.concatenate(centers), "rotations": np.concatenate(rotations),
+            "sizes": np.concatenate(sizes), "materials": materials, "tags": np.concatenate(tags)}
+
+
+def take_primitives(prims, sel):
+    """Subconjunto (máscara ou índices) de um dict de box_primitives."""
+    idx = np.flatnonzero(sel) if np.asarray(sel).dtype == bool else np.asarray(sel, dtype=np.int64)
+    return {"centers": prims["centers"][idx], "rotations": prims["rotations"][idx],
+            "sizes": prims["sizes"][idx], "materials": [prims["materials"][i] for i in idx],
+            "tags": prims["tags"][idx]}
+
+
+def primitives_by_frame(prims):
+    """
+    Fatiador das primitivas por faixa de frames: ordena por tag uma vez e
+    devolve take(i0, i1, last) com as caixas de tag em [i0, i1) (com o i1 se
+    last), a mesma regra de iter_chunks para o frame da emenda.
+    """
+    order = np.argsort(prims["tags"], kind="stable")
+    tags = prims["tags"][order]
+
+    def take(i0, i1, last=False):
+        a = np.searchsorted(tags, i0, side="left")
+        b = np.searchsorted(tags, i1, side="right" if last else "left")
+        return take_primitives(prims, np.sort(order[a:b]))
+    return take
+
+
+def assign_points(points, part_centers):
+    """Parte (K,) de cada ponto: a de centro mais próximo (em XY, como partition_faces)."""
+    centers = np.asarray(points, dtype=np.float64).reshape(-1, 3)[:, :2]
+    part_centers = np.asarray(part_centers, dtype=np.float64).reshape(-1, 3)[:, :2]
+    out = np.empty(len(centers), dtype=np.int64)
+    for a in range(0, len(centers), 4096):  # blocos para não montar F x P inteiro
+        d = centers[a:a + 4096, None, :] - part_centers[None, :, :]
+        out[a:a + 4096] = np.einsum("ijk,ijk->ij", d, d).argmin(axis=1)
+    return out
+
+
+def assign_faces(buf, part_centers):
+    """Parte (F,) de cada face de `buf` (ver assign_points)."""
+    return assign_points(face_centers(buf), part_centers)
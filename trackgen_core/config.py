@@ -0,0 +1,493 @@
+"""
+Parâmetros do TrackGen (presets JSON/TOML + argumentos de linha de comando), sem depender do Blender.
+
+A linha de comando é lida uma vez só; presets e args usam os mesmos nomes
+(blocks=120, obs_prob=0.5, ...). Valores inválidos, nomes desconhecidos e
+faixas impossíveis viram ConfigError antes de qualquer geração.
+"""
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+from .cache import hash_key
+
+
+class ConfigError(ValueError):
+    pass
+
+
+class TrackConfig(SimpleNamespace):
+    """
+    Parâmetros já validados (cfg.SEED, cfg.STEP_LEN, ...). Imutável e
+    hashable: digest() identifica a configuração (ou só os nomes pedidos).
+    """
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"TrackConfig é imutável (use cfg.replace({name}=...))")
+
+    def __delattr__(self, name):
+        raise AttributeError("TrackConfig é imutável")
+
+    def __hash__(self):
+        return hash(self.digest())
+
+    def digest(self, names=None):
+        """sha256 dos parâmetros (todos ou só `names`)."""
+        items = vars(self) if names is None else {n: getattr(self, n) for n in names}
+        return hash_key(items)
+
+    def replace(self, **changes):
+        """Cópia com alguns parâmetros trocados (nomes em MAIÚSCULAS), validada."""
+        unknown = sorted(set(changes) - set(vars(self)))
+        if unknown:
+            raise ConfigError(f"parâmetros desconhecidos: {', '.join(unknown)}")
+        cfg = TrackConfig(**dict(vars(self), **changes))
+        validate_config(cfg)
+        return cfg
+
+
+def get_arg(k, default=None, cast=str, argv=None):
+    for a in (sys.argv if argv is None else argv):
+        if a.startswith("--" + k + "=") or a.startswith(k + "="):
+            try:
+                v = a.split("=", 1)[1].strip().strip('"').strip("'")
+                return cast(v)
+            except Exception:
+                return default
+    return default
+
+
+def parse_argv(argv=None):
+    """
+    Args 'k=v' / '--k=v' -> dict (uma passada; vale a 1ª ocorrência de cada k).
+    Se houver '--' (blender -b -P TrackGen.py -- ...) só o que vem depois conta.
+    """
+    argv = sys.argv if argv is None else argv
+    if "--" in argv:
+        argv = argv[argv.index("--") + 1:]
+    values = {}
+    for a in argv:
+        if "=" not in a:
+            continue
+        k, v = a.split("=", 1)
+        if k.startswith("--"):
+            k = k[2:]
+        values.setdefault(k, v.strip().strip('"').strip("'"))
+    return values
+
+
+def load_preset(path):
+    """Lê um preset .json ou .toml -> dict {arg: valor}; tabelas TOML só agrupam (são achatadas)."""
+    try:
+        if path.lower().endswith(".toml"):
+            try:
+                import tomllib
+            except ImportError:  # Python < 3.11
+                import tomli as tomllib
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+    except Exception as e:
+        raise ConfigError(f"preset '{path}': {e}") from e
+    if not isinstance(data, dict):
+        raise ConfigError(f"preset '{path}': esperado um objeto/tabela de parâmetros")
+
+    flat = {}
+    for k, v in data.items():
+        if isinstance(v, dict):
+            flat.update(v)
+        else:
+            flat[k] = v
+    return flat
+
+
+def int_list(value):
+    """'4,12,32' ou [4, 12, 32] -> (4, 12, 32)"""
+    items = value.split(",") if isinstance(value, str) else value
+    return tuple(_cast(v, int) for v in items if str(v).strip())
+
+
+def float_list(value):
+    """'1.5,3' ou [1.5, 3] -> (1.5, 3.0)"""
+    items = value.split(",") if isinstance(value, str) else value
+    return tuple(float(v) for v in items if str(v).strip())
+
+
+def _cast(value, cast):
+    if cast is int:
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError(value)
+            return int(value)
+        return int(value)
+    return cast(value)
+
+
+# validação: (nome, mínimo exclusivo), faixas [0, 1], pares mín <= máx e opções
+_POSITIVE = ("NUM_BLOCKS", "STEP_LEN", "LOD_LIMIT", "VERTEX_LIMIT", "CHUNK_LEN", "RNG_CHUNK_LEN",
+             "BUILD_DENSITY_M", "OBSTACLE_STEP_BASE", "OBSTACLE_STEP_CURVE", "BLOCK_BUILD_SPACING",
+             "COLLISION_TOLERANCE", "TRACK_ARC_STEP", "OVERLAP_CELL", "PALETTE_CELL")
+_NON_NEGATIVE = ("MERGE_DIST", "CACHE_MAX_MB", "BUILD_ROWS", "CHECKPOINT_COUNT", "SPAWN_ROWS",
+                 "SPAWN_PER_ROW", "OBSTACLE_GROUP_SIZE", "COLLISION_MAX_SEG", "SOLLUMZ_WORKERS")
+_UNIT_RANGE = ("OVERLAP_SHRINK_MIN", "BUILD_PROB", "OBSTACLE_PROB", "BLOCK_BUILD_DENSITY", "BANK_SMOOTH", "PITCH_SMOOTH")
+_MIN_MAX = (("BUILD_W_MIN", "BUILD_W_MAX"), ("BUILD_D_MIN", "BUILD_D_MAX"), ("BUILD_H_MIN", "BUILD_H_MAX"),
+            ("OBSTACLE_W_MIN", "OBSTACLE_W_MAX"), ("OBSTACLE_D_MIN", "OBSTACLE_D_MAX"),
+            ("OBSTACLE_H_MIN", "OBSTACLE_H_MAX"))
+_CHOICES = {"OBSTACLE_MODE": (1, 2, 3, 4), "OBSTACLE_TEMPLATE_MODE": (1, 2, 3, 4, 5),
+            "OBSTACLE_JITTER_MODE": (1, 2, 3)}
+
+
+def validate_config(cfg):
+    """Levanta ConfigError com todos os problemas de faixa encontrados."""
+    errors = []
+    for n in _POSITIVE:
+        if not getattr(cfg, n) > 0:
+            errors.append(f"{n}={getattr(cfg, n)} deve ser > 0")
+    for n in _NON_NEGATIVE:
+        if getattr(cfg, n) < 0:
+            errors.append(f"{n}={getattr(cfg, n)} deve ser >= 0")
+    for n in _UNIT_RANGE:
+        if not 0.0 <= getattr(cfg, n) <= 1.0:
+            errors.append(f"{n}={getattr(cfg, n)} deve estar entre 0 e 1")
+    for lo, hi in _MIN_MAX:
+        if getattr(cfg, lo) > getattr(cfg, hi):
+            errors.append(f"{lo}={getattr(cfg, lo)} maior que {hi}={getattr(cfg, hi)}")
+    for n, options in _CHOICES.items():
+        if getattr(cfg, n) not in options:
+            errors.append(f"{n}={getattr(cfg, n)} deve ser um de {options}")
+    if len(cfg.LOD_STRIDES) != len(cfg.LOD_MIN_BOX) or len(cfg.LOD_STRIDES) > 3:
+        errors.append("LOD_STRIDES e LOD_MIN_BOX devem ter o mesmo nº de níveis (até 3)")
+    if any(s < 1 for s in cfg.LOD_STRIDES):
+        errors.append(f"LOD_STRIDES={cfg.LOD_STRIDES} deve ter passos >= 1")
+    if len(cfg.LOD_DIST_MULT) != 4 or list(cfg.LOD_DIST_MULT) != sorted(cfg.LOD_DIST_MULT):
+        errors.append(f"LOD_DIST_MULT={cfg.LOD_DIST_MULT} deve ter 4 valores crescentes (alto..muito baixo)")
+    if errors:
+        raise ConfigError("configuração inválida:\n  " + "\n  ".join(errors))
+
+
+def load_config(argv=None, presets=()):
+    """
+    Monta a configuração: padrões < presets < linha de comando.
+      argv     args 'k=v' (padrão: sys.argv); preset=a.json,b.toml carrega arquivos
+      presets  paths ou dicts {arg: valor} aplicados antes dos args
+    Devolve um TrackConfig com os nomes em MAIÚSCULAS usados pelo núcleo
+    (cfg.STEP_LEN, cfg.SEED, ...); erros de tipo, nomes desconhecidos e faixas
+    inválidas levantam ConfigError.
+    """
+    cli = parse_argv(argv)
+    values = {}
+    for preset in [p for p in cli.pop("preset", "").split(",") if p] + list(presets):
+        values.update(load_preset(preset) if isinstance(preset, str) else preset)
+    values.update(cli)
+
+    used = set()
+    errors = []
+
+    def arg(k, default=None, cast=str):
+        used.add(k)
+        if k not in values:
+            return default
+        try:
+            return _cast(values[k], cast)
+        except (TypeError, ValueError):
+            errors.append(f"{k}={values[k]!r}: esperado {cast.__name__}")
+            return default
+
+    MAP_NAME = arg("MAP_NAME", "tracks", str)
+    OUTPUT_BASE = arg("OUTPUT_BASE", "D:/TrackGen/output", str)  # pasta onde fica cada MAP_NAME
+
+    # cache de estágios (programa, frames, componentes, splits, assets convertidos)
+    CACHE = arg("cache", 1, int) == 1
+    CACHE_DIR = arg("cache_dir", os.path.join(OUTPUT_BASE, "_cache"), str)
+    CACHE_MAX_MB = arg("cache_max_mb", 2048.0, float)  # acima disso apaga as entradas menos usadas
+
+    # perf_report.json por estágio (tempo, CPU, memória, contadores)
+    PERF_REPORT = arg("perf", 1, int) == 1
+    PERF_TRACE_MEMORY = arg("perf_mem", 0, int) == 1  # tracemalloc: pico Python por estágio (mais lento)
+    LOD_LIMIT = arg("LOD_LIMIT", 200.0, float)
+    VERTEX_LIMIT = arg("VERTEX_LIMIT", 32767, int)
+    # modo em pedaços: gera cada trecho de s direto como _split_ (sem join + split)
+    CHUNKED = arg("chunked", 0, int) == 1
+    CHUNK_LEN = arg("chunk_len", 2.0 * LOD_LIMIT, float)  # comprimento máximo de cada trecho (m)
+
+    # rejeição de sobreposição no posicionamento (hash espacial de pegadas + corredor da pista);
+    # opt-in (overlap=1): muda quais prédios/obstáculos saem para a mesma seed
+    OVERLAP_CHECK = arg("overlap", 0, int) == 1
+    OVERLAP_CELL = arg("overlap_cell", 16.0, float)            # célula do hash (m), ~ tamanho das caixas
+    OVERLAP_SHRINK_MIN = arg("overlap_shrink_min", 0.55, float)  # prédio encolhe até essa escala antes de sumir
+    OVERLAP_CLEARANCE = arg("overlap_clearance", 8.0, float)   # altura livre acima da pista (m)
+
+    # LODs por split (médio, baixo, muito baixo) e distâncias pelo raio de cada split
+    # (opt-in: lods=1; desligado, os splits saem só com o modelo HIGH, como antes)
+    LODS = arg("lods", 0, int) == 1
+    LOD_STRIDES = arg("lod_strides", (4, 12, 32), int_list)       # 1 frame a cada N por nível
+    LOD_MIN_BOX = arg("lod_min_box", (3.0, 8.0, 20.0), float_list)  # caixas com maior lado menor que isso somem
+    LOD_DIST_MULT = arg("lod_dist_mult", (1.5, 3.0, 6.0, 10.0), float_list)  # distância = raio x mult
+    LOD_DIST_MIN = arg("lod_dist_min", 100.0, float)
+
+    # colisão simplificada de estrada/barreiras/pads (frames com erro limitado, sem faces de baixo)
+    # (opt-in: col_simplify=1; desligado, a colisão é a cópia do visual, como antes)
+    COLLISION_SIMPLIFY = arg("col_simplify", 0, int) == 1
+    COLLISION_TOLERANCE = arg("col_tol", 0.1, float)    # desvio máximo da superfície visual (m)
+    COLLISION_MAX_SEG = arg("col_max_seg", 40.0, float)  # comprimento máximo de cada faixa (m, 0 = livre)
+    COLLISION_BOXES = arg("col_boxes", 0, int) == 1       # prédios/obstáculos como primitivas de caixa (opt-in)
+
+    # atlas de paleta: cores chapadas numa textura só, UVs nas células e um material único por split
+    # (opt-in: atlas=1; desligado, cada cor segue com seu material, como antes)
+    TEXTURE_ATLAS = arg("atlas", 0, int) == 1
+    PALETTE_CELL = arg("palette_cell", 4, int)  # lado de cada célula (px); 4 = um bloco DXT inteiro
+
+    # conversão/export Sollumz em paralelo: splits divididos entre N processos Blender (0/1 = no processo atual)
+    SOLLUMZ_WORKERS = arg("sz_workers", 0, int)
+    SOLLUMZ_SHARD = arg("sz_shard", "", str)  # manifesto do pedaço (uso interno: linha de comando dos workers)
+
+
+    SEED                   = arg("seed", 1, int)
+    RNG_CHUNK_LEN          = arg("rng_chunk", 400.0, float)  # trecho de s (m) de cada stream de sorteio
+    NUM_BLOCKS             = arg("blocks", 50, int)
+    STEP_LEN               = arg("step", 2.0, float)       # passo ao longo do traçado (m)
+    BASE_ROAD_WIDTH        = arg("road_w", 56.0, float)     # largura base (m)
+    SHOULDER_WIDTH_BASE    = arg("shoulder_w", 0.6, float) # acostamento base (m)
+    ROAD_THICKNESS         = arg("road_t", 1.40, float)    # espessura (m)
+
+    ROAD_MAT_COLOR      = (
+        arg("road_r", 0.5, float),
+        arg("road_g", 0.4, float),
+        arg("road_b", 0.1, float),
+        1.0,
+    )
+
+    # Barreiras (podem desligar com barriers=0)
+    BARRIERS               = arg("barriers", 1, int) == 1
+    BARRIER_HEIGHT         = arg("barrier_h", 1.6, float)
+    BARRIER_THICKNESS      = arg("barrier_t", 0.40, float)
+    BARRIER_OFFSET         = arg("barrier_off", 0.0, float)  # afastamento extra do bordo
+
+    BARRIER_MAT_COLOR      = (
+        arg("barrier_r", 0.1, float),
+        arg("barrier_g", 0.1, float),
+        arg("barrier_b", 0.1, float),
+        1.0,
+    )
+
+    # túnel invisível entre barreiras
+    TUNNEL_ENABLE      = arg("tunnel", 0, int) == 1       # ativa ou não
+    TUNNEL_HEIGHT      = arg("tunnel_h", 10.0, float)      # altura do túnel
+    TUNNEL_THICKNESS   = arg("tunnel_t", 0.40, float)     # espessura das paredes
+    TUNNEL_HAS_ROOF    = arg("tunnel_roof", 1, int) == 1  # gera teto
+    TUNNEL_ROOF_THICK  = arg("roof_t", 0.40, float)       # espessura do teto
+    TUNNEL_VISIBLE     = arg("tunnel_visible", 0, int) == 1  # se 1, gera material visível (pra debug)
+
+
+    # Dinâmica
+    TARGET_SPEED           = arg("v_ms", 45.0, float)  # velocidade alvo (m/s) ~ 162 km/h
+    BANK_MAX_DEG           = arg("bank_max", 10.0, float)
+    BANK_SMOOTH            = arg("bank_smooth", 0.25, float)  # 0..1 filtro exp
+    WIDTH_CURV_FACT        = arg("w_curv", 0.10, float)       # intensidade da variação de largura (0..~0.5)
+    PITCH_SMOOTH           = arg("pitch_smooth", 0.06, float) # suavização de pitch (0..1)
+
+    # Pós
+    MERGE_DIST             = arg("merge", 0.0001, float)
+    AUTO_SMOOTH_ANGLE_DEG  = arg("smooth_angle", 60.0, float)
+
+    # Piso lateral (área para prédios)
+    BUILD_PAD_ENABLE   = arg("pads", 1, int) == 1
+    BUILD_PAD_WIDTH    = arg("pad_w", 50.0, float)   # largura lateral (metros)
+    BUILD_PAD_HEIGHT   = arg("pad_h", 0.2, float)   # espessura do piso
+    BUILD_PAD_OFFSET   = arg("pad_off", 0.0, float) # distância extra após barreira
+
+    BUILD_PAD_MAT_COLOR      = (
+        arg("buildpad_r", 0.1, float),
+        arg("buildpad_g", 0.6, float),
+        arg("buildpad_b", 0.6, float),
+        1.0,
+    )
+
+    # prédios (blocos simples)
+    BUILDINGS_ENABLE      = arg("buildings", 1, int) == 1
+    BUILD_SIDE_L          = arg("build_L", 1, int) == 1  # gerar lado esquerdo
+    BUILD_SIDE_R          = arg("build_R", 1, int) == 1  # gerar lado direito
+    BUILD_DENSITY_M       = arg("build_step", 10.0, float)  # distância entre tentativas (m)
+    BUILD_PROB            = arg("build_prob", 0.85, float)  # chance de colocar prédio em cada tentativa
+    BUILD_MAT_COLOR      = (
+        arg("build_r", 0.0, float),
+        arg("build_g", 0.1, float),
+        arg("build_b", 0.6, float),
+        1.0,
+    )
+
+    # múltiplas fileiras de prédios
+    BUILD_ROWS           = arg("build_rows", 2, int)     # quantas fileiras por lado
+    ROW_SPACING          = arg("row_spacing", 20.0, float) # distância entre fileiras (m)
+    ROW_HEIGHT_VARIATION = arg("row_h_var", 0.4, float)  # variação de altura por fileira (fator 0..1)
+
+
+    # tamanhos (metros)
+    BUILD_W_MIN           = arg("b_w_min", 4.0, float)   # largura (eixo right)
+    BUILD_W_MAX           = arg("b_w_max", 12.0, float)
+    BUILD_D_MIN           = arg("b_d_min", 5.0, float)   # profundidade (eixo forward)
+    BUILD_D_MAX           = arg("b_d_max", 18.0, float)
+    BUILD_H_MIN           = arg("b_h_min", 6.0, float)   # altura (eixo up)
+    BUILD_H_MAX           = arg("b_h_max", 58.0, float)
+
+    # recuos e ajustes
+    BUILD_SETBACK         = arg("b_setback", 10.0, float)   # recuo a partir da borda EXTERNA do pad
+    BUILD_JITTER_R        = arg("b_jit_r", 0.8, float)     # aleatório lateral (m)
+    BUILD_JITTER_F        = arg("b_jit_f", 0.8, float)     # aleatório ao longo (m)
+
+    # orientação dos prédios
+    BUILD_ALIGN_WORLD = arg("build_align_world", 1, int) == 1  # 1 = reto (up global), 0 = segue inclinação local
+
+    # =====================================================
+    #  O B S T Á C U L O S   (PILARES / BARREIRAS / POSTES)
+    # =====================================================
+
+    # =====================================================
+    #  O B S T Á C U L O S   (PILARES / BARREIRAS / POSTES)
+    # =====================================================
+
+    OBSTACLES_ENABLE        = arg("obstacles", 1, int) == 1
+
+    # densidade e posicionamento
+    OBSTACLE_STEP_BASE      = arg("obs_step", 20.0, float)
+    OBSTACLE_STEP_CURVE     = arg("obs_step_curve", 12.0, float)
+    OBSTACLE_PROB           = arg("obs_prob", 0.7, float)
+
+    # dimensões
+    OBSTACLE_W_MIN          = arg("obs_w_min", 0.6, float)
+    OBSTACLE_W_MAX          = arg("obs_w_max", 2.0, float)
+    OBSTACLE_D_MIN          = arg("obs_d_min", 0.6, float)
+    OBSTACLE_D_MAX          = arg("obs_d_max", 2.5, float)
+    OBSTACLE_H_MIN          = arg("obs_h_min", 3.0, float)
+    OBSTACLE_H_MAX          = arg("obs_h_max", 10.0, float)
+
+    # variações e rotação
+    OBSTACLE_ROT_VARIATION  = arg("obs_rot_var", 10.0, float)
+    OBSTACLE_TILT_VARIATION = arg("obs_tilt_var", 4.0, float)
+    OBSTACLE_UP_OFFSET      = arg("obs_up_off", 0.0, float)
+    OBSTACLE_ALIGN_WORLD    = arg("obs_align_world", 1, int) == 1
+
+    # modos de posição lateral
+    # 1=centro, 2=alternado, 3=duplo, 4=aleatório
+    OBSTACLE_MODE           = arg("obs_mode", 2, int)
+    OBSTACLE_OFFSET_SIDE    = arg("obs_side_off", 4.0, float)
+    OBSTACLE_REVERSE        = arg("obs_reverse", 0, int) == 1
+
+    # agrupamento
+    OBSTACLE_GROUP_SIZE     = arg("obs_group_size", 1, int)
+    OBSTACLE_GROUP_SPACING  = arg("obs_group_spacing", 2.5, float)
+
+    # densidade adaptativa
+    OBSTACLE_CURVE_ONLY     = arg("obs_curve_only", 0, int) == 1
+    OBSTACLE_STEP_MULT_CURV = arg("obs_step_mult_curv", 0.6, float)  # curva = step_base * mult
+    OBSTACLE_BANK_THRESHOLD = arg("obs_bank_thr", 2.5, float)  # threshold pra detectar curva
+
+    # restrições e zonas
+    OBSTACLE_SKIP_TUNNEL    = arg("obs_skip_tunnel", 1, int) == 1
+    OBSTACLE_TUNNEL_MODE    = arg("obs_tunnel_mode", 0, int) == 1  # gera dentro do túnel (pendurado ou lateral)
+    OBSTACLE_TUNNEL_HANG    = arg("obs_tunnel_hang", 0, int) == 1  # se 1, pendura no teto
+
+    # formatos
+    # 1=pilar, 2=parede, 3=arco, 4=viga cruzada, 5=caixa sólida
+    OBSTACLE_TEMPLATE_MODE  = arg("obs_template", 2, int)
+
+    # deslocamento lateral aleatório dos obstáculos
+    OBSTACLE_SIDE_JITTER = arg("obs_side_jit", 14.0, float)  # variação lateral máxima (m)
+    OBSTACLE_JITTER_MODE = arg("obs_jit_mode", 2, int)      # 1=normal (bidirecional), 2=só para fora, 3=só para dentro
+
+
+    # aparência e debug
+    OBSTACLE_MAT_COLOR      = (
+        arg("obs_r", 1.0, float),
+        arg("obs_g", 0.35, float),
+        arg("obs_b", 0.1, float),
+        1.0,
+    )
+
+    # =====================================================
+    #  Q U A D R A S   I N I C I A I S  /  F I N A I S
+    # =====================================================
+
+    BLOCK_AREAS_ENABLE     = arg("block_areas", 1, int) == 1
+    BLOCK_START_ENABLE     = arg("block_start", 1, int) == 1
+    BLOCK_END_ENABLE       = arg("block_end", 1, int) == 1
+
+    # dimensões da quadra
+    BLOCK_LENGTH           = arg("block_len", 80.0, float)    # comprimento (m)
+    BLOCK_WIDTH            = arg("block_wid", 120.0, float)   # largura (m)
+    BLOCK_BUILD_HEIGHT     = arg("block_bh", 40.0, float)     # altura média dos prédios
+    BLOCK_BUILD_SPACING    = arg("block_spacing", 20.0, float)# espaçamento entre prédios
+    BLOCK_BUILD_DENSITY    = arg("block_density", 0.9, float) # chance de cada prédio aparecer
+
+    # barreiras invisíveis
+    BLOCK_BARRIERS         = arg("block_barriers", 1, int) == 1
+    BLOCK_BARRIER_HEIGHT   = arg("block_barrier_h", 10.0, float)
+    BLOCK_BARRIER_THICK    = arg("block_barrier_t", 0.5, float)
+    BLOCK_BARRIER_VISIBLE  = arg("block_barrier_visible", 0, int) == 1
+
+    # piso da quadra
+    BLOCK_FLOOR_HEIGHT     = arg("block_floor_h", 1.0, float)   # espessura do piso da quadra
+    BLOCK_FLOOR_VISIBLE    = arg("block_floor_vis", 1, int) == 1
+    BLOCK_FLOOR_MAT_COLOR  = (
+        arg("block_floor_r", 0.05, float),
+        arg("block_floor_g", 0.05, float),
+        arg("block_floor_b", 0.05, float),
+        1.0,
+    )
+
+    # barreira início/fim com configs independentes
+    BLOCK_START_BARRIER_VISIBLE = arg("block_start_barrier_vis", 1, int) == 1
+    BLOCK_START_BARRIER_HEIGHT  = arg("block_start_barrier_h", 12.0, float)
+    BLOCK_START_BARRIER_THICK   = arg("block_start_barrier_t", 0.6, float)
+
+    BLOCK_END_BARRIER_VISIBLE   = arg("block_end_barrier_vis", 1, int) == 1
+    BLOCK_END_BARRIER_HEIGHT    = arg("block_end_barrier_h", 12.0, float)
+    BLOCK_END_BARRIER_THICK     = arg("block_end_barrier_t", 0.6, float)
+
+    BLOCK_BARRIER_OFFSET_START = arg("block_barrier_off_start", 0.0, float)  # distância da quadra até a pista (m)
+    BLOCK_BARRIER_OFFSET_END   = arg("block_barrier_off_end", 0.0, float)
+
+    # =====================================================
+    #  S P A W N   P O I N T S   I N I C I A I S
+    # =====================================================
+
+    SPAWN_ENABLE          = arg("spawn_enable", 1, int) == 1
+    SPAWN_ROWS            = arg("spawn_rows", 2, int)     # número de filas (em profundidade)
+    SPAWN_PER_ROW         = arg("spawn_per_row", 4, int)  # quantos jogadores/veículos por fila
+    SPAWN_SPACING_X       = arg("spawn_spacing_x", 5.0, float)  # distância lateral (entre veículos)
+    SPAWN_SPACING_Y       = arg("spawn_spacing_y", 7.0, float)  # distância entre filas
+    SPAWN_OFFSET_FORWARD  = arg("spawn_offset_fwd", 10.0, float) # distância do início da pista
+    SPAWN_OFFSET_UP       = arg("spawn_offset_up", 1.0, float)   # altura do empty acima da pista
+    SPAWN_EMPTY_SIZE      = arg("spawn_empty_size", 1.2, float)  # tamanho visual dos empties
+
+    # =====================================================
+    #  C H E C K P O I N T S   &   R E S P A W N S
+    # =====================================================
+
+    CHECKPOINTS_ENABLE       = arg("checkpoints_enable", 1, int) == 1
+    CHECKPOINT_COUNT          = arg("checkpoint_count", 5, int)   # número total de checkpoints
+    CHECKPOINT_SPACING        = arg("checkpoint_spacing", 200.0, float)  # distância entre checkpoints
+    CHECKPOINT_OFFSET_UP      = arg("checkpoint_up", 1.0, float)
+    CHECKPOINT_RESPAWN_ROWS   = arg("respawn_rows", 2, int)
+    CHECKPOINT_RESPAWN_COLS   = arg("respawn_cols", 3, int)
+    CHECKPOINT_RESPAWN_SPACING_X = arg("respawn_spacing_x", 5.0, float)
+    CHECKPOINT_RESPAWN_SPACING_Y = arg("respawn_spacing_y", 8.0, float)
+    CHECKPOINT_RESPAWN_OFFSET_FWD = arg("respawn_off_fwd", 8.0, float)
+    CHECKPOINT_EMPTY_SIZE     = arg("checkpoint_empty_size", 1.2, float)
+
+    # track_data.bin ao lado do JSON (opt-in): registros fixos + tabela de s + grade de checkpoints
+    TRACK_DATA_BINARY  = arg("track_bin", 0, int) == 1
+    TRACK_ARC_STEP     = arg("track_arc_step", 10.0, float)  # espaçamento da tabela de s (m)
+
+    unknown = sorted(set(values) - used)
+    if unknown:
+        errors.append(f"parâmetros desconhecidos: {', '.join(unknown)}")
+    if errors:
+        raise ConfigError("configuração inválida:\n  " + "\n  ".join(errors))
+
+    cfg = TrackConfig(**{k: v for k, v in locals().items() if k.isupper()})
+    validate_config(cfg)
+    return cfg
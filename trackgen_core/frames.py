@@ -0,0 +1,160 @@
+"""
+Integração dos frames da pista (posição, base right/up/forward, banking e largura) em lote.
+"""
+import math
+
+import numpy as np
+
+
+class TrackFrames:
+    """
+    Frames da pista em struct-of-arrays (um índice por passo de STEP_LEN):
+      pos/fwd/right/up            -> arrays (N, 3)
+      s/bank_deg/road_w/shoulder_w -> arrays (N,)
+    Os builders leem os arrays direto; frames[i] devolve um dict com cópias
+    (arrays (3,)) para quem só precisa de um frame isolado (spawn, quadras).
+    frames[a:b] devolve outro TrackFrames (views, sem cópia); frames[idx] com
+    um array de índices devolve um TrackFrames reamostrado (cópia, usado nos LODs).
+    """
+    __slots__ = ("s", "pos", "fwd", "right", "up", "bank_deg", "road_w", "shoulder_w")
+
+    def __init__(self, s, pos, fwd, right, up, bank_deg, road_w, shoulder_w):
+        self.s = s
+        self.pos = pos
+        self.fwd = fwd
+        self.right = right
+        self.up = up
+        self.bank_deg = bank_deg
+        self.road_w = road_w
+        self.shoulder_w = shoulder_w
+
+    def __len__(self):
+        return len(self.s)
+
+    def __getitem__(self, i):
+        if isinstance(i, (slice, np.ndarray, list)):
+            return TrackFrames(*(getattr(self, k)[i] for k in self.__slots__))
+        return {
+            "s": float(self.s[i]),
+            "pos": self.pos[i].copy(),
+            "fwd": self.fwd[i].copy(),
+            "right": self.right[i].copy(),
+            "up": self.up[i].copy(),
+            "bank_deg": float(self.bank_deg[i]),
+            "road_w": float(self.road_w[i]),
+            "shoulder_w": float(self.shoulder_w[i]),
+        }
+
+
+def exp_smooth(target, alpha, x0=0.0):
+    """
+    Filtro exponencial y[k] = (1-alpha)*y[k-1] + alpha*x[k] em lote.
+    Resolve a recorrência com cumsum por blocos; o bloco é limitado para que
+    (1-alpha)^-k não estoure o float64.
+    """
+    x = np.asarray(target, dtype=np.float64)
+    out = np.empty_like(x)
+    if len(x) == 0:
+        return out
+    if alpha <= 0.0:
+        out[:] = x0
+        return out
+    decay = 1.0 - alpha
+    if decay < 1e-12:
+        out[:] = x
+        return out
+
+    block = max(1, int(200.0 / -math.log(decay)))
+    k = np.arange(min(block, len(x)), dtype=np.float64)
+    grow = decay ** -k          # decay^-m (peso de cada entrada)
+    shrink = decay ** k         # decay^j
+    y_prev = x0
+    for a in range(0, len(x), block):
+        b = min(a + block, len(x))
+        n = b - a
+        acc = np.cumsum(x[a:b] * grow[:n])
+        out[a:b] = shrink[:n] * (decay * y_prev + alpha * acc)
+        y_prev = out[b - 1]
+    return out
+
+
+def frames_from_program(program, cfg):
+    """
+    Integra posição e orientação (yaw/pitch), calcula forward/right/up.
+    Banking alvo ~ atan(v^2/(r*g)) com clamp e filtro exponencial.
+    Largura varia com curvatura (agora usando radianos corretamente).
+    Adiciona suavização vertical (Z_SMOOTH) e clamp de dpitch por passo.
+    Tudo é calculado em lote (NumPy) e devolvido como TrackFrames.
+    """
+    g = 9.81
+
+    # parâmetros de segurança/suavização (ajuste conforme preferir)
+    Z_SMOOTH = 0.6                     # 0..1 suaviza pos.z (maior = mais suave)
+    MAX_DPITCH_DEG_PER_STEP = 1.8     # limita variação de pitch por passo (graus)
+    # (sugestões de alteração de defaults)
+    # PITCH_SMOOTH = 0.08  # considere reduzir no call de get_arg se quiser ainda mais suave
+
+    prog = np.asarray(program, dtype=np.float64).reshape(-1, 3)
+    dyaw, dpitch, ds = prog[:, 0], prog[:, 1], prog[:, 2]
+
+    # clamp dpitch por step (evita picos)
+    dpitch = np.clip(dpitch, -MAX_DPITCH_DEG_PER_STEP, MAX_DPITCH_DEG_PER_STEP)
+
+    # LERP do pitch até (pitch + dpitch) == pitch += cfg.PITCH_SMOOTH * dpitch
+    pitch = np.cumsum(cfg.PITCH_SMOOTH * dpitch)
+    # yaw do passo é o acumulado ANTES do incremento (atualizado no fim do passo)
+    yaw = np.cumsum(dyaw) - dyaw
+
+    # direção sem roll
+    yr, pr = np.radians(yaw), np.radians(pitch)
+    cp = np.cos(pr)
+    forward = np.stack((np.cos(yr) * cp, np.sin(yr) * cp, np.sin(pr)), axis=1)
+    forward /= np.linalg.norm(forward, axis=1)[:, None]
+    right = np.cross(forward, (0.0, 0.0, 1.0))
+    right /= np.linalg.norm(right, axis=1)[:, None]
+    upv = np.cross(right, forward)
+    upv /= np.linalg.norm(upv, axis=1)[:, None]
+
+    # curvatura corrigida (usar radianos por metro)
+    curvature = np.abs(np.radians(dyaw)) / np.maximum(ds, 1e-6)   # rad/m
+    r = 1.0 / np.maximum(curvature, 1e-6)
+
+    # banking alvo (mais realista por usar radianos)
+    bank_target = np.degrees(np.arctan(np.minimum(1.0, (cfg.TARGET_SPEED ** 2) / (np.maximum(r, 1.0) * g))))
+    bank_target = np.clip(bank_target, -cfg.BANK_MAX_DEG, cfg.BANK_MAX_DEG) * np.where(dyaw >= 0, 1.0, -1.0)
+
+    # suaviza banking
+    bank = exp_smooth(bank_target, cfg.BANK_SMOOTH)
+
+    # aplica roll ao par (right, up) — Rodrigues em torno de forward
+    # (right/up são ortogonais a forward, então o termo k(k·v) some)
+    br = np.radians(bank)[:, None]
+    cb, sb = np.cos(br), np.sin(br)
+    right, upv = (
+        right * cb + np.cross(forward, right) * sb,
+        upv * cb + np.cross(forward, upv) * sb,
+    )
+    right /= np.linalg.norm(right, axis=1)[:, None]
+    upv /= np.linalg.norm(upv, axis=1)[:, None]
+
+    # ajusta largura por curvatura (menos sensível porque curvature está em rad/m)
+    width_factor = 1.0 - cfg.WIDTH_CURV_FACT * np.minimum(1.0, curvature * cfg.STEP_LEN * 4.0)
+    road_w = cfg.BASE_ROAD_WIDTH * np.maximum(0.7, width_factor)
+    shoulder_w = cfg.SHOULDER_WIDTH_BASE * (0.8 + 0.4 * width_factor)
+
+    # integrar posição; suavizar somente Z para reduzir lombadas:
+    # z += Z_SMOOTH * (raw_z - z) == z += Z_SMOOTH * fwd.z * ds
+    step = forward * ds[:, None]
+    pos = np.cumsum(step, axis=0)
+    pos[:, 2] = np.cumsum(Z_SMOOTH * step[:, 2])
+
+    return TrackFrames(
+        s=np.cumsum(ds),
+        pos=pos,
+        fwd=forward,
+        right=right,
+        up=upv,
+        bank_deg=bank,
+        road_w=road_w,
+        shoulder_w=shoulder_w,
+    )
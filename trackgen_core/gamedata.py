@@ -0,0 +1,240 @@
+"""
+Dados de jogo (âncoras dos splits, spawns, checkpoints e respawns) juntados
+em memória conforme são gerados e gravados numa única passada.
+
+Além do track_data.json (legível, para depuração) o registro grava o
+track_data.bin, little-endian, para o script do jogo carregar sem parse:
+  header      BIN_HEADER (magic "TGTD", versão, contagens, grade, passo de s)
+  meshes      MESH_DTYPE x n_meshes
+  spawns      SPAWN_DTYPE x n_spawns
+  checkpoints CHECKPOINT_DTYPE x n_checkpoints (s, 1º respawn, 1ª amostra de s)
+  respawns    RESPAWN_DTYPE x n_respawns (agrupados por checkpoint)
+  arc         ARC_DTYPE x n_arc: posição e s a cada TRACK_ARC_STEP metros
+  grid_start  uint32 x (nx*ny + 1), grid_items uint32 x n_items: checkpoints
+              de cada célula e das 8 vizinhas (CSR), então todo checkpoint a
+              até grid_cell metros de um ponto está na célula desse ponto
+  names       bytes UTF-8 (name_off/name_len dos registros apontam aqui)
+Progresso em s: checkpoint mais próximo pela grade, depois as amostras de
+arc entre ele e o seguinte (arc_first .. arc_first do próximo).
+"""
+import json
+import math
+import os
+import struct
+
+import numpy as np
+
+BIN_MAGIC = b"TGTD"
+BIN_VERSION = 1
+# magic, versão, flags, n_meshes, n_spawns, n_checkpoints, n_respawns, n_arc, n_grid_items,
+# grid_x0, grid_y0, grid_cell, grid_nx, grid_ny, arc_step, comprimento total
+BIN_HEADER = struct.Struct("<4sHH6I3f2I2f")
+
+_VEC = [("pos", "<f4", 3), ("rot", "<f4", 3)]
+_NAME = [("name_off", "<u4"), ("name_len", "<u2")]
+MESH_DTYPE = np.dtype(_VEC + _NAME + [("pad", "<u2")])
+SPAWN_DTYPE = np.dtype(_VEC + _NAME + [("row", "u1"), ("col", "u1"), ("index", "<u2"), ("pad", "<u2")])
+CHECKPOINT_DTYPE = np.dtype(_VEC + _NAME + [("id", "<u2"), ("s", "<f4"), ("respawn_first", "<u4"),
+                                            ("respawn_count", "<u2"), ("pad", "<u2"), ("arc_first", "<u4")])
+RESPAWN_DTYPE = np.dtype(_VEC + _NAME + [("row", "u1"), ("col", "u1"), ("index", "<u2"),
+                                         ("checkpoint", "<u2"), ("pad", "<u2")])
+ARC_DTYPE = np.dtype([("pos", "<f4", 3), ("s", "<f4")])
+
+
+def _pos(p):
+    return [round(float(c), 3) for c in p]
+
+
+def _rot_deg(rot):
+    return [round(math.degrees(float(a)), 3) for a in rot]
+
+
+class GameDataRegistry:
+    """
+    Registro do que vai para o track_data: cada builder chama add_* com os
+    registros do núcleo (spawn_records/checkpoint_records) e o recentramento
+    chama add_mesh com a âncora de cada split. Nada é lido da cena depois.
+    """
+
+    def __init__(self):
+        self.meshes = []
+        self.spawn_points = []
+        self.checkpoints = []
+        self.checkpoint_s = []
+        self.arc = np.zeros(0, dtype=ARC_DTYPE)
+
+    def add_mesh(self, name, pos, rot=(0.0, 0.0, 0.0)):
+        self.meshes.append({"name": name, "pos": _pos(pos), "rot": _rot_deg(rot)})
+
+    def add_spawns(self, records):
+        for rec in records:
+            self.spawn_points.append({
+                "name": rec["name"], "pos": _pos(rec["pos"]), "rot": _rot_deg(rec["rot"]),
+                "row": int(rec["row"]), "col": int(rec["col"]), "index": int(rec["index"]),
+            })
+
+    def add_checkpoints(self, records):
+        for rec in records:
+            self.checkpoints.append({
+                "id": int(rec["id"]), "name": rec["name"], "pos": _pos(rec["pos"]), "rot": _rot_deg(rec["rot"]),
+                "respawns": [{
+                    "name": r["name"], "pos": _pos(r["pos"]), "rot": _rot_deg(r["rot"]),
+                    "row": int(r["row"]), "col": int(r["col"]), "index": int(r["index"]),
+                } for r in rec["respawns"]],
+            })
+            self.checkpoint_s.append(float(rec.get("s", 0.0)))
+
+    def set_track(self, frames, step):
+        """Tabela de s: posição do centro da pista a cada `step` metros (sempre com o fim)."""
+        n = len(frames)
+        if n == 0:
+            self.arc = np.zeros(0, dtype=ARC_DTYPE)
+            return
+        marks = np.arange(0.0, float(frames.s[-1]), max(step, 1e-3))
+        idx = np.unique(np.append(np.searchsorted(frames.s, marks), n - 1).clip(0, n - 1))
+        self.arc = np.zeros(len(idx), dtype=ARC_DTYPE)
+        self.arc["pos"] = frames.pos[idx]
+        self.arc["s"] = frames.s[idx]
+
+    def counts(self):
+        return {
+            "meshes": len(self.meshes),
+            "spawn_points": len(self.spawn_points),
+            "checkpoints": len(self.checkpoints),
+            "respawns": sum(len(c["respawns"]) for c in self.checkpoints),
+        }
+
+    def write_json(self, f):
+        """
+        Escreve o JSON (meshes, spawn_points, checkpoints, respawns) em `f`
+        registro a registro, um por linha, sem montar o documento inteiro.
+        """
+        def section(key, items, last=False):
+            f.write(f'  "{key}": [')
+            for i, item in enumerate(items):
+                f.write(("\n    " if i == 0 else ",\n    ") + json.dumps(item, separators=(", ", ": ")))
+            f.write(("\n  ]" if items else "]") + ("\n" if last else ",\n"))
+
+        f.write("{\n")
+        section("meshes", self.meshes)
+        section("spawn_points", self.spawn_points)
+        section("checkpoints", self.checkpoints)
+        section("respawns", [r for c in self.checkpoints for r in c["respawns"]], last=True)
+        f.write("}\n")
+
+    def _grid(self, cell):
+        """CSR (x0, y0, nx, ny, start, items) dos checkpoints por célula, cada um nas 3x3 em volta."""
+        xy = np.array([c["pos"][:2] for c in self.checkpoints], dtype=np.float64).reshape(-1, 2)
+        if not len(xy):
+            return 0.0, 0.0, 0, 0, np.zeros(1, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+        origin = xy.min(axis=0) - cell
+        q = np.floor((xy - origin) / cell).astype(np.int64)
+        nx, ny = int(q[:, 0].max()) + 2, int(q[:, 1].max()) + 2
+        d = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+        cells = (q[:, None, :] + d[None, :, :]).reshape(-1, 2)
+        ids = np.repeat(np.arange(len(xy)), len(d))
+        flat = cells[:, 1] * nx + cells[:, 0]
+        order = np.lexsort((ids, flat))
+        start = np.concatenate([[0], np.cumsum(np.bincount(flat, minlength=nx * ny))])
+        return (float(origin[0]), float(origin[1]), nx, ny,
+                start.astype(np.uint32), ids[order].astype(np.uint32))
+
+    def write_binary(self, f, cell, arc_step=0.0):
+        """Escreve o track_data.bin em `f` (binário); `cell` = lado da grade de checkpoints (m)."""
+        names = bytearray()
+
+        def records(items, dtype):
+            out = np.zeros(len(items), dtype=dtype)
+            for i, item in enumerate(items):
+                raw = item["name"].encode("utf-8")
+                out[i]["name_off"], out[i]["name_len"] = len(names), len(raw)
+                names.extend(raw)
+            if len(items):
+                out["pos"] = [it["pos"] for it in items]
+                out["rot"] = [it["rot"] for it in items]
+            return out
+
+        meshes = records(self.meshes, MESH_DTYPE)
+        spawns = records(self.spawn_points, SPAWN_DTYPE)
+        for key in ("row", "col", "index"):
+            spawns[key] = [sp[key] for sp in self.spawn_points]
+
+        checkpoints = records(self.checkpoints, CHECKPOINT_DTYPE)
+        respawn_items = [r for c in self.checkpoints for r in c["respawns"]]
+        respawns = records(respawn_items, RESPAWN_DTYPE)
+        counts = np.array([len(c["respawns"]) for c in self.checkpoints], dtype=np.int64)
+        if len(self.checkpoints):
+            checkpoints["id"] = [c["id"] for c in self.checkpoints]
+            checkpoints["s"] = self.checkpoint_s
+            checkpoints["respawn_first"] = np.cumsum(counts) - counts
+            checkpoints["respawn_count"] = counts
+            checkpoints["arc_first"] = np.searchsorted(self.arc["s"], checkpoints["s"], side="right").clip(1) - 1
+        for key in ("row", "col", "index"):
+            respawns[key] = [r[key] for r in respawn_items]
+        respawns["checkpoint"] = np.repeat(np.arange(len(counts)), counts)
+
+        x0, y0, nx, ny, start, items = self._grid(cell)
+        total = float(self.arc["s"][-1]) if len(self.arc) else 0.0
+        f.write(BIN_HEADER.pack(BIN_MAGIC, BIN_VERSION, 0, len(meshes), len(spawns), len(checkpoints),
+                                len(respawns), len(self.arc), len(items), x0, y0, cell, nx, ny,
+                                arc_step, total))
+        for arr in (meshes, spawns, checkpoints, respawns, self.arc, start, items):
+            f.write(arr.tobytes())
+        f.write(bytes(names))
+
+    def save_binary(self, path, cell, arc_step=0.0):
+        """Grava o track_data.bin em `path` e devolve o tamanho em bytes."""
+        path = os.path.abspath(path)
+        with open(path, "wb") as f:
+            self.write_binary(f, cell, arc_step)
+        return os.path.getsize(path)
+
+    def save_json(self, path):
+        """Grava em `path` e devolve counts()."""
+        path = os.path.abspath(path)
+        with open(path, "w", encoding="utf-8") as f:
+            self.write_json(f)
+        return self.counts()
+
+
+def read_track_binary(data):
+    """
+    Lê um track_data.bin (bytes) de volta: dict com o header e os arrays
+    estruturados, com nomes decodificados. Serve de referência do formato.
+    """
+    h = BIN_HEADER.unpack_from(data, 0)
+    if h[0] != BIN_MAGIC:
+        raise ValueError("não é um track_data.bin")
+    out = {"version": h[1], "grid": {"x0": h[9], "y0": h[10], "cell": h[11], "nx": h[12], "ny": h[13]},
+           "arc_step": h[14], "length": h[15]}
+    n_meshes, n_spawns, n_checkpoints, n_respawns, n_arc, n_items = h[3:9]
+    nx, ny = h[12], h[13]
+    off = BIN_HEADER.size
+    for key, dtype, count in (("meshes", MESH_DTYPE, n_meshes), ("spawns", SPAWN_DTYPE, n_spawns),
+                              ("checkpoints", CHECKPOINT_DTYPE, n_checkpoints),
+                              ("respawns", RESPAWN_DTYPE, n_respawns), ("arc", ARC_DTYPE, n_arc),
+                              ("grid_start", np.dtype("<u4"), nx * ny + 1),
+                              ("grid_items", np.dtype("<u4"), n_items)):
+        out[key] = np.frombuffer(data, dtype=dtype, count=count, offset=off)
+        off += dtype.itemsize * count
+    names = bytes(data[off:])
+    for key in ("meshes", "spawns", "checkpoints", "respawns"):
+        out[key + "_names"] = [names[o:o + n].decode("utf-8")
+                               for o, n in zip(out[key]["name_off"].tolist(), out[key]["name_len"].tolist())]
+    return out
+
+
+def nearest_checkpoint(track, x, y):
+    """Checkpoint mais próximo de (x, y) olhando só a célula da grade (como o script do jogo faria)."""
+    g = track["grid"]
+    if not g["nx"]:
+        return -1
+    cx, cy = int((x - g["x0"]) // g["cell"]), int((y - g["y0"]) // g["cell"])
+    if not (0 <= cx < g["nx"] and 0 <= cy < g["ny"]):
+        return -1
+    cell = cy * g["nx"] + cx
+    ids = track["grid_items"][track["grid_start"][cell]:track["grid_start"][cell + 1]]
+    if not len(ids):
+        return -1
+    d = track["checkpoints"]["pos"][ids, :2] - (x, y)
+    return int(ids[np.einsum("ij,ij->i", d, d).argmin()])
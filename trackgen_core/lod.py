@@ -0,0 +1,61 @@
+"""
+Níveis de detalhe dos splits: modelos médio/baixo/muito baixo e distâncias de LOD pelo raio.
+
+No modo em pedaços cada nível é regerado do trecho com frames mais espaçados
+e sem caixas pequenas (chunks.iter_chunks); no modo join + split, onde a
+parte não tem mais trecho de s, o nível sai de cluster_vertices com célula
+do mesmo tamanho (STEP_LEN x stride).
+"""
+import numpy as np
+
+from .buffers import MeshBuffers
+from .weld import cluster_vertices
+
+# níveis do Sollumz que recebem os modelos simplificados, em ordem
+LOD_LEVEL_NAMES = ("medium", "low", "verylow")
+
+
+def lod_levels(cfg):
+    """[(stride, min_box)] por nível (vazio com lods=0)."""
+    if not cfg.LODS:
+        return []
+    return list(zip(cfg.LOD_STRIDES, cfg.LOD_MIN_BOX))
+
+
+def bounding_radius(buf):
+    """(centro, raio) da esfera em torno da média dos vértices."""
+    if not len(buf.verts):
+        return np.zeros(3), 0.0
+    center = buf.verts.mean(axis=0)
+    return center, float(np.linalg.norm(buf.verts - center, axis=1).max())
+
+
+def lod_distances(cfg, radius):
+    """Distâncias (alto, médio, baixo, muito baixo) = raio x LOD_DIST_MULT, com mínimo LOD_DIST_MIN."""
+    return tuple(round(max(cfg.LOD_DIST_MIN, radius * m), 1) for m in cfg.LOD_DIST_MULT)
+
+
+def compact(buf):
+    """Remove vértices que nenhuma face usa."""
+    used, loops = np.unique(buf.loops, return_inverse=True)
+    if len(used) == len(buf.verts):
+        return buf
+    return MeshBuffers(buf.verts[used], loops.ravel(), buf.sizes, buf.mats, buf.materials,
+                       buf.smooth, buf.normals)
+
+
+def align_materials(buf, materials):
+    """Reindexa os materiais de `buf` na lista `materials` (a do modelo completo)."""
+    materials = list(materials)
+    remap = []
+    for m in buf.materials:
+        if m not in materials:
+            materials.append(m)
+        remap.append(materials.index(m))
+    mats = np.asarray(remap, dtype=np.int64)[buf.mats] if remap else buf.mats
+    return MeshBuffers(buf.verts, buf.loops, buf.sizes, mats, materials, buf.smooth, buf.normals)
+
+
+def cluster_lods(cfg, buf):
+    """LODs de uma parte já pronta (modo join + split) por agrupamento de vértices."""
+    return [compact(cluster_vertices(buf, cfg.STEP_LEN * stride)[0]) for stride, _ in lod_levels(cfg)]
@@ -0,0 +1,160 @@
+"""
+Índice de sobreposição para o posicionamento: hash espacial 2-D de pegadas
+orientadas (retângulos em XY com faixa de altura) e do corredor da pista.
+
+Cada pegada entra nas células da grade que o seu AABB cobre; uma consulta
+só testa (SAT 2-D + faixa de z) as pegadas das mesmas células, então o custo
+médio por consulta é O(1) com a célula do tamanho das caixas.
+"""
+import math
+
+import numpy as np
+
+
+def box_footprint(center, right, forward, up, size):
+    """
+    Pegada conservadora de uma caixa orientada: (cx, cy, ux, uy, hu, hv, z0, z1)
+    com u = eixo (unitário, XY) da maior projeção horizontal, v = u girado 90°,
+    hu/hv = meias-larguras ao longo de u/v e z0..z1 = faixa de altura.
+    """
+    half = []
+    for a, s in zip((right, forward, up), size):  # escalares: chamado por caixa, NumPy aqui só pesa
+        ax, ay, az = float(a[0]), float(a[1]), float(a[2])
+        k = 0.5 * s / max(math.sqrt(ax * ax + ay * ay + az * az), 1e-12)
+        half.append((ax * k, ay * k, az * k))
+    flat = max(half, key=lambda h: h[0] * h[0] + h[1] * h[1])
+    n = math.hypot(flat[0], flat[1])
+    ux, uy = (flat[0] / n, flat[1] / n) if n > 1e-9 else (1.0, 0.0)
+    hu = sum(abs(h[0] * ux + h[1] * uy) for h in half)
+    hv = sum(abs(-h[0] * uy + h[1] * ux) for h in half)
+    hz = sum(abs(h[2]) for h in half)
+    return (float(center[0]), float(center[1]), ux, uy, hu, hv, float(center[2]) - hz, float(center[2]) + hz)
+
+
+def scale_footprint(fp, k):
+    """Mesma pegada com as meias-larguras em XY multiplicadas por k."""
+    cx, cy, ux, uy, hu, hv, z0, z1 = fp
+    return (cx, cy, ux, uy, hu * k, hv * k, z0, z1)
+
+
+def footprints_overlap(a, b, margin=0.0):
+    """SAT entre duas pegadas (eixos u/v de cada uma) + faixas de z; encostar não conta."""
+    if a[6] >= b[7] or b[6] >= a[7]:
+        return False
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    for ux, uy in ((a[2], a[3]), (-a[3], a[2]), (b[2], b[3]), (-b[3], b[2])):
+        ra = a[4] * abs(a[2] * ux + a[3] * uy) + a[5] * abs(-a[3] * ux + a[2] * uy)
+        rb = b[4] * abs(b[2] * ux + b[3] * uy) + b[5] * abs(-b[3] * ux + b[2] * uy)
+        if abs(dx * ux + dy * uy) >= ra + rb + margin - 1e-6:
+            return False
+    return True
+
+
+class FootprintIndex:
+    """
+    Hash espacial de pegadas (box_footprint). add_corridor registra o
+    corredor da pista de uma vez (vetorizado); insert/overlaps tratam as
+    caixas uma a uma durante o posicionamento.
+    """
+
+    def __init__(self, cell=16.0, margin=0.0):
+        self.cell = max(float(cell), 1e-3)
+        self.margin = float(margin)
+        self.items = []
+        self.grid = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def _cells(self, fp):
+        cx, cy, ux, uy, hu, hv = fp[:6]
+        ex = abs(ux) * hu + abs(uy) * hv + self.margin
+        ey = abs(uy) * hu + abs(ux) * hv + self.margin
+        c = self.cell
+        for gx in range(math.floor((cx - ex) / c), math.floor((cx + ex) / c) + 1):
+            for gy in range(math.floor((cy - ey) / c), math.floor((cy + ey) / c) + 1):
+                yield gx, gy
+
+    def insert(self, fp):
+        idx = len(self.items)
+        self.items.append(fp)
+        for key in self._cells(fp):
+            self.grid.setdefault(key, []).append(idx)
+        return idx
+
+    def overlaps(self, fp):
+        """True se `fp` sobrepõe alguma pegada já registrada."""
+        seen = set()
+        for key in self._cells(fp):
+            for idx in self.grid.get(key, ()):
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                if footprints_overlap(fp, self.items[idx], self.margin):
+                    return True
+        return False
+
+    def add_corridor(self, frames, half_width, below, above, stride=None):
+        """
+        Registra o corredor da pista: um retângulo a cada `stride` frames
+        (padrão: ~1 célula), com meia-largura half_width (N,) mais a flecha da
+        curva no trecho e z de pos.z - below até pos.z + above.
+        """
+        n = len(frames)
+        if n < 2:
+            return
+        step = max(float(frames.s[-1] - frames.s[0]) / (n - 1), 1e-6)
+        stride = stride or max(1, int(self.cell / step))
+        idx = np.unique(np.append(np.arange(0, n, stride), n - 1))
+        a, b = idx[:-1], idx[1:]
+        pa, pb = frames.pos[a], frames.pos[b]
+        d = pb[:, :2] - pa[:, :2]
+        length = np.maximum(np.linalg.norm(d, axis=1), 1e-9)
+        u = d / length[:, None]
+        center = 0.5 * (pa + pb)
+
+        # flecha: maior afastamento lateral dos frames intermediários e maior meia-largura do trecho
+        owner = np.repeat(np.arange(len(a)), b - a + 1)
+        inner = np.concatenate([np.arange(i, j + 1) for i, j in zip(a, b)])
+        rel = frames.pos[inner, :2] - pa[owner, :2]
+        lateral = np.abs(rel[:, 0] * -u[owner, 1] + rel[:, 1] * u[owner, 0])
+        zs = frames.pos[inner, 2]
+        width = np.broadcast_to(np.asarray(half_width, dtype=np.float64), (n,))[inner]
+        hv = np.zeros(len(a))
+        np.maximum.at(hv, owner, lateral + width)
+        z0 = np.full(len(a), np.inf)
+        z1 = np.full(len(a), -np.inf)
+        np.minimum.at(z0, owner, zs - below)
+        np.maximum.at(z1, owner, zs + above)
+
+        for k in range(len(a)):
+            self.insert((float(center[k, 0]), float(center[k, 1]), float(u[k, 0]), float(u[k, 1]),
+                         float(0.5 * length[k]), float(hv[k]), float(z0[k]), float(z1[k])))
+
+
+def fit_box(index, center, right, forward, up, size, scales=(1.0,)):
+    """
+    Tenta a caixa em cada escala de `scales` (só largura/profundidade) e
+    registra a primeira que não sobrepõe nada no índice. Devolve a escala
+    usada ou None (rejeitada).
+    """
+    w, d, h = size
+    for k in scales:
+        fp = box_footprint(center, right, forward, up, (w * k, d * k, h))
+        if not index.overlaps(fp):
+            index.insert(fp)
+            return k
+    return None
+
+
+def shrink_scales(cfg):
+    """Escalas tentadas antes de rejeitar um prédio: 1, 0.85, 0.7... até OVERLAP_SHRINK_MIN."""
+    scales = [1.0]
+    while scales[-1] - 0.15 >= cfg.OVERLAP_SHRINK_MIN - 1e-9:
+        scales.append(round(scales[-1] - 0.15, 2))
+    return tuple(scales)
+
+
+def corridor_half_width(cfg, frames):
+    """Meia-largura (N,) do corredor que prédios não podem invadir: estrada + acostamento + barreira."""
+    return frames.road_w * 0.5 + frames.shoulder_w + cfg.BARRIER_OFFSET + cfg.BARRIER_THICKNESS
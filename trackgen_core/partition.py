@@ -0,0 +1,115 @@
+"""
+Divisão de malhas em partes compactas (limite de vértices e raio de LOD).
+"""
+import numpy as np
+
+from .buffers import MeshBuffers
+
+
+def partition_faces(centers, loops, sizes, vertex_limit=32767, lod_limit=200.0):
+    """
+    Agrupa faces em partes compactas respeitando vertex_limit e lod_limit.
+      centers (F, 3) centro de cada face
+      loops   (L,)   índices de vértice das faces em sequência
+      sizes   (F,)   nº de cantos por face
+    Devolve (F,) com o índice da parte de cada face.
+
+    Usa uma grade uniforme (célula = lod_limit) sobre os centros em XY: a
+    semente é a próxima face livre na ordem (x, y, z); os candidatos vêm
+    só das 3x3 células vizinhas, são ordenados pela distância à semente e
+    entram enquanto a contagem incremental de vértices novos couber no
+    limite — partes pequenas em raio, sem uniões de set por face.
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    loops = np.asarray(loops, dtype=np.int64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    n_faces = len(sizes)
+    part = np.full(n_faces, -1, dtype=np.int64)
+    if n_faces == 0:
+        return part
+
+    starts = np.cumsum(sizes) - sizes
+    cell = max(lod_limit, 1e-3)
+    keys = np.floor(centers[:, :2] / cell).astype(np.int64)
+
+    # baldes da grade: célula -> faces
+    cell_ids, inv = np.unique(keys, axis=0, return_inverse=True)
+    inv = inv.ravel()
+    by_cell = np.argsort(inv, kind="stable")
+    counts = np.bincount(inv, minlength=len(cell_ids))
+    ends = np.cumsum(counts)
+    buckets = {}
+    for c, (cx, cy) in enumerate(cell_ids.tolist()):
+        buckets[(cx, cy)] = by_cell[ends[c] - counts[c]:ends[c]]
+
+    seeds = np.lexsort((centers[:, 2], centers[:, 1], centers[:, 0]))
+    label = 0
+    for seed in seeds.tolist():
+        if part[seed] >= 0:
+            continue
+        cx, cy = keys[seed].tolist()
+
+        # candidatos livres nas células vizinhas (baldes são podados ao passar)
+        cand = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                key = (cx + dx, cy + dy)
+                faces = buckets.get(key)
+                if faces is None:
+                    continue
+                faces = faces[part[faces] < 0]
+                buckets[key] = faces
+                cand.append(faces)
+        cand = np.concatenate(cand)
+
+        dist = np.linalg.norm(centers[cand] - centers[seed], axis=1)
+        keep = dist <= lod_limit
+        cand = cand[keep]
+        cand = cand[np.argsort(dist[keep], kind="stable")]
+
+        # vértices novos que cada face traz, na ordem de distância
+        cand_sizes = sizes[cand]
+        offsets = np.cumsum(cand_sizes) - cand_sizes
+        loop_idx = np.repeat(starts[cand] - offsets, cand_sizes) + np.arange(cand_sizes.sum())
+        face_verts = loops[loop_idx]
+        owner = np.repeat(np.arange(len(cand)), cand_sizes)
+        _, first = np.unique(face_verts, return_index=True)
+        new_verts = np.bincount(owner[first], minlength=len(cand))
+
+        take = max(1, int(np.searchsorted(np.cumsum(new_verts), vertex_limit, side="right")))
+        part[cand[:take]] = label
+        label += 1
+
+    return part
+
+
+def face_centers(buf):
+    """Centro (média dos cantos) de cada face de um MeshBuffers -> (F, 3)."""
+    if not len(buf):
+        return np.zeros((0, 3))
+    starts = np.cumsum(buf.sizes) - buf.sizes
+    return np.add.reduceat(buf.verts[buf.loops], starts, axis=0) / buf.sizes[:, None]
+
+
+def split_buffers(buf, part_of):
+    """
+    Separa `buf` conforme part_of (F,) e gera (parte, faces, MeshBuffers)
+    com vértices reindexados; preserva materiais, índices de material e normais por canto.
+    """
+    if not len(buf):
+        return
+    sizes = buf.sizes
+    starts = np.cumsum(sizes) - sizes
+    n_parts = int(part_of.max()) + 1
+    order = np.argsort(part_of, kind="stable")
+    bounds = np.cumsum(np.bincount(part_of, minlength=n_parts))
+
+    for part in range(n_parts):
+        faces = order[(bounds[part - 1] if part else 0):bounds[part]]
+        face_sizes = sizes[faces]
+        offsets = np.cumsum(face_sizes) - face_sizes
+        loop_idx = np.repeat(starts[faces] - offsets, face_sizes) + np.arange(face_sizes.sum())
+        used, new_loops = np.unique(buf.loops[loop_idx], return_inverse=True)
+        normals = None if buf.normals is None else buf.normals[loop_idx]
+        yield part, faces, MeshBuffers(buf.verts[used], new_loops.ravel(), face_sizes,
+                                       buf.mats[faces], buf.materials, buf.smooth[faces], normals)
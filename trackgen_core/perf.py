@@ -0,0 +1,125 @@
+"""
+Instrumentação por estágio: tempo de parede, tempo de CPU, pico de memória
+(RSS do processo e, opcional, tracemalloc) e contadores livres, gravados em
+perf_report.json para comparar execuções entre versões.
+"""
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+def peak_rss_mb():
+    """Pico de RSS do processo em MB (None se a plataforma não informar)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # macOS: bytes, Linux: KB
+    except ImportError:
+        pass
+    try:  # Windows
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 2**20
+    except Exception:
+        pass
+    return None
+
+
+class PerfRecorder:
+    """
+    Grava um registro por estágio:
+        with PERF.stage("split") as st:
+            parts = ...
+            st["objects"] = len(parts)
+    Estágios podem se aninhar (o registro guarda o caminho, ex.: "export/sollumz")
+    e repetir (o relatório soma por nome em `totals`). Com enabled=False não
+    mede nada; com trace_memory=True liga o tracemalloc (mais lento).
+    """
+
+    def __init__(self, enabled=True, trace_memory=False):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.records = []
+        self._path = []
+        self._mem = []  # [memória no início, maior pico absoluto dos filhos] por nível
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, **counts):
+        if not self.enabled:
+            yield dict(counts)
+            return
+        self._path.append(name)
+        rec = {"stage": "/".join(self._path), "counts": dict(counts)}
+        if self.trace_memory:
+            if self._mem:  # o pico até aqui fica guardado no nível de cima
+                self._mem[-1][1] = max(self._mem[-1][1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._mem.append([tracemalloc.get_traced_memory()[0], 0])
+        t0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield rec["counts"]
+        finally:
+            rec["wall_s"] = round(time.perf_counter() - t0, 4)
+            rec["cpu_s"] = round(time.process_time() - cpu0, 4)
+            rss = peak_rss_mb()
+            rec["peak_rss_mb"] = None if rss is None else round(rss, 1)
+            if self.trace_memory:
+                mem0, child_peak = self._mem.pop()
+                peak = max(tracemalloc.get_traced_memory()[1], child_peak)
+                if self._mem:
+                    self._mem[-1][1] = max(self._mem[-1][1], peak)
+                rec["py_peak_mb"] = round((peak - mem0) / 2**20, 2)
+            self._path.pop()
+            self.records.append(rec)
+
+    def totals(self):
+        """Soma de tempo e chamadas por estágio (pela ordem da 1ª ocorrência)."""
+        out = {}
+        for rec in self.records:
+            t = out.setdefault(rec["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            t["calls"] += 1
+            t["wall_s"] = round(t["wall_s"] + rec["wall_s"], 4)
+            t["cpu_s"] = round(t["cpu_s"] + rec["cpu_s"], 4)
+        return out
+
+    def report(self, **meta):
+        rss = peak_rss_mb()
+        return {
+            "meta": dict(meta, python=platform.python_version(), platform=platform.platform()),
+            "wall_s": round(time.perf_counter() - self._t0, 4),
+            "cpu_s": round(time.process_time() - self._cpu0, 4),
+            "peak_rss_mb": None if rss is None else round(rss, 1),
+            "totals": self.totals(),
+            "stages": self.records,
+        }
+
+    def write(self, path, **meta):
+        """Grava o relatório em `path` (JSON) e devolve o dict."""
+        if not self.enabled:
+            return None
+        data = self.report(**meta)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"⏱️ Perf: {data['wall_s']:.1f}s no total → {path}")
+        return data
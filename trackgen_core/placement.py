@@ -0,0 +1,371 @@
+"""
+Posicionamento procedural de prédios, obstáculos e quadras de início/fim.
+Tudo sai em BoxBatch (vetores como arrays NumPy (3,)), sem tocar no Blender.
+"""
+import math
+
+import numpy as np
+
+from .boxes import BoxBatch
+from .overlap import FootprintIndex, box_footprint, corridor_half_width, fit_box, shrink_scales
+from .rng import ChunkedRng, stage_rng, stream_at
+
+UP_GLOBAL = np.array((0.0, 0.0, 1.0))
+
+
+def unit(v):
+    v = np.asarray(v, dtype=np.float64)
+    n = np.linalg.norm(v)
+    return v / n if n > 0 else v
+
+def rotate(v, axis, angle):
+    """Gira v em torno de axis (Rodrigues) — equivalente a Matrix.Rotation(angle, 4, axis) @ v."""
+    k = unit(axis)
+    c, s = math.cos(angle), math.sin(angle)
+    return v * c + np.cross(k, v) * s + k * (np.dot(k, v) * (1.0 - c))
+
+
+def place_block_area(cfg, center, forward, right, up, tag, rng):
+    """
+    Caixas de uma quadra: piso sólido e prédios nas bordas.
+    Devolve (piso, prédios) como BoxBatch.
+    """
+    # piso da quadra
+    floor = BoxBatch()
+    floor_center = center - up * (cfg.BLOCK_FLOOR_HEIGHT / 2)
+    floor.add(floor_center, right, forward, up, cfg.BLOCK_WIDTH, cfg.BLOCK_LENGTH, cfg.BLOCK_FLOOR_HEIGHT, tag)
+
+    # grade de prédios
+    nx = int(cfg.BLOCK_WIDTH / cfg.BLOCK_BUILD_SPACING)
+    nz = int(cfg.BLOCK_LENGTH / cfg.BLOCK_BUILD_SPACING)
+
+    buildings = BoxBatch()
+    for ix in range(-nx//2, nx//2 + 1):
+        for iz in range(-nz//2, nz//2 + 1):
+            if rng.random() > cfg.BLOCK_BUILD_DENSITY:
+                continue
+
+            offset_r = right * (ix * cfg.BLOCK_BUILD_SPACING)
+            offset_f = forward * (iz * cfg.BLOCK_BUILD_SPACING)
+            pos = center + offset_r + offset_f
+
+            # só gera prédios nas bordas
+            if abs(ix) < nx//2 - 1 and abs(iz) < nz//2 - 1:
+                continue
+
+            h = rng.uniform(cfg.BLOCK_BUILD_HEIGHT * 0.6, cfg.BLOCK_BUILD_HEIGHT * 1.2)
+            w = rng.uniform(6.0, 12.0)
+            d = rng.uniform(6.0, 12.0)
+            pos = pos + up * (h/2)
+
+            buildings.add(pos, right, forward, up, w, d, h, tag)
+
+    return floor, buildings
+
+def block_barrier_box(cfg, center, forward, right, up, is_start=True, tag=0):
+    """
+    Barreira de início/fim (caixa fina na largura da estrada) com configurações
+    específicas. Devolve (BoxBatch, visível).
+    """
+    forward = unit(forward)
+    right = unit(right)
+    up = unit(up)
+
+    if is_start:
+        height = cfg.BLOCK_START_BARRIER_HEIGHT
+        thick = cfg.BLOCK_START_BARRIER_THICK
+        visible = cfg.BLOCK_START_BARRIER_VISIBLE
+        offset = cfg.BLOCK_BARRIER_OFFSET_START
+    else:
+        height = cfg.BLOCK_END_BARRIER_HEIGHT
+        thick = cfg.BLOCK_END_BARRIER_THICK
+        visible = cfg.BLOCK_END_BARRIER_VISIBLE
+        offset = cfg.BLOCK_BARRIER_OFFSET_END
+
+    # move a barreira para dentro, na direção da pista
+    center = center + forward * offset
+
+    # usa largura da estrada, não da quadra; espessura fica atrás do centro (-forward)
+    barrier = BoxBatch()
+    barrier.add(center - forward * (thick / 2) + up * (height / 2), right, forward, up,
+                cfg.BASE_ROAD_WIDTH, thick, height, tag)
+    return barrier, visible
+
+def place_block_areas(cfg, frames, rng=None):
+    """
+    Quadras de início/fim com suas barreiras.
+    Devolve lista de (nome, BoxBatch, material, visível); as caixas levam
+    tag 0 (início) ou len(frames)-1 (fim).
+    Sem `rng`, cada quadra sorteia do seu stream ("block_start"/"block_end").
+    """
+    items = []
+    ends = []
+    if cfg.BLOCK_START_ENABLE:
+        ends.append(("Start", 0, True))
+    if cfg.BLOCK_END_ENABLE:
+        ends.append(("End", len(frames) - 1, False))
+
+    for label, i, is_start in ends:
+        f = frames[i]
+        fwd, right, up = f["fwd"], f["right"], f["up"]
+        # centro da quadra (antes do início / depois do fim)
+        sign = -1 if is_start else 1
+        center = f["pos"] + fwd * (sign * cfg.BLOCK_LENGTH * 0.5)
+        area_rng = rng if rng is not None else stage_rng(cfg.SEED, f"block_{label.lower()}")
+        floor, buildings = place_block_area(cfg, center, fwd, right, up, i, area_rng)
+        items.append((f"Block_{label}_Floor", floor, "block_floor", cfg.BLOCK_FLOOR_VISIBLE))
+        items.append((f"Block_{label}_Buildings", buildings, "building", True))
+
+        if cfg.BLOCK_BARRIERS:
+            # barreira fica na borda da quadra que encosta na pista
+            barrier_center = center - fwd * (sign * cfg.BLOCK_LENGTH * 0.5)
+            barrier, visible = block_barrier_box(cfg, barrier_center, fwd, right, up, is_start=is_start, tag=i)
+            items.append((f"Barrier_{label}", barrier, "block_barrier" if visible else None, visible))
+    return items
+
+
+def place_buildings_along_pads(cfg, frames, side=1, rng=None):
+    """
+    Gera prédios em múltiplas fileiras no lado 'side'.
+    Cada fileira fica mais afastada da estrada.
+    Devolve um BoxBatch por fileira (tag = índice do frame).
+    Sem `rng`, sorteia do stream ("buildings_L/R", trecho de RNG_CHUNK_LEN m).
+    Com OVERLAP_CHECK, prédio que invade o corredor da pista ou outro prédio
+    do mesmo lado encolhe (até OVERLAP_SHRINK_MIN) ou é descartado; os
+    sorteios não mudam, então o resto da fileira continua igual.
+    """
+    if rng is None:
+        rng = ChunkedRng(cfg.SEED, f"buildings_{'R' if side == 1 else 'L'}", cfg.RNG_CHUNK_LEN)
+    rows = [BoxBatch() for _ in range(cfg.BUILD_ROWS)]
+
+    index = None
+    if cfg.OVERLAP_CHECK:
+        index = FootprintIndex(cfg.OVERLAP_CELL)
+        index.add_corridor(frames, corridor_half_width(cfg, frames), cfg.ROAD_THICKNESS, cfg.OVERLAP_CLEARANCE)
+        scales = shrink_scales(cfg)
+
+    s_next = cfg.BUILD_DENSITY_M
+    for i, s in enumerate(frames.s.tolist()):
+        if s >= s_next:
+            rnd = stream_at(rng, s)
+            if rnd.random() <= cfg.BUILD_PROB:
+                pos     = frames.pos[i]
+                right   = frames.right[i]
+                forward = frames.fwd[i]
+                up      = frames.up[i]
+                road_w, shoulder_w = float(frames.road_w[i]), float(frames.shoulder_w[i])
+
+                # se habilitado, força prédios verticais (up global)
+                if cfg.BUILD_ALIGN_WORLD:
+                    up = UP_GLOBAL
+                    # re-ortogonaliza right/forward em torno de up global
+                    forward = unit((forward[0], forward[1], 0.0))
+                    right = unit(np.cross(UP_GLOBAL, forward))  # up_global × forward
+
+                # base do pad relativa ao centro da pista
+                edge_to_pad_start = (
+                    road_w*0.5 +
+                    shoulder_w +
+                    cfg.BARRIER_OFFSET + cfg.BARRIER_THICKNESS +
+                    cfg.BUILD_PAD_OFFSET
+                )
+
+                for row in range(cfg.BUILD_ROWS):
+                    # distância lateral até o início da fileira
+                    row_offset = (
+                        edge_to_pad_start +           # até o início do pad
+                        cfg.BUILD_SETBACK +           # recuo antes do prédio
+                        (row * cfg.ROW_SPACING)       # espaço adicional por fileira
+                    )
+
+                    center_base = (
+                        pos
+                        + right * (row_offset * side)
+                        + up * (cfg.ROAD_THICKNESS/2 + cfg.BUILD_PAD_HEIGHT)
+                    )
+
+                    jitter_r = (rnd.random()*2-1) * cfg.BUILD_JITTER_R
+                    jitter_f = (rnd.random()*2-1) * cfg.BUILD_JITTER_F
+                    center = center_base + right*(jitter_r*side) + forward*jitter_f
+
+                    w = rnd.uniform(cfg.BUILD_W_MIN, cfg.BUILD_W_MAX)
+                    d = rnd.uniform(cfg.BUILD_D_MIN, cfg.BUILD_D_MAX)
+                    h_mod = 1.0 + (rnd.uniform(-cfg.ROW_HEIGHT_VARIATION, cfg.ROW_HEIGHT_VARIATION) * (row+1))
+                    h = rnd.uniform(cfg.BUILD_H_MIN, cfg.BUILD_H_MAX) * h_mod
+
+                    # mantém sistema de coordenadas destro para evitar faces invertidas
+                    right_fixed = right * side
+                    forward_fixed = forward
+                    if side == -1:
+                        forward_fixed = -forward
+
+                    if index is not None:
+                        k = fit_box(index, center, right_fixed, forward_fixed, up, (w, d, h), scales)
+                        if k is None:
+                            continue
+                        w, d = w * k, d * k
+
+                    rows[row].add(center, right_fixed, forward_fixed, up, w, d, h, i)
+            s_next += cfg.BUILD_DENSITY_M
+
+    return rows
+
+
+def make_obstacle_form(batch, pos, right, forward, up, w, d, h, mode, tag=0):
+    """
+    Adiciona em `batch` (BoxBatch) as caixas de cada tipo de obstáculo:
+      1=pilar (retângulo simples)
+      2=parede transversal
+      3=arco (duas colunas + viga superior)
+      4=viga cruzada (X)
+      5=caixa sólida
+    """
+    def box(center, w_, d_, h_, right_=right, up_=up):
+        batch.add(center, right_, forward, up_, w_, d_, h_, tag)
+
+    if mode == 1:
+        box(pos, w, d, h)
+    elif mode == 2:
+        # parede transversal (longa na largura)
+        box(pos, w * 3, d * 0.5, h)
+    elif mode == 3:
+        # arco (duas colunas e uma viga)
+        offset = right * (w * 1.2)
+        col_h = h * 0.8
+        col_w = w * 0.4
+        col_d = d * 0.8
+        top_h = h * 0.2
+        box(pos - offset, col_w, col_d, col_h)
+        box(pos + offset, col_w, col_d, col_h)
+        box(pos + up * (col_h - top_h / 2), w * 3, col_d, top_h)
+    elif mode == 4:
+        # viga cruzada (X): duas caixas giradas ±45° em torno de forward
+        tilt = math.radians(45)
+        for s in (-1, 1):
+            r2 = unit(rotate(right, forward, tilt * s))
+            u2 = unit(rotate(up, forward, tilt * s))
+            box(pos, w, d, h, r2, u2)
+    elif mode == 5:
+        # caixa sólida (cheia, tipo container)
+        box(pos, w * 1.5, d * 1.5, h)
+
+
+def place_obstacles(cfg, frames, rng=None):
+    """
+    Gera obstáculos (pilares, paredes, arcos, etc.) ao longo da pista.
+    Possui suporte a curvas, agrupamento e variação procedural.
+    Devolve um BoxBatch com todas as partes (tag = índice do frame).
+    Sem `rng`, sorteia do stream ("obstacles", trecho de RNG_CHUNK_LEN m).
+    Com OVERLAP_CHECK, obstáculo (a forma inteira) que sobrepõe um anterior
+    é descartado; obstáculos ficam na pista, então o corredor não entra.
+    """
+    if rng is None:
+        rng = ChunkedRng(cfg.SEED, "obstacles", cfg.RNG_CHUNK_LEN)
+    s_next = cfg.OBSTACLE_STEP_BASE
+    side_toggle = -1
+    batch = BoxBatch()
+    index = FootprintIndex(cfg.OVERLAP_CELL) if cfg.OVERLAP_CHECK else None
+
+    bank_deg = frames.bank_deg.tolist()
+
+    for i, s in enumerate(frames.s.tolist()):
+        if s < s_next:
+            continue
+
+        curvature = abs(bank_deg[i])
+        is_curve = curvature > cfg.OBSTACLE_BANK_THRESHOLD
+
+        if cfg.OBSTACLE_CURVE_ONLY and not is_curve:
+            continue
+
+        step_here = cfg.OBSTACLE_STEP_BASE
+        if is_curve:
+            step_here *= cfg.OBSTACLE_STEP_MULT_CURV
+        s_next += step_here
+
+        rnd = stream_at(rng, s)
+        if rnd.random() > cfg.OBSTACLE_PROB:
+            continue
+
+        pos = frames.pos[i]
+        right = frames.right[i]
+        forward = frames.fwd[i]
+        up = frames.up[i]
+
+        if cfg.OBSTACLE_ALIGN_WORLD:
+            up = UP_GLOBAL
+            forward = unit((forward[0], forward[1], 0.0))
+            right = unit(np.cross(forward, up))
+
+        # modos de posicionamento
+        sides_to_spawn = []
+        if cfg.OBSTACLE_MODE == 1:
+            sides_to_spawn = [0]
+        elif cfg.OBSTACLE_MODE == 2:
+            side_toggle *= -1
+            sides_to_spawn = [side_toggle]
+        elif cfg.OBSTACLE_MODE == 3:
+            sides_to_spawn = [-1, 1]
+        elif cfg.OBSTACLE_MODE == 4:
+            sides_to_spawn = [rnd.choice([-1, 0, 1])]
+
+        if cfg.OBSTACLE_REVERSE:
+            sides_to_spawn = [-s for s in sides_to_spawn]
+
+        # variação de rotação
+        yaw_rot = math.radians(rnd.uniform(-cfg.OBSTACLE_ROT_VARIATION, cfg.OBSTACLE_ROT_VARIATION))
+        tilt_rot = math.radians(rnd.uniform(-cfg.OBSTACLE_TILT_VARIATION, cfg.OBSTACLE_TILT_VARIATION))
+
+        # m_yaw @ m_tilt: inclina em torno de right, depois gira em torno de up
+        right_r = unit(rotate(rotate(right, right, tilt_rot), up, yaw_rot))
+        forward_r = unit(rotate(rotate(forward, right, tilt_rot), up, yaw_rot))
+
+        for side in sides_to_spawn:
+            # deslocamento base + jitter lateral
+            offset = right * (cfg.OBSTACLE_OFFSET_SIDE * side)
+
+            # calcula jitter lateral aleatório
+            jitter_val = rnd.uniform(-cfg.OBSTACLE_SIDE_JITTER, cfg.OBSTACLE_SIDE_JITTER)
+            if cfg.OBSTACLE_JITTER_MODE == 2:  # só para fora
+                jitter_val = abs(jitter_val)
+            elif cfg.OBSTACLE_JITTER_MODE == 3:  # só para dentro
+                jitter_val = -abs(jitter_val)
+
+            # aplica jitter no mesmo sentido do lado
+            offset = offset + right * (jitter_val * side if side != 0 else jitter_val)
+
+            base = pos + offset + up * (cfg.ROAD_THICKNESS/2 + cfg.OBSTACLE_UP_OFFSET)
+
+            # múltiplos pilares por grupo
+            for g in range(cfg.OBSTACLE_GROUP_SIZE):
+                gpos = base + forward_r * (g * cfg.OBSTACLE_GROUP_SPACING)
+
+                # dentro do túnel, se habilitado
+                if cfg.OBSTACLE_TUNNEL_MODE:
+                    if cfg.OBSTACLE_TUNNEL_HANG:
+                        gpos = gpos + up * (cfg.TUNNEL_HEIGHT - cfg.OBSTACLE_H_MAX/2)
+                    else:
+                        gpos = gpos + up * (cfg.ROAD_THICKNESS/2)
+                elif cfg.OBSTACLE_SKIP_TUNNEL and pos[2] < 0:
+                    continue
+
+                w = rnd.uniform(cfg.OBSTACLE_W_MIN, cfg.OBSTACLE_W_MAX)
+                d = rnd.uniform(cfg.OBSTACLE_D_MIN, cfg.OBSTACLE_D_MAX)
+                h = rnd.uniform(cfg.OBSTACLE_H_MIN, cfg.OBSTACLE_H_MAX)
+
+                form = BoxBatch()
+                make_obstacle_form(
+                    form, gpos, right_r, forward_r, up,
+                    w, d, h, cfg.OBSTACLE_TEMPLATE_MODE, i
+                )
+                if index is not None:
+                    # as caixas de uma mesma forma (arco, X) se tocam de propósito
+                    fps = [box_footprint(*box) for box in zip(form.centers, form.rights, form.forwards,
+                                                              form.ups, form.sizes)]
+                    if any(index.overlaps(fp) for fp in fps):
+                        continue
+                    for fp in fps:
+                        index.insert(fp)
+                batch.extend(form)
+
+    return batch
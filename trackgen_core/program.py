@@ -0,0 +1,65 @@
+"""
+Programa da pista: sequência de passos (yawΔ, pitchΔ, ds) montada a partir de blocos sorteados.
+"""
+import math
+
+from .rng import stage_rng
+
+
+def block_straight(cfg, L=40.0):
+    steps = max(1, int(L/cfg.STEP_LEN))
+    for i in range(steps):
+        t = (i+1)/steps
+        yield 0.0, 0.0, cfg.STEP_LEN  # yawΔ, pitchΔ, ds
+
+def block_curve(cfg, angle_deg=30.0, radius=60.0, left=True, ease_type="sin"):
+    """
+    Gera passos de curva com easing suave.
+    ease_type: "sin" (padrão) ou "cos" etc. Mantém yaw_step crescendo e decrescendo.
+    """
+    arc = math.radians(abs(angle_deg)) * max(radius, 1e-6)
+    steps = max(1, int(arc / cfg.STEP_LEN))
+    yaw_total = angle_deg
+    for i in range(steps):
+        u = (i + 0.5) / steps  # 0..1
+        if ease_type == "sin":
+            ease = math.sin(u * math.pi)    # sin: 0->1->0 (suave)
+        else:
+            # fallback: cos ease-in-out
+            ease = 0.5 - 0.5 * math.cos(u * math.pi)
+        # yaw_step em graus (soma aproximada será < yaw_total; mas forma é mais suave)
+        yaw_step = (yaw_total / steps) * ease
+        if not left:
+            yaw_step = -yaw_step
+        yield yaw_step, 0.0, cfg.STEP_LEN
+
+def block_grade(cfg, L=40.0, dz=8.0):
+    steps = max(1, int(L/cfg.STEP_LEN))
+    pitch_total = math.degrees(math.atan2(dz, L))
+    for i in range(steps):
+        u = (i+0.5)/steps
+        ease = 0.5 - 0.5*math.cos(u*math.pi)  # cos-ease-in-out
+        dpitch = (pitch_total/steps) * ease
+        yield 0.0, dpitch, cfg.STEP_LEN
+
+def random_block(cfg, rng):
+    t = rng.choices(["S","CL","CR","U","D"], weights=[4,2,2,1,1])[0]
+    if t == "S":
+        return list(block_straight(cfg, L=rng.uniform(30,60)))
+    if t == "CL":
+        return list(block_curve(cfg, angle_deg=rng.choice([15,25,35]), radius=rng.uniform(50,90), left=True))
+    if t == "CR":
+        return list(block_curve(cfg, angle_deg=rng.choice([15,25,35]), radius=rng.uniform(50,90), left=False))
+    if t == "U":
+        return list(block_grade(cfg, L=rng.uniform(35,55), dz=rng.uniform(6,12)))
+    return list(block_grade(cfg, L=rng.uniform(35,55), dz=-rng.uniform(6,12)))
+
+def program_from_blocks(cfg, n, rng=None):
+    """
+    Sorteia n blocos. Sem `rng`, o bloco i usa o stream ("program", i): aumentar
+    NUM_BLOCKS só acrescenta blocos no fim, sem mudar os anteriores.
+    """
+    prog = []
+    for i in range(n):
+        prog += random_block(cfg, rng if rng is not None else stage_rng(cfg.SEED, "program", i))
+    return prog
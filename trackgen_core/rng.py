@@ -0,0 +1,47 @@
+"""
+Streams de números aleatórios independentes por estágio da geração.
+
+Cada estágio (programa, prédios L/R, obstáculos, quadras) sorteia de um
+random.Random próprio com semente derivada de (seed, estágio, trecho), então
+ligar/desligar ou reconfigurar um estágio não embaralha os outros.
+"""
+import hashlib
+import random
+
+
+def stage_seed(seed, stage, chunk=0):
+    """Semente de 64 bits estável (independente de PYTHONHASHSEED) para (seed, estágio, trecho)."""
+    key = f"{seed}:{stage}:{chunk}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def stage_rng(seed, stage, chunk=0):
+    return random.Random(stage_seed(seed, stage, chunk))
+
+
+class ChunkedRng:
+    """
+    Um stream por trecho de s: ao entrar no trecho k = s // chunk_len passa a
+    sortear de stage_rng(seed, stage, k). O que cai num trecho depende só do
+    seed, do estágio e dos frames daquele trecho.
+    """
+    __slots__ = ("seed", "stage", "chunk_len", "chunk", "rng")
+
+    def __init__(self, seed, stage, chunk_len):
+        self.seed = seed
+        self.stage = stage
+        self.chunk_len = max(float(chunk_len), 1e-6)
+        self.chunk = None
+        self.rng = None
+
+    def at(self, s):
+        k = int(s // self.chunk_len)
+        if k != self.chunk:
+            self.chunk = k
+            self.rng = stage_rng(self.seed, self.stage, k)
+        return self.rng
+
+
+def stream_at(rng, s):
+    """Gerador a usar na posição s: ChunkedRng troca por trecho; Random/módulo random é usado direto."""
+    return rng.at(s) if isinstance(rng, ChunkedRng) else rng
@@ -0,0 +1,141 @@
+"""
+Spawn points e checkpoints/respawns como registros simples (nome, posição, rotação, props).
+"""
+import math
+
+
+def track_euler(vec):
+    """
+    Euler XYZ (radianos) de vec.to_track_quat("Z", "Y").to_euler("XYZ"),
+    portado do vec_to_quat / mat3_to_eul do Blender: eixo Z local aponta
+    para `vec` e o Y local fica o mais próximo possível do Z global.
+    """
+    tx, ty, tz = (float(c) for c in vec)
+    length = math.sqrt(tx*tx + ty*ty + tz*tz)
+    if length == 0.0:
+        return (0.0, 0.0, 0.0)
+
+    # rotação mínima de +Z até vec
+    nor = [-ty, tx, 0.0]
+    if abs(tx) + abs(ty) < 1e-4:
+        nor[0] = 1.0
+    co = tz / length
+    n = math.sqrt(nor[0]**2 + nor[1]**2 + nor[2]**2)
+    nor = [c / n for c in nor]
+    half = 0.5 * math.acos(max(-1.0, min(1.0, co)))
+    si = math.sin(half)
+    q = (math.cos(half), nor[0]*si, nor[1]*si, nor[2]*si)
+
+    # giro em torno de vec para alinhar o eixo up (Y)
+    z_axis = _quat_to_mat3(q)[2]
+    angle = -0.5 * math.atan2(-z_axis[0], -z_axis[1])
+    si = math.sin(angle) / length
+    q = _quat_mul((math.cos(angle), tx*si, ty*si, tz*si), q)
+
+    return _mat3_to_euler_xyz(_quat_to_mat3(q))
+
+
+def _quat_mul(a, b):
+    return (
+        a[0]*b[0] - a[1]*b[1] - a[2]*b[2] - a[3]*b[3],
+        a[0]*b[1] + a[1]*b[0] + a[2]*b[3] - a[3]*b[2],
+        a[0]*b[2] + a[2]*b[0] + a[3]*b[1] - a[1]*b[3],
+        a[0]*b[3] + a[3]*b[0] + a[1]*b[2] - a[2]*b[1],
+    )
+
+
+def _quat_to_mat3(q):
+    """Matriz 3x3 no layout do Blender: m[i] é a imagem do eixo i."""
+    q0, q1, q2, q3 = (math.sqrt(2.0) * c for c in q)
+    qda, qdb, qdc = q0*q1, q0*q2, q0*q3
+    qaa, qab, qac = q1*q1, q1*q2, q1*q3
+    qbb, qbc, qcc = q2*q2, q2*q3, q3*q3
+    return (
+        (1.0 - qbb - qcc, qdc + qab, -qdb + qac),
+        (-qdc + qab, 1.0 - qaa - qcc, qda + qbc),
+        (qdb + qac, -qda + qbc, 1.0 - qaa - qbb),
+    )
+
+
+def _mat3_to_euler_xyz(m):
+    """Das duas soluções Euler XYZ, devolve a de menor soma |x|+|y|+|z| (como o Blender)."""
+    cy = math.hypot(m[0][0], m[0][1])
+    if cy > 16.0 * 1.1920929e-07:
+        e1 = (math.atan2(m[1][2], m[2][2]), math.atan2(-m[0][2], cy), math.atan2(m[0][1], m[0][0]))
+        e2 = (math.atan2(-m[1][2], -m[2][2]), math.atan2(-m[0][2], -cy), math.atan2(-m[0][1], -m[0][0]))
+        return e2 if sum(map(abs, e1)) > sum(map(abs, e2)) else e1
+    return (math.atan2(-m[2][1], m[1][1]), math.atan2(-m[0][2], cy), 0.0)
+
+
+def spawn_records(cfg, start_frame):
+    """
+    Formação de spawn no início da pista.
+    Devolve lista de dicts {name, pos, rot (Euler XYZ, rad), row, col, index, spawn_name}.
+    """
+    fwd, right, up = start_frame["fwd"], start_frame["right"], start_frame["up"]
+    base_pos = start_frame["pos"] + fwd * cfg.SPAWN_OFFSET_FORWARD + up * cfg.SPAWN_OFFSET_UP
+    rot = track_euler(fwd)
+
+    total_width = (cfg.SPAWN_PER_ROW - 1) * cfg.SPAWN_SPACING_X
+    half_width = total_width / 2.0
+
+    records = []
+    for row in range(cfg.SPAWN_ROWS):
+        for col in range(cfg.SPAWN_PER_ROW):
+            offset_r = right * (col * cfg.SPAWN_SPACING_X - half_width)
+            offset_f = fwd * (-row * cfg.SPAWN_SPACING_Y)
+            records.append({
+                "name": f"Spawn_{row}_{col}",
+                "pos": tuple((base_pos + offset_r + offset_f).tolist()),
+                "rot": rot,
+                "row": row,
+                "col": col,
+                "index": row * cfg.SPAWN_PER_ROW + col,
+                "spawn_name": f"spawn_{row}_{col}",
+            })
+    return records
+
+
+def checkpoint_records(cfg, frames):
+    """
+    Checkpoints a cada CHECKPOINT_SPACING metros, cada um com sua grade de respawns.
+    Devolve lista de dicts {id, name, pos, rot, respawns: [{name, pos, rot, row, col, index}]}.
+    """
+    total_frames = len(frames)
+    if total_frames == 0:
+        return []
+    step = max(1, int(cfg.CHECKPOINT_SPACING / (frames.s[-1] / total_frames)))
+
+    total_w = (cfg.CHECKPOINT_RESPAWN_COLS - 1) * cfg.CHECKPOINT_RESPAWN_SPACING_X
+    half_w = total_w / 2.0
+
+    records = []
+    for checkpoint_id, i in enumerate(range(0, total_frames, step)):
+        pos, fwd, right, up = frames.pos[i], frames.fwd[i], frames.right[i], frames.up[i]
+        rot = track_euler(fwd)
+
+        # respawns ao redor
+        base_pos = pos + fwd * cfg.CHECKPOINT_RESPAWN_OFFSET_FWD + up * cfg.CHECKPOINT_OFFSET_UP
+        respawns = []
+        for r in range(cfg.CHECKPOINT_RESPAWN_ROWS):
+            for c in range(cfg.CHECKPOINT_RESPAWN_COLS):
+                offset_r = right * (c * cfg.CHECKPOINT_RESPAWN_SPACING_X - half_w)
+                offset_f = fwd * (-r * cfg.CHECKPOINT_RESPAWN_SPACING_Y)
+                respawns.append({
+                    "name": f"Respawn_{checkpoint_id}_{r}_{c}",
+                    "pos": tuple((base_pos + offset_r + offset_f).tolist()),
+                    "rot": rot,
+                    "row": r,
+                    "col": c,
+                    "index": r * cfg.CHECKPOINT_RESPAWN_COLS + c,
+                })
+
+        records.append({
+            "id": checkpoint_id,
+            "name": f"Checkpoint_{checkpoint_id}",
+            "s": float(frames.s[i]),
+            "pos": tuple((pos + up * cfg.CHECKPOINT_OFFSET_UP).tolist()),
+            "rot": rot,
+            "respawns": respawns,
+        })
+    return records
@@ -0,0 +1,140 @@
+"""
+Estágios da geração com chaves de cache: programa -> frames -> componentes -> splits -> assets.
+
+A chave de cada estágio depende só dos parâmetros listados em STAGE_PARAMS e das
+chaves dos estágios de que ele depende, então mexer num parâmetro de obstáculos
+não invalida programa, frames, estrada ou prédios.
+"""
+from fnmatch import fnmatchcase
+
+from .cache import hash_key
+from .frames import frames_from_program
+from .placement import place_block_areas, place_buildings_along_pads, place_obstacles
+from .program import program_from_blocks
+from .sweep import barrier_profile, buildpad_profile, road_profile, sweep_profile, tunnel_profile
+
+# parâmetros (nomes do cfg, aceita curinga) de que cada estágio depende
+STAGE_PARAMS = {
+    "program":     ("SEED", "NUM_BLOCKS", "STEP_LEN"),
+    "frames":      ("TARGET_SPEED", "BANK_*", "WIDTH_CURV_FACT", "PITCH_SMOOTH", "STEP_LEN",
+                    "BASE_ROAD_WIDTH", "SHOULDER_WIDTH_BASE"),
+    "road":        ("ROAD_THICKNESS",),
+    "barrier":     ("ROAD_THICKNESS", "BARRIER_OFFSET", "BARRIER_THICKNESS", "BARRIER_HEIGHT"),
+    "buildpad":    ("ROAD_THICKNESS", "BARRIER_OFFSET", "BARRIER_THICKNESS", "BUILD_PAD_*"),
+    "tunnel":      ("ROAD_THICKNESS", "BARRIER_OFFSET", "BARRIER_THICKNESS", "TUNNEL_*"),
+    "buildings":   ("SEED", "RNG_CHUNK_LEN", "BUILD_*", "ROW_*", "ROAD_THICKNESS",
+                    "BARRIER_OFFSET", "BARRIER_THICKNESS", "OVERLAP_*"),
+    "obstacles":   ("SEED", "RNG_CHUNK_LEN", "OBSTACLE_*", "ROAD_THICKNESS", "TUNNEL_HEIGHT",
+                    "OVERLAP_CHECK", "OVERLAP_CELL"),
+    "block_areas": ("SEED", "BLOCK_*", "BASE_ROAD_WIDTH"),
+    "splits":      ("VERTEX_LIMIT", "LOD_LIMIT", "CHUNKED", "CHUNK_LEN", "MERGE_DIST",
+                    "AUTO_SMOOTH_ANGLE_DEG", "TUNNEL_VISIBLE", "LODS", "LOD_STRIDES", "LOD_MIN_BOX",
+                    "STEP_LEN", "COLLISION_*"),
+}
+
+# parâmetros que nunca entram em chave (só dizem onde gravar ou como paralelizar)
+NON_CONTENT_PARAMS = ("OUTPUT_BASE", "CACHE*", "PERF*", "SOLLUMZ_*")
+
+
+class TrackStages:
+    """
+    Acesso preguiçoso aos estágios de uma pista. Com `cache` (StageCache)
+    cada estágio é lido do disco quando a chave já existe; sem cache só
+    memoriza em memória. Splits e assets são produzidos no Blender: o
+    adaptador usa key("splits")/key("assets") e grava/lê o cache direto.
+    """
+
+    def __init__(self, cfg, cache=None, adapter_salt=""):
+        self.cfg = cfg
+        self.cache = cache
+        self.adapter_salt = adapter_salt  # código do lado Blender: entra só em splits/assets
+        self._values = {}
+        self._keys = {}
+
+    # --- chaves
+
+    def params(self, stage):
+        names = sorted(vars(self.cfg))
+        if stage in STAGE_PARAMS:
+            pats = STAGE_PARAMS[stage]
+            names = [n for n in names if any(fnmatchcase(n, p) for p in pats)]
+        names = [n for n in names if not any(fnmatchcase(n, p) for p in NON_CONTENT_PARAMS)]
+        params = {n: getattr(self.cfg, n) for n in names}
+        if stage in ("splits", "assets"):
+            params["_adapter"] = self.adapter_salt
+        return params
+
+    def key(self, stage, part=""):
+        name = f"{stage}:{part}" if part else stage
+        if name not in self._keys:
+            if stage == "program":
+                upstream = []
+            elif stage == "frames":
+                upstream = [self.key("program")]
+            elif stage == "splits":
+                upstream = [self.key(*c) for c in self.enabled_components()]
+            elif stage == "assets":
+                upstream = [self.key("splits")]
+            else:
+                upstream = [self.key("frames")]
+            if self.cache is not None:
+                self._keys[name] = self.cache.key(name, self.params(stage), upstream)
+            else:
+                self._keys[name] = hash_key({"stage": name, "params": self.params(stage), "upstream": upstream})
+        return self._keys[name]
+
+    def enabled_components(self):
+        """(estágio, parte) de tudo que entra nos splits, na ordem de construção."""
+        cfg = self.cfg
+        comps = [("road", "")]
+        if cfg.BARRIERS:
+            comps += [("barrier", "-1"), ("barrier", "1")]
+        if cfg.BUILD_PAD_ENABLE:
+            comps += [("buildpad", "-1"), ("buildpad", "1")]
+        if cfg.TUNNEL_ENABLE:
+            comps.append(("tunnel", ""))
+        if cfg.BUILDINGS_ENABLE:
+            if cfg.BUILD_SIDE_L: comps.append(("buildings", "-1"))
+            if cfg.BUILD_SIDE_R: comps.append(("buildings", "1"))
+        if cfg.OBSTACLES_ENABLE:
+            comps.append(("obstacles", ""))
+        if cfg.BLOCK_AREAS_ENABLE:
+            comps.append(("block_areas", ""))
+        return comps
+
+    # --- valores
+
+    def get(self, stage, fn, part=""):
+        name = f"{stage}:{part}" if part else stage
+        if name not in self._values:
+            if self.cache is None:
+                self._values[name] = fn()
+            else:
+                self._values[name] = self.cache.get_or_compute(self.key(stage, part), fn, name)
+        return self._values[name]
+
+    @property
+    def program(self):
+        return self.get("program", lambda: program_from_blocks(self.cfg, self.cfg.NUM_BLOCKS))
+
+    @property
+    def frames(self):
+        return self.get("frames", lambda: frames_from_program(self.program, self.cfg))
+
+    def sweep(self, name, side=1):
+        """MeshBuffers da seção `name` (road/barrier/buildpad/tunnel), material = name."""
+        profile = {"road": road_profile, "barrier": barrier_profile,
+                   "buildpad": buildpad_profile, "tunnel": tunnel_profile}[name]
+        material = name if name != "tunnel" or self.cfg.TUNNEL_VISIBLE else None
+        part = "" if name in ("road", "tunnel") else str(side)
+        return self.get(name, lambda: sweep_profile(self.frames, profile(self.cfg), side, material), part)
+
+    def buildings(self, side):
+        return self.get("buildings", lambda: place_buildings_along_pads(self.cfg, self.frames, side), str(side))
+
+    def obstacles(self):
+        return self.get("obstacles", lambda: place_obstacles(self.cfg, self.frames))
+
+    def block_areas(self):
+        return self.get("block_areas", lambda: place_block_areas(self.cfg, self.frames))
+
@@ -0,0 +1,142 @@
+"""
+Sweep de seções transversais ao longo dos frames da pista.
+"""
+import numpy as np
+
+from .buffers import MeshBuffers
+
+
+class SweepProfile:
+    """
+    Seção transversal 2-D (plano right/up do frame) varrida ao longo da pista.
+
+    Cada ponto é (k_edge, lat, h):
+      deslocamento lateral = side * (k_edge * edge + lat), com edge = road_w/2 + shoulder_w
+      altura               = h (ao longo de up)
+    Os pontos formam um laço fechado; `faces` escolhe quais arestas j -> j+1
+    viram faixas (padrão: todas). O winding sai da orientação do laço:
+    num laço anti-horário a normal de cada faixa aponta para o lado de fora.
+    `caps` fecha o início/fim com o polígono do laço.
+    """
+    __slots__ = ("k_edge", "lat", "h", "faces", "caps")
+
+    def __init__(self, points, faces=None, caps=True):
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.k_edge, self.lat, self.h = pts[:, 0], pts[:, 1], pts[:, 2]
+        self.faces = np.arange(len(pts)) if faces is None else np.asarray(faces, dtype=np.int64)
+        self.caps = caps
+
+
+def sweep_profile(frames, profile, side=1, material=None, caps=None):
+    """
+    Varre `profile` por todos os frames em uma passada vetorizada.
+    side=-1 espelha o perfil (lado esquerdo) e inverte o winding junto.
+    caps=None usa profile.caps; caps=(início, fim) permite fechar só uma
+    das pontas (útil quando a pista é gerada em pedaços).
+    """
+    n = len(frames)
+    p = len(profile.h)
+    if n == 0:
+        return MeshBuffers(np.zeros((0, 3)), [], [])
+
+    edge = frames.road_w*0.5 + frames.shoulder_w
+    lat = side * (edge[:, None]*profile.k_edge + profile.lat)               # (N, P)
+    verts = (frames.pos[:, None, :]
+             + frames.right[:, None, :]*lat[:, :, None]
+             + frames.up[:, None, :]*profile.h[None, :, None])              # (N, P, 3)
+
+    # orientação do laço no plano (right, up): área com sinal (shoelace)
+    r, u = lat[n // 2], profile.h
+    area = 0.5 * np.sum(r*np.roll(u, -1) - np.roll(r, -1)*u)
+    ccw = area >= 0
+
+    a = profile.faces
+    b = (a + 1) % p
+    if not ccw:
+        a, b = b, a
+    i = np.arange(n - 1)[:, None]
+    # normal de [A_i, A_i+1, B_i+1, B_i] ~ fwd x (B - A) -> lado direito de A->B
+    quads = np.stack((i*p + a, (i+1)*p + a, (i+1)*p + b, i*p + b), axis=-1).reshape(-1, 4)
+
+    loops = [quads.ravel()]
+    sizes = [np.full(len(quads), 4, dtype=np.int64)]
+
+    cap_start, cap_end = (profile.caps, profile.caps) if caps is None else caps
+    # right x up = -fwd: laço anti-horário já aponta para trás (tampa inicial)
+    ring = np.arange(p) if ccw else np.arange(p)[::-1]
+    if cap_start:
+        loops.append(ring)
+        sizes.append([p])
+    if cap_end:
+        loops.append((n - 1)*p + ring[::-1])
+        sizes.append([p])
+
+    return MeshBuffers(
+        verts.reshape(-1, 3),
+        np.concatenate(loops),
+        np.concatenate(sizes),
+        materials=[material] if material else [],
+        smooth=True,
+    )
+
+
+def road_profile(cfg):
+    """Laje da estrada: largura total (road_w + acostamentos) x ROAD_THICKNESS."""
+    half_t = cfg.ROAD_THICKNESS * 0.5
+    return SweepProfile([
+        (-1.0, 0.0, -half_t),   # BL
+        ( 1.0, 0.0, -half_t),   # BR
+        ( 1.0, 0.0,  half_t),   # TR
+        (-1.0, 0.0,  half_t),   # TL
+    ])
+
+
+def barrier_profile(cfg):
+    """Muro lateral apoiado no topo da estrada (lado direito; side=-1 espelha)."""
+    base = cfg.ROAD_THICKNESS / 2
+    return SweepProfile([
+        (1.0, cfg.BARRIER_OFFSET,                         base),
+        (1.0, cfg.BARRIER_OFFSET + cfg.BARRIER_THICKNESS, base),
+        (1.0, cfg.BARRIER_OFFSET + cfg.BARRIER_THICKNESS, base + cfg.BARRIER_HEIGHT),
+        (1.0, cfg.BARRIER_OFFSET,                         base + cfg.BARRIER_HEIGHT),
+    ])
+
+
+def buildpad_profile(cfg):
+    """Piso lateral para prédios, logo depois da barreira."""
+    start = cfg.BARRIER_OFFSET + cfg.BARRIER_THICKNESS + cfg.BUILD_PAD_OFFSET
+    base = cfg.ROAD_THICKNESS / 2
+    return SweepProfile([
+        (1.0, start,                       base),
+        (1.0, start + cfg.BUILD_PAD_WIDTH, base),
+        (1.0, start + cfg.BUILD_PAD_WIDTH, base + cfg.BUILD_PAD_HEIGHT),
+        (1.0, start,                       base + cfg.BUILD_PAD_HEIGHT),
+    ])
+
+
+def tunnel_profile(cfg):
+    """
+    Casca do túnel (∩) sobre as barreiras: paredes internas/externas e,
+    se TUNNEL_HAS_ROOF, teto interno/externo com espessura TUNNEL_ROOF_THICK.
+    Sem piso e sem tampas.
+    """
+    inner = cfg.BARRIER_OFFSET + cfg.BARRIER_THICKNESS/2
+    outer = inner + cfg.TUNNEL_THICKNESS
+    floor_z = cfg.ROAD_THICKNESS/2
+    top_z   = floor_z + cfg.TUNNEL_HEIGHT
+    roof_z  = top_z + (cfg.TUNNEL_ROOF_THICK if cfg.TUNNEL_HAS_ROOF else 0.0)
+
+    points = [
+        (-1.0, -outer, floor_z),  # 0 L_BE
+        (-1.0, -inner, floor_z),  # 1 L_BI
+        (-1.0, -inner, top_z),    # 2 L_TO
+        ( 1.0,  inner, top_z),    # 3 R_TO
+        ( 1.0,  inner, floor_z),  # 4 R_BI
+        ( 1.0,  outer, floor_z),  # 5 R_BE
+        ( 1.0,  outer, roof_z),   # 6 R_TE
+        (-1.0, -outer, roof_z),   # 7 L_TE
+    ]
+    # arestas: 1 parede int. esq, 2 teto int., 3 parede int. dir,
+    #          5 parede ext. dir, 6 teto ext., 7 parede ext. esq
+    faces = [1, 2, 3, 5, 6, 7] if cfg.TUNNEL_HAS_ROOF else [1, 3, 5, 7]
+    return SweepProfile(points, faces=faces, caps=False)
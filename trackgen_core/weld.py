@@ -0,0 +1,302 @@
+"""
+Pós-processamento em arrays (sem operadores nem modo de edição): solda de
+vértices coincidentes, winding consistente e normais suaves por canto.
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+from .buffers import MeshBuffers
+
+# primos do hash espacial (Teschner et al.), mistura em uint64 com overflow
+_HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.uint64)
+# 8 células a testar (célula = 2*dist): a própria e as vizinhas do lado mais
+# próximo em cada eixo; qualquer vértice a até dist cai numa delas
+_CORNERS = np.array([(i >> 2 & 1, i >> 1 & 1, i & 1) for i in range(8)], dtype=np.int64)
+
+
+def _cell_hash(q):
+    qu = q.astype(np.int64).view(np.uint64) * _HASH_PRIMES
+    return qu[:, 0] ^ qu[:, 1] ^ qu[:, 2]
+
+
+def _face_layout(buf):
+    """(starts, owner, next): início de cada face, face de cada canto e o canto seguinte na face."""
+    sizes = buf.sizes
+    starts = np.cumsum(sizes) - sizes
+    owner = np.repeat(np.arange(len(sizes)), sizes)
+    nxt = np.arange(len(buf.loops)) + 1
+    if len(sizes):
+        nxt[starts + sizes - 1] = starts
+    return starts, owner, nxt
+
+
+def _take_loops(buf, keep_loops, sizes, keep_faces):
+    """MeshBuffers só com os cantos/faces marcados (vértices intocados); sizes = cantos mantidos por face."""
+    sel = keep_loops & np.repeat(keep_faces, buf.sizes)
+    normals = None if buf.normals is None else buf.normals[sel]
+    return MeshBuffers(buf.verts, buf.loops[sel], sizes[keep_faces], buf.mats[keep_faces],
+                       buf.materials, buf.smooth[keep_faces], normals)
+
+
+def _close_pairs(verts, dist):
+    """
+    Todos os pares (i, j), j < i, de vértices a até `dist` um do outro: grade
+    com hash de célula 2*dist; cada vértice compara com todos os vértices
+    das 8 células do lado mais próximo em cada eixo.
+    """
+    n = len(verts)
+    scaled = verts / (2.0 * dist)
+    q = np.floor(scaled).astype(np.int64)
+    side = np.where(scaled - q < 0.5, -1, 1)
+    h = _cell_hash(q)
+    order = np.argsort(h, kind="stable")
+    h_sorted = h[order]
+
+    pairs_i, pairs_j = [], []
+    for corner in _CORNERS:
+        qn = q + corner * side
+        hn = _cell_hash(qn)
+        lo = np.searchsorted(h_sorted, hn, side="left")
+        count = np.searchsorted(h_sorted, hn, side="right") - lo
+        total = int(count.sum())
+        if total == 0:
+            continue
+        i = np.repeat(np.arange(n), count)
+        j = order[np.repeat(lo - (np.cumsum(count) - count), count) + np.arange(total)]
+        d = verts[j] - verts[i]
+        ok = ((j < i) & (q[j] == qn[i]).all(axis=1)  # hash igual, célula diferente -> fora
+              & (np.einsum("ij,ij->i", d, d) <= dist * dist))
+        pairs_i.append(i[ok])
+        pairs_j.append(j[ok])
+    if not pairs_i:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+def weld_vertices(buf, dist):
+    """
+    Funde vértices a até `dist` uns dos outros (como remove_doubles) e devolve
+    (MeshBuffers, remap) com remap (N,) -> índice novo de cada vértice antigo.
+
+    Todo par a até `dist` acaba no mesmo vértice (em cadeia, a -> b -> c),
+    que fica na posição do menor índice do grupo; faces que ficam com menos
+    de 3 cantos distintos são removidas.
+    """
+    verts = buf.verts
+    n = len(verts)
+    if n == 0 or dist <= 0:
+        return buf, np.arange(n)
+
+    # union-find vetorizado: cada vértice aponta para o menor índice do seu grupo;
+    # a cada rodada as raízes dos pares ainda abertos vão para a menor das duas
+    i, j = _close_pairs(verts, dist)
+    target = np.arange(n)
+    while len(i):
+        ri, rj = target[i], target[j]
+        low = np.minimum(ri, rj)
+        np.minimum.at(target, ri, low)
+        np.minimum.at(target, rj, low)
+        while True:
+            nxt = target[target]
+            if np.array_equal(nxt, target):
+                break
+            target = nxt
+        # pares já resolvidos saem
+        open_ = target[i] != target[j]
+        i, j = i[open_], j[open_]
+
+    used, remap = np.unique(target, return_inverse=True)
+    return _merge_vertices(buf, verts[used], remap.ravel())
+
+
+def cluster_vertices(buf, cell):
+    """
+    Simplificação por agrupamento: todos os vértices da mesma célula da grade
+    (lado `cell`) viram um só, na média deles. Sem encadeamento entre células
+    (ao contrário de weld_vertices), então serve para LODs grosseiros.
+    Devolve (MeshBuffers, remap) como weld_vertices.
+    """
+    verts = buf.verts
+    n = len(verts)
+    if n == 0 or cell <= 0:
+        return buf, np.arange(n)
+    q = np.floor(verts / cell).astype(np.int64)
+    _, first, remap = np.unique(q, axis=0, return_index=True, return_inverse=True)
+    # ids na ordem da 1ª ocorrência (estável entre execuções)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    remap = rank[remap.ravel()]
+    count = np.bincount(remap, minlength=len(order))
+    centers = np.stack([np.bincount(remap, weights=verts[:, k], minlength=len(order)) for k in range(3)],
+                       axis=1) / count[:, None]
+    return _merge_vertices(buf, centers, remap)
+
+
+def _merge_vertices(buf, new_verts, remap):
+    """Aplica remap (vértice antigo -> novo) e remove cantos repetidos e faces com < 3 cantos."""
+    loops = remap[buf.loops]
+    merged = MeshBuffers(new_verts, loops, buf.sizes, buf.mats, buf.materials, buf.smooth, buf.normals)
+
+    # cantos repetidos em sequência viram um só; faces com < 3 cantos saem
+    if not len(buf):
+        return merged, remap
+    starts, _, nxt = _face_layout(merged)
+    keep_loops = loops != loops[nxt]
+    new_sizes = np.add.reduceat(keep_loops.astype(np.int64), starts)
+    keep_faces = new_sizes >= 3
+    if keep_loops.all() and keep_faces.all():
+        return merged, remap
+    return _take_loops(merged, keep_loops, new_sizes, keep_faces), remap
+
+
+def face_normals(buf, unit=True):
+    """Normal de cada face pelo método de Newell (F, 3); com unit=False o módulo é 2x a área."""
+    if not len(buf):
+        return np.zeros((0, 3))
+    starts, owner, nxt = _face_layout(buf)
+    v = buf.verts[buf.loops] - buf.verts[buf.loops[starts]][owner]
+    n = np.add.reduceat(np.cross(v, v[nxt]), starts, axis=0)
+    if unit:
+        n = n / np.maximum(np.linalg.norm(n, axis=1), 1e-12)[:, None]
+    return n
+
+
+def flip_faces(buf, faces):
+    """Inverte o winding das faces marcadas (F,) bool, mantendo o 1º canto."""
+    if not faces.any():
+        return buf
+    starts, owner, _ = _face_layout(buf)
+    local = np.arange(len(buf.loops)) - starts[owner]
+    size = buf.sizes[owner]
+    rev = np.where(local == 0, 0, size - local)
+    src = np.where(faces[owner], starts[owner] + rev, np.arange(len(buf.loops)))
+    normals = None if buf.normals is None else buf.normals[src]
+    return MeshBuffers(buf.verts, buf.loops[src], buf.sizes, buf.mats, buf.materials, buf.smooth, normals)
+
+
+def consistent_winding(buf, outward=True):
+    """
+    Acerta o winding: faces vizinhas por uma aresta manifold passam a
+    percorrê-la em sentidos opostos. Com outward=True (como
+    normals_make_consistent(inside=False)) cada ilha é virada para fora do
+    próprio centro (ilhas planas: para cima); com outward=False cada ilha
+    mantém o sentido da maioria (por área) das suas faces, ex.: a casca
+    interna do túnel continua virada para dentro.
+    """
+    n_faces = len(buf)
+    if n_faces == 0:
+        return buf
+    _, owner, nxt = _face_layout(buf)
+    a, b = buf.loops, buf.loops[nxt]
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+
+    # arestas com exatamente 2 faces -> restrição de paridade entre elas
+    order = np.lexsort((hi, lo))
+    lo_s, hi_s = lo[order], hi[order]
+    same_next = (lo_s[1:] == lo_s[:-1]) & (hi_s[1:] == hi_s[:-1])
+    first = np.flatnonzero(same_next)
+    # descarta arestas com 3+ faces (o par faz parte de uma sequência maior)
+    before = np.concatenate([[False], same_next])[first]
+    after = np.concatenate([same_next, [False]])[first + 1]
+    ok = ~before & ~after
+    e0, e1 = order[first[ok]], order[first[ok] + 1]
+    f0, f1 = owner[e0], owner[e1]
+    parity = (a[e0] == a[e1]).astype(np.int8)  # mesmo sentido -> uma das duas vira
+
+    # adjacência em CSR
+    src = np.concatenate([f0, f1])
+    dst = np.concatenate([f1, f0])
+    par = np.concatenate([parity, parity])
+    adj_order = np.argsort(src, kind="stable")
+    dst, par = dst[adj_order].tolist(), par[adj_order].tolist()
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n_faces))]).tolist()
+
+    flip_l = [False] * n_faces
+    island_l = [-1] * n_faces
+    n_islands = 0
+    for seed in range(n_faces):
+        if island_l[seed] >= 0:
+            continue
+        island_l[seed] = n_islands
+        queue = deque([seed])
+        while queue:
+            f = queue.popleft()
+            for j in range(bounds[f], bounds[f + 1]):
+                g = dst[j]
+                if island_l[g] < 0:
+                    island_l[g] = n_islands
+                    flip_l[g] = flip_l[f] ^ bool(par[j])
+                    queue.append(g)
+        n_islands += 1
+    flip = np.array(flip_l, dtype=bool)
+    island = np.array(island_l, dtype=np.int64)
+
+    fn = face_normals(buf, unit=False)
+    area = np.linalg.norm(fn, axis=1)
+    if not outward:
+        kept = np.bincount(island, weights=np.where(flip, -area, area), minlength=n_islands)
+        return flip_faces(buf, flip ^ (kept < 0)[island])
+
+    # orientação de cada ilha: normais (ponderadas por área) para fora do centro
+    fn[flip] *= -1.0
+    centers = np.add.reduceat(buf.verts[buf.loops], np.cumsum(buf.sizes) - buf.sizes, axis=0) / buf.sizes[:, None]
+    w = np.bincount(island, weights=area, minlength=n_islands)
+    centroid = np.stack([np.bincount(island, weights=centers[:, i] * area, minlength=n_islands)
+                         for i in range(3)], axis=1) / np.maximum(w, 1e-12)[:, None]
+    away = np.bincount(island, weights=np.einsum("ij,ij->i", fn, centers - centroid[island]),
+                       minlength=n_islands)
+    upward = np.bincount(island, weights=fn[:, 2], minlength=n_islands)
+    flat = np.abs(away) <= 1e-9 * np.maximum(w, 1e-12) ** 1.5
+    inverted = np.where(flat, upward < 0, away < 0)
+    flip ^= inverted[island]
+    return flip_faces(buf, flip)
+
+
+def loop_normals(buf, smooth_angle_deg=60.0):
+    """
+    Normais por canto (L, 3) no estilo auto smooth: cada canto soma as faces
+    do mesmo vértice cuja normal está a até `smooth_angle_deg` da sua face
+    (ponderadas por área). Custo linear em cantos x grau médio dos vértices.
+    """
+    L = len(buf.loops)
+    if L == 0:
+        return np.zeros((0, 3))
+    _, owner, _ = _face_layout(buf)
+    fa = face_normals(buf, unit=False)
+    fn = fa / np.maximum(np.linalg.norm(fa, axis=1), 1e-12)[:, None]
+    cos_lim = math.cos(math.radians(smooth_angle_deg))
+
+    # cantos agrupados por vértice; pares (canto, canto do mesmo vértice)
+    by_vert = np.argsort(buf.loops, kind="stable")
+    deg = np.bincount(buf.loops, minlength=len(buf.verts))
+    vstart = np.cumsum(deg) - deg
+    d = deg[buf.loops]
+    i = np.repeat(np.arange(L), d)
+    j = by_vert[np.repeat(vstart[buf.loops] - (np.cumsum(d) - d), d) + np.arange(d.sum())]
+
+    fi, fj = owner[i], owner[j]
+    near = np.einsum("ij,ij->i", fn[fi], fn[fj]) >= cos_lim
+    i, fj = i[near], fj[near]
+    out = np.stack([np.bincount(i, weights=fa[fj, k], minlength=L) for k in range(3)], axis=1)
+    norm = np.linalg.norm(out, axis=1)
+    degenerate = norm <= 1e-12
+    out[degenerate] = fn[owner[degenerate]]
+    norm[degenerate] = 1.0
+    return out / norm[:, None]
+
+
+def postprocess_buffers(buf, merge_dist=1e-4, smooth_angle_deg=60.0, winding=True):
+    """
+    Solda + winding consistente (sem reorientar ilhas) + shade smooth com
+    normais por canto; substitui shade_smooth/remove_doubles por operador.
+    winding=False pula o winding (BFS em Python, a parte cara) para malhas
+    que já saem orientadas, como as varreduras e caixas do núcleo.
+    """
+    buf, _ = weld_vertices(buf, merge_dist)
+    if winding:
+        buf = consistent_winding(buf, outward=False)
+    return MeshBuffers(buf.verts, buf.loops, buf.sizes, buf.mats, buf.materials, True,
+                       loop_normals(buf, smooth_angle_deg))